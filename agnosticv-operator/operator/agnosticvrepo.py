@@ -1,14 +1,18 @@
 import asyncio
 import functools
+import hashlib
 import json
 import logging
 import os
+import posixpath
 import re
 import traceback
 
 from base64 import b64decode
+from contextlib import asynccontextmanager
 from copy import deepcopy
 from datetime import datetime, timezone
+from urllib.parse import quote, unquote
 
 import aiofiles
 import aiofiles.os
@@ -22,6 +26,8 @@ from babylon_async import BabylonApiException
 
 from operatorruntime import OperatorRuntime
 from cachedkopfobject import CachedKopfObject
+from definitioncache import DefinitionCache
+from workqueue import WorkQueue
 from onedict.merger import merge
 from onedict.solvers import keep_new
 
@@ -31,6 +37,15 @@ aiofiles.os.chmod = aiofiles.os.wrap(os.chmod)
 app_root = os.environ.get('APP_ROOT', '/opt/app-root')
 agnosticv_cli_path = os.environ.get('AGNOSTICV_CLI_PATH', f"{app_root}/bin/agnosticv")
 
+@functools.lru_cache()
+def agnosticv_cli_fingerprint():
+    """Identify the installed agnosticv CLI so cached merges are not reused after it changes."""
+    try:
+        stat = os.stat(agnosticv_cli_path)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return None
+
 def path_to_name(path):
     name = re.sub(r'\.(json|yaml|yml)$', '', path.lower().replace('_', '-').replace('/', '.'))
 
@@ -43,6 +58,16 @@ def path_to_name(path):
 
     return name
 
+def merge_sync_params(queued, params):
+    """Merge parameters of a queued sync with a new sync so that the sync covers both."""
+    return {
+        "after_sync": queued['after_sync'] + params['after_sync'],
+        "changed_only": queued['changed_only'] and params['changed_only'],
+        "hexsha": params['hexsha'] or queued['hexsha'],
+        "logger": params['logger'],
+        "skip_pr_processing": queued['skip_pr_processing'] and params['skip_pr_processing'],
+    }
+
 class AgnosticVProcessingError(Exception):
     pass
 
@@ -67,7 +92,7 @@ class AgnosticVRepo(CachedKopfObject):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.git_hexsha = self.git_checkout_ref = self.git_repo = None
+        self.git_hexsha = self.git_repo = None
         self.git_changed_files = []
         self.git_deleted_files = set()
         self.fetched_branches = set()  # Track which branches we've fetched fully
@@ -77,7 +102,18 @@ class AgnosticVRepo(CachedKopfObject):
         self.last_curative_cleanup_time = None  # Timestamp of last curative cleanup
         self.max_tracked_pr_commits = 1000  # Maximum number of PR commits to track
         self.max_fetched_branches = 500  # Maximum number of fetched branches to track
-        self.git_repo_lock = asyncio.Lock()  # Prevent concurrent git operations
+        self.git_repo_lock = asyncio.Lock()  # Prevent concurrent fetches into the shared repository
+        self.git_worktrees = {}  # Dictionary of ref -> GitWorktree
+        self.merge_semaphore = asyncio.Semaphore(OperatorRuntime.agnosticv_merge_concurrency)
+        self.apply_semaphore = asyncio.Semaphore(OperatorRuntime.component_apply_concurrency)
+        self.definition_cache = DefinitionCache(self.definition_cache_path)
+        self.git_blob_includes = {}  # Dictionary of blob id -> files included with #include
+        self.max_git_blob_includes = 10000  # Maximum number of blobs to track includes for
+        self.work_queue = WorkQueue(
+            name = self.name,
+            debounce = OperatorRuntime.work_queue_debounce,
+            max_delay = OperatorRuntime.work_queue_max_delay,
+        )
 
         # PR-level locks to prevent race conditions between webhook and polling
         self.pr_locks = {}  # Dictionary of PR number -> asyncio.Lock()
@@ -121,6 +157,10 @@ class AgnosticVRepo(CachedKopfObject):
     def default_execution_environment(self):
         return self.spec.get('default_execution_environment')
 
+    @property
+    def definition_cache_path(self):
+        return os.path.join(self.git_base_path, self.name + '.definitions')
+
     @property
     def defaults(self):
         return self.spec.get('defaults', {})
@@ -176,6 +216,10 @@ class AgnosticVRepo(CachedKopfObject):
         if self.ssh_key_secret_name:
             return os.path.join(self.git_base_path, self.name + '.sshkey')
 
+    @property
+    def git_worktrees_path(self):
+        return os.path.join(self.git_base_path, self.name + '.worktrees')
+
     @property
     def git_url(self):
         return self.spec['url']
@@ -261,6 +305,58 @@ class AgnosticVRepo(CachedKopfObject):
             # Note: We can't easily add logging here since this method doesn't have a logger parameter
             pass
 
+    def get_git_worktree(self, ref):
+        """Get or create the worktree for a ref, the repository clone itself for the main branch"""
+        if ref not in self.git_worktrees:
+            if ref == self.git_ref:
+                path = self.git_repo_path
+            else:
+                path = os.path.join(self.git_worktrees_path, quote(ref, safe=''))
+            self.git_worktrees[ref] = GitWorktree(
+                context_dir = self.context_dir,
+                path = path,
+                ref = ref,
+                repo_path = self.git_repo_path,
+            )
+        return self.git_worktrees[ref]
+
+    @asynccontextmanager
+    async def git_worktree(self, ref, logger, hexsha=None):
+        """
+        Lock the worktree for ref and check out hexsha in it.
+        Defaults to the last synced commit for the main branch and to the
+        fetched head of other branches.
+        """
+        if not hexsha:
+            hexsha = self.git_hexsha if ref == self.git_ref else self.git_ref_hexsha(ref)
+        worktree = self.get_git_worktree(ref)
+        async with worktree.lock:
+            await worktree.checkout(hexsha, logger=logger)
+            yield worktree
+
+    async def git_worktree_remove(self, ref, logger):
+        """Remove the worktree for a ref, such as when its pull request is closed"""
+        if ref == self.git_ref:
+            return
+        worktree = self.get_git_worktree(ref)
+        async with worktree.lock:
+            await worktree.remove(logger=logger)
+        # Only forget the worktree if it was not checked out again while waiting for the lock
+        if not worktree.hexsha:
+            self.git_worktrees.pop(ref, None)
+
+    async def git_worktree_prune(self, active_refs, logger):
+        """Remove worktrees for refs that are no longer active, including any left from before a restart"""
+        try:
+            names = await aiofiles.os.listdir(self.git_worktrees_path)
+        except FileNotFoundError:
+            return
+        active_names = {quote(ref, safe='') for ref in active_refs}
+        for name in names:
+            if name not in active_names:
+                logger.info(f"Removing worktree for inactive ref {unquote(name)}")
+                await self.git_worktree_remove(unquote(name), logger=logger)
+
     def has_local_ref_changed(self, ref):
         """Check if local ref differs from remote ref"""
         try:
@@ -314,48 +410,103 @@ class AgnosticVRepo(CachedKopfObject):
         except (pygit2.GitError, KeyError, ValueError, TypeError) as e:
             return [], f"Unable to compute changed files in branch {ref}: {e}"
 
-    def __git_repo_checkout(self, logger, ref=None):
-        if not ref:
-            ref = self.git_ref
-
+    def git_ref_hexsha(self, ref):
+        """Resolve a fetched branch or commit hash to a commit hash without checking it out"""
         try:
-            # Try to checkout as a remote branch first
             remote_ref = f'refs/remotes/origin/{ref}'
             if remote_ref in self.git_repo.references:
-                target_oid = self.git_repo.references[remote_ref].target
-                commit = self.git_repo[target_oid]
-
-                # Use more aggressive cleanup strategy to ensure working directory is clean
-                self.git_repo.checkout_tree(
-                    commit.tree,
-                    strategy=(pygit2.GIT_CHECKOUT_FORCE |
-                             pygit2.GIT_CHECKOUT_REMOVE_UNTRACKED |
-                             pygit2.GIT_CHECKOUT_REMOVE_IGNORED)
-                )
-                # Set HEAD to point to this commit (detached HEAD)
-                self.git_repo.set_head(target_oid)
-                self.git_hexsha = str(target_oid)
-            # Try as direct commit hash
-            elif re.match(r'[0-9a-f]+$', ref):
+                return str(self.git_repo.references[remote_ref].target)
+            if re.match(r'[0-9a-f]+$', ref):
                 try:
-                    target_oid = pygit2.Oid(hex=ref)
-                    commit = self.git_repo[target_oid]
-                    self.git_repo.checkout_tree(
-                        commit.tree,
-                        strategy=(pygit2.GIT_CHECKOUT_FORCE |
-                                 pygit2.GIT_CHECKOUT_REMOVE_UNTRACKED |
-                                 pygit2.GIT_CHECKOUT_REMOVE_IGNORED)
-                    )
-                    self.git_repo.set_head(target_oid)
-                    self.git_hexsha = str(target_oid)
+                    return str(self.git_repo[pygit2.Oid(hex=ref)].id)
                 except (pygit2.GitError, ValueError, KeyError):
                     raise kopf.TemporaryError(f"Unable to checkout commit {ref}", delay=60)
-            else:
-                raise kopf.TemporaryError(f"Unable to resolve reference {ref}", delay=60)
         except pygit2.GitError as e:
             raise kopf.TemporaryError(f"Git checkout failed: {e}", delay=60)
+        raise kopf.TemporaryError(f"Unable to resolve reference {ref}", delay=60)
+
+    def __git_blob_includes(self, blob):
+        """Return paths included by #include directives in a blob, tracked by blob id"""
+        includes = self.git_blob_includes.get(blob.id)
+        if includes is None:
+            includes = [
+                include.strip('"\'') for include in
+                re.findall(r'^#include\s+(\S+)', blob.data.decode('utf-8', 'replace'), re.MULTILINE)
+            ]
+            if len(self.git_blob_includes) >= self.max_git_blob_includes:
+                self.git_blob_includes.clear()
+            self.git_blob_includes[blob.id] = includes
+        return includes
+
+    def component_definition_key(self, source, hexsha):
+        """
+        Compute a content key for the merged definition of a component at a commit.
+        The key covers the git object ids of everything that can contribute to
+        the merge: the component file and its own related files, common and
+        account files in parent directories, any files they include, and the
+        repo-wide schemas and agnosticv config, along with the repo settings
+        applied to the merged definition.
+        """
+        tree = self.git_repo[pygit2.Oid(hex=hexsha)].tree
+
+        def get_object(path):
+            if self.context_dir:
+                path = posixpath.join(self.context_dir, path)
+            path = posixpath.normpath(path)
+            if path == '.':
+                return tree
+            try:
+                return tree[path]
+            except KeyError:
+                return None
+
+        component_dir = posixpath.dirname(source.path)
+        component_name, component_ext = posixpath.splitext(posixpath.basename(source.path))
+        pending = [source.path, '.agnosticv.yaml', '.agnosticv.yml', '.schemas']
+        if component_name == 'common':
+            # Component defined as a directory, everything in it belongs to the component
+            pending.append(component_dir or '.')
+        else:
+            # Related files of a component file are kept in a directory named for it
+            pending.append(posixpath.join(component_dir, component_name))
+            component_dir_obj = get_object(component_dir or '.')
+            if component_dir_obj is not None and component_dir_obj.type == pygit2.GIT_OBJECT_TREE:
+                for entry in component_dir_obj:
+                    if entry.name.startswith(f"{component_name}.") and entry.name != f"{component_name}{component_ext}":
+                        pending.append(posixpath.join(component_dir, entry.name))
+        parts = component_dir.split('/') if component_dir else []
+        for depth in range(len(parts) + 1):
+            for name in (
+                'account.json', 'account.yaml', 'account.yml',
+                'common.json', 'common.yaml', 'common.yml',
+            ):
+                pending.append(posixpath.join(*parts[:depth], name))
 
-        self.git_checkout_ref = ref
+        object_ids = {}
+        while pending:
+            path = pending.pop()
+            if path in object_ids:
+                continue
+            obj = get_object(path)
+            object_ids[path] = str(obj.id) if obj else None
+            if obj is None or obj.type != pygit2.GIT_OBJECT_BLOB:
+                continue
+            for include in self.__git_blob_includes(obj):
+                if include.startswith('/'):
+                    pending.append(posixpath.normpath(include.lstrip('/')))
+                else:
+                    pending.append(posixpath.normpath(posixpath.join(posixpath.dirname(path), include)))
+
+        return hashlib.sha256(json.dumps({
+            "agnosticv": agnosticv_cli_fingerprint(),
+            "anarchy_collections": self.anarchy_collections,
+            "anarchy_roles": self.anarchy_roles,
+            "default_execution_environment": self.default_execution_environment,
+            "defaults": self.defaults,
+            "objects": object_ids,
+            "overrides": self.overrides,
+            "path": source.path,
+        }, sort_keys=True).encode('utf-8')).hexdigest()
 
     def __git_repo_clone(self, logger):
         # Create callbacks for authentication if SSH key is provided
@@ -393,7 +544,7 @@ class AgnosticVRepo(CachedKopfObject):
                 checkout_branch=self.git_ref
                 # No depth limit - we want full history for efficient operations
             )
-            self.__git_repo_checkout(logger=logger)
+            self.git_hexsha = self.git_ref_hexsha(self.git_ref)
             self.mark_branch_fetched(self.git_ref)
             logger.info(f"Cloned {self.git_ref} [{self.git_hexsha}] with full history")
         except pygit2.GitError as e:
@@ -538,18 +689,19 @@ class AgnosticVRepo(CachedKopfObject):
                         exception,
                     )
 
+            # Worktrees check out the new commit when they are next used
             prev_hexsha = self.git_hexsha
-            self.__git_repo_checkout(logger=logger)
+            self.git_hexsha = self.git_ref_hexsha(self.git_ref)
 
             self.git_changed_files.clear()
             self.git_deleted_files.clear()
 
-            if prev_hexsha == self.git_hexsha:
-                return
-
-            logger.info(f"Checked out {self.git_ref} [{self.git_hexsha}]")
+            if prev_hexsha != self.git_hexsha:
+                logger.info(f"Fetched {self.git_ref} [{self.git_hexsha}]")
 
-            if not self.last_successful_git_hexsha:
+            # Changes are always relative to the last successful commit so that changes
+            # fetched by a sync that did not complete are processed by the next sync
+            if not self.last_successful_git_hexsha or self.last_successful_git_hexsha == self.git_hexsha:
                 return
 
             # Get diff between last successful commit and current
@@ -616,37 +768,24 @@ class AgnosticVRepo(CachedKopfObject):
         return stdout.decode('utf-8'), stderr.decode('utf-8')
 
     async def agnosticv_get_all_component_paths(self):
-        # Use internal no-lock version with git_repo_lock to ensure atomic operation
-        async with self.git_repo_lock:
-            return await self._agnosticv_get_all_component_paths_no_lock()
-
-    async def _agnosticv_get_all_component_paths_no_lock(self):
-        # Internal method - caller must hold git_repo_lock
-        # Ensure we're on the main branch when listing all components
+        # List components in the main branch worktree while holding its lock
         logger = logging.getLogger(__name__)
-        if self.git_checkout_ref != self.git_ref:
-            logger.debug(
-                "Switching from %s to %s for component listing",
-                self.git_checkout_ref, self.git_ref,
-            )
-            self.__git_repo_checkout(logger=logger, ref=self.git_ref)
-        else:
-            logger.debug(
-                "Already on %s for component listing",
-                self.git_ref,
-            )
+        async with self.git_worktree(self.git_ref, logger=logger) as worktree:
+            return await self._agnosticv_get_all_component_paths_no_lock(worktree)
 
-        # Double-check we're on the right branch and clean working directory
-        logger.debug(f"About to list components on branch {self.git_checkout_ref}, working dir: {self.agnosticv_path}")
+    async def _agnosticv_get_all_component_paths_no_lock(self, worktree):
+        # Internal method - caller must hold worktree lock
+        logger = logging.getLogger(__name__)
+        logger.debug(f"About to list components on {worktree.ref} [{worktree.hexsha}], working dir: {worktree.agnosticv_path}")
 
         # Check if agnosticv_path exists before trying to list components
-        if not os.path.exists(self.agnosticv_path):
-            logger.error(f"AgnosticV path does not exist: {self.agnosticv_path}")
-            return [], f"AgnosticV path does not exist: {self.agnosticv_path}"
+        if not os.path.exists(worktree.agnosticv_path):
+            logger.error(f"AgnosticV path does not exist: {worktree.agnosticv_path}")
+            return [], f"AgnosticV path does not exist: {worktree.agnosticv_path}"
 
         try:
             stdout, stderr = await self.agnosticv_exec(
-                '--list', '--has=__meta__', '--dir', self.agnosticv_path
+                '--list', '--has=__meta__', '--dir', worktree.agnosticv_path
             )
             if stderr:
                 # Filter out common but harmless warnings for test components
@@ -663,40 +802,24 @@ class AgnosticVRepo(CachedKopfObject):
             logger.error(f"Failed to list components: {e}")
             return [], str(e)
 
-    async def agnosticv_get_component_paths_from_related_files(self, files, logger):
+    async def agnosticv_get_component_paths_from_related_files(self, files, worktree, logger):
+        # Internal method - caller must hold worktree lock
         if not files:
             return [], ''
-        args = ['--list', '--has=__meta__', '--dir', self.agnosticv_path, '--related', files[0]]
+        args = ['--list', '--has=__meta__', '--dir', worktree.agnosticv_path, '--related', files[0]]
         for file in files[1:]:
             args.extend(['--or-related', file])
         logger.debug(f"agnosticv {' '.join(args)}")
         stdout, stderr = await self.agnosticv_exec(*args)
         return stdout.split(), stderr
 
-    async def agnosticv_get_component_paths_from_related_files_on_ref(self, files, ref, logger):
-        """Get component paths from related files, ensuring we're on the specified ref"""
+    async def agnosticv_get_component_paths_from_related_files_on_ref(self, files, ref, logger, hexsha=None):
+        """Get component paths from related files in the worktree for the specified ref"""
         if not files:
             return [], ''
 
-        async with self.git_repo_lock:
-            # Store current state
-            original_ref = self.git_checkout_ref
-
-            try:
-                # Ensure we're on the correct ref
-                if self.git_checkout_ref != ref:
-                    logger.debug(f"Checking out {ref} for component path lookup")
-                    self.__git_repo_checkout(logger=logger, ref=ref)
-
-                # Get component paths
-                return await self.agnosticv_get_component_paths_from_related_files(files, logger)
-
-            finally:
-                # Restore original ref if we changed it
-                if original_ref and original_ref != ref:
-                    logger.debug(f"Restoring checkout to {original_ref}")
-                    self.__git_repo_checkout(logger=logger, ref=original_ref)
-
+        async with self.git_worktree(ref, logger=logger, hexsha=hexsha) as worktree:
+            return await self.agnosticv_get_component_paths_from_related_files(files, worktree=worktree, logger=logger)
 
     async def delete_components(self, logger):
         async for agnosticv_component in OperatorRuntime.babylon.list_agnosticv_components(
@@ -723,21 +846,72 @@ class AgnosticVRepo(CachedKopfObject):
                     raise
 
     async def get_component_definition(self, source, logger):
-        # Ensure atomic git operations to prevent concurrency issues
-        async with self.git_repo_lock:
-            return await self._get_component_definition_no_lock(source, logger)
+        # Merge in the worktree for the source ref so that other refs are not blocked
+        async with self.git_worktree(source.ref, logger=logger, hexsha=source.hexsha) as worktree:
+            return await self._get_component_definition_no_lock(source, worktree, logger)
 
-    async def _get_component_definition_no_lock(self, source, logger):
-        # Internal method - caller must hold git_repo_lock
-        if self.git_checkout_ref != source.ref:
-            await self.git_repo_checkout(logger=logger, ref=source.ref)
+    async def get_component_definitions(self, sources, logger):
+        """
+        Merge definitions for many component sources, yielding tuples of source,
+        definition, and processing error as merges complete. Sources are grouped
+        by ref and commit so that each worktree is locked and checked out once,
+        and merges run in a bounded pool of concurrent agnosticv processes.
+        """
+        queue = asyncio.Queue()
+        sources_by_ref = {}
+        for source in sources:
+            sources_by_ref.setdefault((source.ref, source.hexsha), []).append(source)
 
+        async def merge(source, worktree):
+            async with self.merge_semaphore:
+                try:
+                    definition = await self._get_component_definition_no_lock(source, worktree, logger)
+                    queue.put_nowait((source, definition, None))
+                except Exception as exception:
+                    queue.put_nowait((source, None, exception))
+
+        async def merge_ref(ref, hexsha, ref_sources):
+            try:
+                async with self.git_worktree(ref, logger=logger, hexsha=hexsha) as worktree:
+                    await asyncio.gather(*[merge(source, worktree) for source in ref_sources])
+            except Exception as exception:
+                for source in ref_sources:
+                    queue.put_nowait((source, None, exception))
+
+        tasks = [
+            asyncio.create_task(merge_ref(ref, hexsha, ref_sources))
+            for (ref, hexsha), ref_sources in sources_by_ref.items()
+        ]
+        try:
+            for _ in range(len(sources)):
+                source, definition, exception = await queue.get()
+                if exception and not isinstance(exception, AgnosticVProcessingError):
+                    raise exception
+                yield source, definition, exception
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _get_component_definition_no_lock(self, source, worktree, logger):
+        # Internal method - caller must hold worktree lock
         # Check if file exists before trying to process it
-        component_file_path = os.path.join(self.agnosticv_path, source.path)
+        component_file_path = os.path.join(worktree.agnosticv_path, source.path)
         if not os.path.exists(component_file_path):
             logger.warning(f"Component file does not exist: {component_file_path} on ref {source.ref}")
             raise AgnosticVProcessingError(f"Component file {source.path} does not exist on ref {source.ref}")
 
+        # Reuse the merged definition if nothing that contributes to it has changed
+        try:
+            cache_key = self.component_definition_key(source, worktree.hexsha)
+        except (pygit2.GitError, KeyError, ValueError) as exception:
+            logger.warning(f"Unable to compute definition cache key for {source}: {exception}")
+            cache_key = None
+        if cache_key:
+            definition = await self.definition_cache.get(cache_key)
+            if definition is not None:
+                logger.debug(f"Using cached definition for {source} [{cache_key}]")
+                return definition
+
         stdout, stderr = await self.agnosticv_exec(
             '--merge', component_file_path, '--output=json',
         )
@@ -756,6 +930,12 @@ class AgnosticVRepo(CachedKopfObject):
         #elif definition['__meta__'].get('deployer', {}).get('execution_environment'):
         #    del definition['__meta__']['deployer']['execution_environment']
 
+        if cache_key:
+            try:
+                await self.definition_cache.set(cache_key, definition)
+            except OSError as exception:
+                logger.warning(f"Unable to cache definition for {source}: {exception}")
+
         return definition
 
     async def get_component_sources(self, changed_only, logger, skip_pr_processing=False):
@@ -766,8 +946,8 @@ class AgnosticVRepo(CachedKopfObject):
         try:
             if changed_only:
                 if self.git_changed_files:
-                    component_paths, error_msg = await self.agnosticv_get_component_paths_from_related_files(
-                        self.git_changed_files, logger=logger
+                    component_paths, error_msg = await self.agnosticv_get_component_paths_from_related_files_on_ref(
+                        self.git_changed_files, ref=self.git_ref, logger=logger
                     )
                 else:
                     component_paths = []
@@ -875,6 +1055,10 @@ class AgnosticVRepo(CachedKopfObject):
                             del self.last_pr_commits[stale_ref]
                             self.fetched_branches.discard(stale_ref)
 
+                    # Worktrees are only kept for the main branch and open PR heads
+                    if response.status == 200:
+                        await self.git_worktree_prune(open_pr_refs, logger=logger)
+
                     # Memory management: Enforce size limits on tracking dictionaries
                     await self.enforce_memory_limits(logger=logger)
 
@@ -930,22 +1114,23 @@ class AgnosticVRepo(CachedKopfObject):
                                 )
 
                             # Fetch the specific branch to get the latest commits
-                            remote.fetch(refspecs=[branch_refspec], callbacks=callbacks)
+                            async with self.git_repo_lock:
+                                remote.fetch(refspecs=[branch_refspec], callbacks=callbacks)
 
-                            # Checkout the specific commit SHA from GitHub API to avoid timing issues
-                            # where GitHub API is ahead of Git mirrors
-                            checkout_success = False
+                            # Checkout the specific commit SHA from GitHub API in the worktree for
+                            # this branch to avoid timing issues where GitHub API is ahead of Git mirrors
+                            worktree = self.get_git_worktree(ref)
                             max_retries = 3
                             base_delay = 1  # Start with 1 second
 
                             for attempt in range(max_retries):
                                 try:
-                                    await self.git_repo_checkout(logger=logger, ref=current_commit)
+                                    async with worktree.lock:
+                                        await worktree.checkout(current_commit, logger=logger)
                                     logger.debug(
                                         "Successfully checked out commit %s for PR #%s (attempt %s)",
                                         current_commit, pr_number, attempt + 1,
                                     )
-                                    checkout_success = True
                                     break
                                 except kopf.TemporaryError as exception:
                                     if "Unable to checkout commit" in str(exception) and attempt < max_retries - 1:
@@ -957,26 +1142,26 @@ class AgnosticVRepo(CachedKopfObject):
                                         )
                                         await asyncio.sleep(delay)
                                         # Retry fetch to get latest commits
-                                        remote.fetch(refspecs=[branch_refspec], callbacks=callbacks)
+                                        async with self.git_repo_lock:
+                                            remote.fetch(refspecs=[branch_refspec], callbacks=callbacks)
                                     elif "Unable to checkout commit" in str(exception):
                                         # Final attempt failed, fall back to branch checkout
                                         logger.warning(f"All attempts failed to checkout {current_commit}, falling back to branch {ref}")
-                                        await self.git_repo_checkout(logger=logger, ref=ref)
-                                        checkout_success = True
-                                        if self.git_hexsha != current_commit:
-                                            logger.info(f"Git mirrors behind GitHub API: expected {current_commit}, got {self.git_hexsha}")
+                                        async with worktree.lock:
+                                            await worktree.checkout(self.git_ref_hexsha(ref), logger=logger)
+                                        if worktree.hexsha != current_commit:
+                                            logger.info(f"Git mirrors behind GitHub API: expected {current_commit}, got {worktree.hexsha}")
                                         break
                                     else:
                                         raise
 
                             # Update tracking - use actual checked out commit
-                            actual_commit = self.git_hexsha if checkout_success else current_commit
-                            self.last_pr_commits[ref] = actual_commit
+                            self.last_pr_commits[ref] = worktree.hexsha
 
                             if is_new_branch:
-                                logger.info(f"Checked out new PR branch {ref} [{self.git_hexsha}] for PR #{pr_number}")
+                                logger.info(f"Checked out new PR branch {ref} [{worktree.hexsha}] for PR #{pr_number}")
                             else:
-                                logger.info(f"Checked out {ref} [{self.git_hexsha}] for PR #{pr_number}")
+                                logger.info(f"Checked out {ref} [{worktree.hexsha}] for PR #{pr_number}")
                             changed_files = await self.git_changed_files_in_branch(logger=logger, ref=ref)
                         except kopf.TemporaryError:
                             # Branch might not exist locally, skip this PR
@@ -986,8 +1171,8 @@ class AgnosticVRepo(CachedKopfObject):
                         error_message = None
                         try:
                             logger.debug(f"Getting component paths from changed files: {changed_files}")
-                            component_paths, error_message = await self.agnosticv_get_component_paths_from_related_files(
-                                changed_files, logger=logger
+                            component_paths, error_message = await self.agnosticv_get_component_paths_from_related_files_on_ref(
+                                changed_files, ref=ref, logger=logger, hexsha=worktree.hexsha
                             )
                             logger.debug(f"Got {component_paths}")
                         except AgnosticVProcessingError as error:
@@ -1004,14 +1189,9 @@ class AgnosticVRepo(CachedKopfObject):
                                     path,
                                     pull_request_number = pull_request['number'],
                                     ref = ref,
-                                    hexsha = self.git_hexsha
+                                    hexsha = worktree.hexsha
                                 )
 
-            # After processing all PRs, ensure we're back on the main branch
-            if self.git_checkout_ref != self.git_ref:
-                logger.debug(f"Restoring main branch {self.git_ref} after PR processing")
-                await self.git_repo_checkout(logger=logger, ref=self.git_ref)
-
         component_sources = list(component_sources_by_path.values())
         component_sources.sort(key=lambda cs: cs.sortkey)
 
@@ -1335,26 +1515,14 @@ class AgnosticVRepo(CachedKopfObject):
                             # No active PRs left, check if component exists on main branch
                             # to determine if it should be deleted (created by PR) or just cleaned up (modified by PR)
                             try:
-                                # Check if component exists in main branch by looking at current working directory
-                                # Use git repo lock to prevent conflicts with other git operations
-                                async with self.git_repo_lock:
-                                    original_ref = self.git_checkout_ref
-                                    if original_ref != self.git_ref:
-                                        logger.debug(f"Checking out main branch {self.git_ref} to check if component exists there")
-                                        self._AgnosticVRepo__git_repo_checkout(logger=logger, ref=self.git_ref)
-
-                                    main_component_paths, error_msg = await self._agnosticv_get_all_component_paths_no_lock()
-                                    if error_msg:
-                                        logger.warning(f"Error getting main branch components for cleanup: {error_msg}")
-                                        main_component_paths = []
-
-                                    # Convert paths to component names
-                                    main_branch_component_names = {path_to_name(path) for path in main_component_paths}
-
-                                    # Restore original checkout
-                                    if original_ref and original_ref != self.git_ref:
-                                        logger.debug(f"Restoring checkout to {original_ref}")
-                                        self._AgnosticVRepo__git_repo_checkout(logger=logger, ref=original_ref)
+                                # Check if component exists in main branch by listing the main branch worktree
+                                main_component_paths, error_msg = await self.agnosticv_get_all_component_paths()
+                                if error_msg:
+                                    logger.warning(f"Error getting main branch components for cleanup: {error_msg}")
+                                    main_component_paths = []
+
+                                # Convert paths to component names
+                                main_branch_component_names = {path_to_name(path) for path in main_component_paths}
 
                                 if agnosticv_component.name in main_branch_component_names:
                                     # Component exists in main branch - it was MODIFIED by PR, just remove annotation
@@ -1558,19 +1726,16 @@ class AgnosticVRepo(CachedKopfObject):
             logger.warning(error_message)
         return files
 
-    async def git_repo_checkout(self, logger, ref=None):
-        if not ref:
-            ref = self.git_ref
-        if ref == self.git_checkout_ref:
-            return
-
-        await asyncio.get_event_loop().run_in_executor(
-            None, functools.partial(
-                self.__git_repo_checkout, logger=logger, ref=ref
-            )
-        )
-
     async def git_repo_delete(self, logger):
+        try:
+            await aioshutil.rmtree(self.definition_cache_path)
+        except FileNotFoundError:
+            pass
+        try:
+            await aioshutil.rmtree(self.git_worktrees_path)
+        except FileNotFoundError:
+            pass
+        self.git_worktrees.clear()
         try:
             await aioshutil.rmtree(self.git_repo_path)
         except FileNotFoundError:
@@ -1584,14 +1749,38 @@ class AgnosticVRepo(CachedKopfObject):
         except FileNotFoundError:
             pass
 
-    async def git_repo_sync(self, logger):
-        # Protect repository synchronization with lock
+    async def git_repo_open(self, logger):
+        """
+        Ensure the repository is cloned and open without fetching the main branch.
+        The main branch commit and changed files are only updated by git_repo_sync,
+        which callers must call while holding the repository lock.
+        """
+        if self.git_repo:
+            return
+        async with self.lock:
+            if not self.git_repo:
+                await self.git_repo_sync(logger=logger)
+
+    def git_commit_fetched(self, hexsha):
+        """Return whether hexsha is the fetched main branch commit or one of its ancestors"""
+        if not self.git_repo or not self.git_hexsha:
+            return False
+        if hexsha == self.git_hexsha:
+            return True
+        try:
+            return self.git_repo.descendant_of(self.git_hexsha, hexsha)
+        except (pygit2.GitError, ValueError):
+            return False
+
+    async def git_repo_sync(self, logger, hexsha=None):
+        # Caller must hold the repository lock, git_repo_lock protects fetches into the shared repository
         async with self.git_repo_lock:
             if self.ssh_key_secret_name:
                 await self.git_ssh_key_write()
             if await aiofiles.os.path.exists(self.git_repo_path):
-                # For existing repos, use GitHub API pre-check to avoid unnecessary git fetches
-                if await self.__has_remote_changes(logger):
+                # For existing repos, use GitHub API pre-check to avoid unnecessary git fetches,
+                # unless syncing for a pushed commit that has not been fetched yet
+                if (hexsha and not self.git_commit_fetched(hexsha)) or await self.__has_remote_changes(logger):
                     await asyncio.get_event_loop().run_in_executor(
                         None, self.__git_repo_pull, logger
                     )
@@ -1649,50 +1838,18 @@ class AgnosticVRepo(CachedKopfObject):
             return
 
         try:
-            logger.info(f"Starting git repository cleanup for {self.name}")
-
-            # Get list of remote branches that no longer exist
-            remote = self.git_repo.remotes['origin']
-
-            # Fetch to update remote refs (lightweight operation)
-            callbacks = None
-            if self.ssh_key_secret_name and os.path.exists(self.git_ssh_key_path):
-                def credentials_callback(url, username_from_url, allowed_types):
-                    if allowed_types & pygit2.GIT_CREDENTIAL_SSH_KEY:
-                        return pygit2.Keypair(
-                            username='git',
-                            pubkey=f'{self.git_ssh_key_path}.pub',
-                            privkey=self.git_ssh_key_path,
-                            passphrase=''
-                        )
-                    return None
-
-                def certificate_check_callback(cert, valid, host):
-                    # FIXME - We are ignoring certificate checks??
-                    return True
-
-                callbacks = pygit2.RemoteCallbacks(
-                    credentials=credentials_callback,
-                    certificate_check=certificate_check_callback
-                )
-
-            # Prune remote branches (remove refs to deleted branches)
-            remote.fetch(callbacks=callbacks, prune=True)
+            # Hold git_repo_lock so that gc does not run while PR branches are fetched into the repository
+            async with self.git_repo_lock:
+                await self.__git_repo_gc(logger=logger)
 
-            # Run git garbage collection using subprocess for better control
-            proc = await asyncio.create_subprocess_exec(
-                'git', '-C', self.git_repo_path, 'gc', '--auto', '--prune=now',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            # Remove merged definitions that have not been used recently
+            removed = await self.definition_cache.prune()
+            if removed:
+                logger.info(f"Removed {removed} unused cached definitions for {self.name}")
+            logger.info(
+                "Definition cache for %s: %s hits, %s misses",
+                self.name, self.definition_cache.hits, self.definition_cache.misses,
             )
-            stdout, stderr = await proc.communicate()
-
-            if proc.returncode == 0:
-                logger.info(f"Git cleanup completed successfully for {self.name}")
-                if stdout:
-                    logger.debug(f"Git gc output: {stdout.decode('utf-8').strip()}")
-            else:
-                logger.warning(f"Git cleanup had issues for {self.name}: {stderr.decode('utf-8').strip()}")
 
             self.last_cleanup_time = now
 
@@ -1702,6 +1859,53 @@ class AgnosticVRepo(CachedKopfObject):
                 self, exception,
             )
 
+    async def __git_repo_gc(self, logger):
+        logger.info(f"Starting git repository cleanup for {self.name}")
+
+        # Get list of remote branches that no longer exist
+        remote = self.git_repo.remotes['origin']
+
+        # Fetch to update remote refs (lightweight operation)
+        callbacks = None
+        if self.ssh_key_secret_name and os.path.exists(self.git_ssh_key_path):
+            def credentials_callback(url, username_from_url, allowed_types):
+                if allowed_types & pygit2.GIT_CREDENTIAL_SSH_KEY:
+                    return pygit2.Keypair(
+                        username='git',
+                        pubkey=f'{self.git_ssh_key_path}.pub',
+                        privkey=self.git_ssh_key_path,
+                        passphrase=''
+                    )
+                return None
+
+            def certificate_check_callback(cert, valid, host):
+                # FIXME - We are ignoring certificate checks??
+                return True
+
+            callbacks = pygit2.RemoteCallbacks(
+                credentials=credentials_callback,
+                certificate_check=certificate_check_callback
+            )
+
+        # Prune remote branches (remove refs to deleted branches)
+        remote.fetch(callbacks=callbacks, prune=True)
+
+        # Run git garbage collection using subprocess for better control, unreachable
+        # objects are kept for git's default grace period as a fetch may have just written them
+        proc = await asyncio.create_subprocess_exec(
+            'git', '-C', self.git_repo_path, 'gc', '--auto',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+
+        if proc.returncode == 0:
+            logger.info(f"Git cleanup completed successfully for {self.name}")
+            if stdout:
+                logger.debug(f"Git gc output: {stdout.decode('utf-8').strip()}")
+        else:
+            logger.warning(f"Git cleanup had issues for {self.name}: {stderr.decode('utf-8').strip()}")
+
     async def enforce_memory_limits(self, logger):
         """
         Enforce memory limits on tracking dictionaries to prevent unbounded growth.
@@ -1732,6 +1936,7 @@ class AgnosticVRepo(CachedKopfObject):
         await self.manage_components(logger=logger, changed_only=False)
 
     async def handle_delete(self, logger):
+        await self.work_queue.stop()
         await self.git_repo_delete(logger=logger)
         await self.delete_components(logger=logger)
 
@@ -1749,10 +1954,10 @@ class AgnosticVRepo(CachedKopfObject):
         definition = await self.get_component_definition(source=source, logger=logger)
         return await self._manage_component_with_definition(source, definition, logger)
 
-    async def _manage_component_no_lock(self, source, logger):
-        # Internal method - caller must hold git_repo_lock
+    async def _manage_component_no_lock(self, source, worktree, logger):
+        # Internal method - caller must hold worktree lock
         try:
-            definition = await self._get_component_definition_no_lock(source=source, logger=logger)
+            definition = await self._get_component_definition_no_lock(source=source, worktree=worktree, logger=logger)
             return await self._manage_component_with_definition(source, definition, logger)
         except AgnosticVProcessingError as exception:
             # Check if this is a "file does not exist" error for PR processing
@@ -1979,9 +2184,51 @@ class AgnosticVRepo(CachedKopfObject):
             else:
                 raise
 
-    async def manage_components(self, logger, changed_only=False, skip_pr_processing=False):
+    def queue_sync(self, logger, changed_only=True, skip_pr_processing=False, hexsha=None, after_sync=None):
+        """
+        Queue sync of components, coalescing with any sync that is already queued
+        so that a burst of pushes results in one sync to the latest commit.
+        Coroutine functions in after_sync are called with the logger after the
+        sync while still holding the repository lock.
+        """
+        return self.work_queue.submit(
+            'sync', self.__run_sync,
+            merge = merge_sync_params,
+            after_sync = list(after_sync or []),
+            changed_only = changed_only,
+            hexsha = hexsha,
+            logger = logger,
+            skip_pr_processing = skip_pr_processing,
+        )
+
+    async def __run_sync(self, after_sync, changed_only, hexsha, logger, skip_pr_processing):
+        if hexsha:
+            logger.info(f"Syncing {self.name} for commit {hexsha}")
+        async with self.lock:
+            await self.manage_components(
+                changed_only = changed_only,
+                hexsha = hexsha,
+                logger = logger,
+                skip_pr_processing = skip_pr_processing,
+            )
+            if hexsha and not self.git_commit_fetched(hexsha):
+                # Fetch may briefly lag behind the push that triggered the sync
+                logger.info(f"Fetched {self.git_ref} [{self.git_hexsha}] does not include {hexsha}, syncing again")
+                await asyncio.sleep(self.work_queue.debounce)
+                await self.manage_components(
+                    changed_only = changed_only,
+                    hexsha = hexsha,
+                    logger = logger,
+                    skip_pr_processing = skip_pr_processing,
+                )
+                if not self.git_commit_fetched(hexsha):
+                    logger.warning(f"Fetched {self.git_ref} [{self.git_hexsha}] still does not include {hexsha}")
+            for callback in after_sync:
+                await callback(logger=logger)
+
+    async def manage_components(self, logger, changed_only=False, skip_pr_processing=False, hexsha=None):
         try:
-            await self.__manage_components(changed_only=changed_only, logger=logger, skip_pr_processing=skip_pr_processing)
+            await self.__manage_components(changed_only=changed_only, hexsha=hexsha, logger=logger, skip_pr_processing=skip_pr_processing)
         except AgnosticVProcessingError as error:
             await self.merge_patch_status({
                 "error": {
@@ -1999,12 +2246,12 @@ class AgnosticVRepo(CachedKopfObject):
                 }
             })
 
-    async def __manage_components(self, logger, changed_only, skip_pr_processing=False):
+    async def __manage_components(self, logger, changed_only, skip_pr_processing=False, hexsha=None):
         logger.debug(f"Starting manage_components for {self.name} (changed_only={changed_only}, skip_pr_processing={skip_pr_processing})")
         # Reset flag for detecting closed PRs in this cycle
         self._has_closed_prs_this_cycle = False
 
-        await self.git_repo_sync(logger=logger)
+        await self.git_repo_sync(hexsha=hexsha, logger=logger)
         # Periodic cleanup of git repository and stale branch tracking
         await self.git_repo_cleanup(logger=logger)
 
@@ -2069,33 +2316,65 @@ class AgnosticVRepo(CachedKopfObject):
                 if exception.status != 404:
                     raise
 
-        for source in component_sources:
-            try:
-                result = await self.manage_component(source=source, logger=logger)
-                handled_component_names.add(source.name)
-                if not source.pull_request_number:
-                    continue
-                pr_hexsha[source.pull_request_number] = source.hexsha
-                if result == 'created':
-                    pr_messages.setdefault(source.pull_request_number, []).append(
-                        f"Created AgnosticVComponent `{source.name}`"
-                    )
-                    logger.info(f"Added created message for PR #{source.pull_request_number}: {source.name}")
-                elif result == 'updated':
-                    pr_messages.setdefault(source.pull_request_number, []).append(
-                        f"Updated AgnosticVComponent `{source.name}`"
-                    )
-                    logger.info(f"Added updated message for PR #{source.pull_request_number}: {source.name}")
-                elif result == 'unchanged':
-                    pr_messages.setdefault(source.pull_request_number, []).append(
-                        f"Component `{source.name}` up to date (no change)"
-                    )
-                    logger.info(f"Added unchanged message for PR #{source.pull_request_number}: {source.name}")
-                else:
-                    logger.info(f"Component {source.name} result was '{result}' for PR #{source.pull_request_number} - no message added")
-            except AgnosticVProcessingError as error:
-                errors.setdefault(source.pull_request_number, []).append(error)
-                logger.info(f"Added error for PR #{source.pull_request_number}: {error}")
+        # Apply components in a bounded pool as their definitions are merged
+        async def apply_component(source, definition, merge_error):
+            async with self.apply_semaphore:
+                try:
+                    if merge_error:
+                        raise merge_error
+                    result = await self._manage_component_with_definition(source, definition, logger)
+                    handled_component_names.add(source.name)
+                    if not source.pull_request_number:
+                        return
+                    pr_hexsha[source.pull_request_number] = source.hexsha
+                    if result == 'created':
+                        pr_messages.setdefault(source.pull_request_number, []).append(
+                            f"Created AgnosticVComponent `{source.name}`"
+                        )
+                        logger.info(f"Added created message for PR #{source.pull_request_number}: {source.name}")
+                    elif result == 'updated':
+                        pr_messages.setdefault(source.pull_request_number, []).append(
+                            f"Updated AgnosticVComponent `{source.name}`"
+                        )
+                        logger.info(f"Added updated message for PR #{source.pull_request_number}: {source.name}")
+                    elif result == 'unchanged':
+                        pr_messages.setdefault(source.pull_request_number, []).append(
+                            f"Component `{source.name}` up to date (no change)"
+                        )
+                        logger.info(f"Added unchanged message for PR #{source.pull_request_number}: {source.name}")
+                    else:
+                        logger.info(f"Component {source.name} result was '{result}' for PR #{source.pull_request_number} - no message added")
+                except AgnosticVProcessingError as error:
+                    errors.setdefault(source.pull_request_number, []).append(error)
+                    logger.info(f"Added error for PR #{source.pull_request_number}: {error}")
+
+        apply_tasks = set()
+        apply_failed = asyncio.get_running_loop().create_future()
+
+        def apply_done(task):
+            apply_tasks.discard(task)
+            if not task.cancelled() and task.exception() and not apply_failed.done():
+                apply_failed.set_exception(task.exception())
+
+        async def apply_components():
+            async for source, definition, error in self.get_component_definitions(component_sources, logger=logger):
+                task = asyncio.create_task(apply_component(source, definition, error))
+                apply_tasks.add(task)
+                task.add_done_callback(apply_done)
+            while apply_tasks:
+                await asyncio.wait(list(apply_tasks))
+
+        # An unexpected error applying any component cancels remaining merges and applies
+        apply_components_task = asyncio.create_task(apply_components())
+        try:
+            await asyncio.wait([apply_components_task, apply_failed], return_when=asyncio.FIRST_COMPLETED)
+            if apply_failed.done():
+                apply_failed.result()
+            apply_components_task.result()
+        finally:
+            apply_components_task.cancel()
+            for task in list(apply_tasks):
+                task.cancel()
 
         # For full sync (changed_only=False), detect and delete components that exist in
         # Kubernetes but no longer exist in the git repository
@@ -2314,15 +2593,6 @@ class AgnosticVRepo(CachedKopfObject):
                 self,
             )
 
-    async def __restore_git_checkout(self, original_checkout_ref, pr_number, logger):
-        # Restore original git checkout state
-        if original_checkout_ref and self.git_checkout_ref != original_checkout_ref:
-            try:
-                self.__git_repo_checkout(logger=logger, ref=original_checkout_ref)
-                logger.debug(f"Restored git checkout to {original_checkout_ref} after PR #{pr_number} processing")
-            except Exception as restore_error:
-                logger.warning(f"Failed to restore git checkout to {original_checkout_ref}: {restore_error}")
-
     async def manage_single_pr(self, pr_number, head_ref, head_sha, logger):
         """Process a single specific PR for webhook events"""
         logger.info(f"Processing single PR #{pr_number} ({head_ref} -> {head_sha})")
@@ -2354,33 +2624,16 @@ class AgnosticVRepo(CachedKopfObject):
                     pr_number, exception,
                 )
 
+        # Ensure git repo is cloned, main branch fetches are left to syncs under the repository lock
+        await self.git_repo_open(logger=logger)
+
         # Use PR-specific lock to prevent race conditions between webhook and polling
         async with self.get_pr_lock(pr_number):
             logger.debug(f"Acquired lock for PR #{pr_number}")
 
-            # Use git repo lock for entire PR processing to prevent race conditions
-            async with self.git_repo_lock:
-                # Store original git checkout state to restore later
-                original_checkout_ref = self.git_checkout_ref
-
-                try:
-                    # Ensure git repo is ready (but don't acquire lock since we already have it)
-                    if self.ssh_key_secret_name:
-                        await self.git_ssh_key_write()
-                    if await aiofiles.os.path.exists(self.git_repo_path):
-                        # For existing repos, use GitHub API pre-check to avoid unnecessary git fetches
-                        if await self.__has_remote_changes(logger):
-                            await asyncio.get_event_loop().run_in_executor(
-                                None, self.__git_repo_pull, logger
-                            )
-                        else:
-                            logger.debug(f"No remote changes detected for {self.name}, skipping git fetch")
-                    else:
-                        await asyncio.get_event_loop().run_in_executor(
-                            None, self.__git_repo_clone, logger
-                        )
-                    # Fetch/checkout the specific PR branch
-                    # First ensure we have the latest commits for this branch
+            try:
+                # Fetch the specific PR branch into the shared repository
+                async with self.git_repo_lock:
                     remote = self.git_repo.remotes['origin']
                     branch_refspec = f'refs/heads/{head_ref}:refs/remotes/origin/{head_ref}'
 
@@ -2399,56 +2652,38 @@ class AgnosticVRepo(CachedKopfObject):
                     # Fetch this specific branch
                     remote.fetch([branch_refspec], callbacks=callbacks)
                     logger.debug(f"Fetched branch {head_ref}")
+                    target_sha = str(self.git_repo.references[f'refs/remotes/origin/{head_ref}'].target)
+            except (pygit2.GitError, KeyError) as exception:
+                logger.warning(
+                    "Unable to fetch branch %s for PR #%s: %s",
+                    head_ref, pr_number, exception,
+                )
+                raise kopf.TemporaryError(
+                    f"Failed to checkout PR branch {head_ref}: {exception}",
+                    delay=60,
+                )
 
-                    # Checkout the PR branch with force (like git checkout --force)
-                    branch_ref = self.git_repo.references[f'refs/remotes/origin/{head_ref}']
-                    target_commit = self.git_repo.get(branch_ref.target)
-
-                    # Force checkout - equivalent to git checkout --force
-                    # This overwrites any local changes and resolves conflicts
-                    self.git_repo.checkout_tree(
-                        target_commit.tree,
-                        strategy=(pygit2.GIT_CHECKOUT_FORCE |
-                                 pygit2.GIT_CHECKOUT_REMOVE_UNTRACKED |
-                                 pygit2.GIT_CHECKOUT_REMOVE_IGNORED)
-                    )
-
-                    # Use string conversion for set_head (compatible with all pygit2 versions)
-                    target_sha = str(branch_ref.target)
-                    self.git_repo.set_head(f'refs/remotes/origin/{head_ref}')
-                    self.git_hexsha = target_sha
-                    self.git_checkout_ref = head_ref
-
-                    logger.info(
-                        "Checked out %s [%s] for PR #%s",
-                        head_ref, self.git_hexsha, pr_number,
-                    )
-
-                except (pygit2.GitError, KeyError) as exception:
-                    logger.warning(
-                        "Unable to checkout branch %s for PR #%s: %s",
-                        head_ref, pr_number, exception,
-                    )
-                    await self.__restore_git_checkout(original_checkout_ref, pr_number, logger)
-                    raise kopf.TemporaryError(
-                        f"Failed to checkout PR branch {head_ref}: {exception}",
-                        delay=60,
-                    )
+            # Process the PR in its own worktree so that main branch syncs and other PRs are not blocked
+            async with self.git_worktree(head_ref, logger=logger, hexsha=target_sha) as worktree:
+                logger.info(
+                    "Checked out %s [%s] for PR #%s",
+                    head_ref, worktree.hexsha, pr_number,
+                )
 
                 # Update tracking
                 self.last_pr_commits[f"pr-{pr_number}"] = head_sha
 
                 # Get components that changed in this specific PR and handle deletions
-                # (all git operations must stay inside this git_repo_lock)
+                # (all file access must stay inside this worktree lock)
                 try:
                     # Get the files that changed in this PR compared to the base branch
                     changed_files = await self.git_changed_files_in_branch(logger=logger, ref=head_ref)
                     logger.info(f"PR #{pr_number} changed {len(changed_files)} files: {changed_files[:10]}...")
 
-                    # Get components that were added/modified in the PR (we're already on the correct ref with git_repo_lock)
+                    # Get components that were added/modified in the PR
                     if changed_files:
                         component_paths, error_msg = await self.agnosticv_get_component_paths_from_related_files(
-                            changed_files, logger=logger
+                            changed_files, worktree=worktree, logger=logger
                         )
                         if error_msg:
                             logger.warning(f"Error getting component paths for PR #{pr_number}: {error_msg}")
@@ -2462,12 +2697,11 @@ class AgnosticVRepo(CachedKopfObject):
                         pr_number, exception,
                     )
                     changed_files = []
-                    component_sources = []
-                    components_to_delete = []
+                    component_paths = []
 
                 # Only check for deleted components if files were actually deleted in the PR
                 # This prevents false positives when PRs only add new files
-                deleted_files = [f for f in changed_files if not os.path.exists(os.path.join(self.agnosticv_path, f))]
+                deleted_files = [f for f in changed_files if not os.path.exists(os.path.join(worktree.agnosticv_path, f))]
 
                 if deleted_files:
                     logger.info(f"PR #{pr_number} deleted {len(deleted_files)} files, checking for component deletions")
@@ -2499,7 +2733,7 @@ class AgnosticVRepo(CachedKopfObject):
 
                 component_sources = [
                     ComponentSource(
-                        path, ref=head_ref, hexsha=self.git_hexsha, pull_request_number=pr_number
+                        path, ref=head_ref, hexsha=worktree.hexsha, pull_request_number=pr_number
                     ) for path in component_paths
                 ]
 
@@ -2507,28 +2741,31 @@ class AgnosticVRepo(CachedKopfObject):
                 if components_to_delete:
                     logger.info(f"Found {len(components_to_delete)} components to delete in PR #{pr_number}: {components_to_delete[:5]}...")
 
-                # Process each component (inside git_repo_lock to ensure consistency)
+                # Process each component (inside worktree lock to ensure consistency)
                 pr_messages = []
                 errors = []
 
-                for source in component_sources:
-                    try:
-                        logger.debug(f"Processing component {source.name} for PR #{pr_number}")
-                        result = await self._manage_component_no_lock(source=source, logger=logger)
-
-                        if result == 'created':
-                            pr_messages.append(f"Created AgnosticVComponent `{source.name}`")
-                            logger.info(f"Created component {source.name} for PR #{pr_number}")
-                        elif result == 'updated':
-                            pr_messages.append(f"Updated AgnosticVComponent `{source.name}`")
-                            logger.info(f"Updated component {source.name} for PR #{pr_number}")
-                        elif result == 'unchanged':
-                            pr_messages.append(f"Component `{source.name}` up to date (no change)")
-                            logger.info(f"Component {source.name} unchanged for PR #{pr_number}")
-
-                    except AgnosticVProcessingError as error:
-                        errors.append(str(error))
-                        logger.error(f"Error processing component {source.name} for PR #{pr_number}: {error}")
+                async def apply_component(source):
+                    async with self.apply_semaphore:
+                        try:
+                            logger.debug(f"Processing component {source.name} for PR #{pr_number}")
+                            result = await self._manage_component_no_lock(source=source, worktree=worktree, logger=logger)
+
+                            if result == 'created':
+                                pr_messages.append(f"Created AgnosticVComponent `{source.name}`")
+                                logger.info(f"Created component {source.name} for PR #{pr_number}")
+                            elif result == 'updated':
+                                pr_messages.append(f"Updated AgnosticVComponent `{source.name}`")
+                                logger.info(f"Updated component {source.name} for PR #{pr_number}")
+                            elif result == 'unchanged':
+                                pr_messages.append(f"Component `{source.name}` up to date (no change)")
+                                logger.info(f"Component {source.name} unchanged for PR #{pr_number}")
+
+                        except AgnosticVProcessingError as error:
+                            errors.append(str(error))
+                            logger.error(f"Error processing component {source.name} for PR #{pr_number}: {error}")
+
+                await asyncio.gather(*[apply_component(source) for source in component_sources])
 
             # Add preview messages for components that would be deleted if PR is merged
             if components_to_delete:
@@ -2569,9 +2806,6 @@ class AgnosticVRepo(CachedKopfObject):
             else:
                 logger.info(f"No components would be deleted by PR #{pr_number}")
 
-            # Restore original git checkout state
-            await self.__restore_git_checkout(original_checkout_ref, pr_number, logger)
-
             # Post GitHub comment
             if errors:
                 message = "❌ Error applying pull request for integration:\n\n" + "\n".join(
@@ -2635,3 +2869,68 @@ class ComponentSource:
         if self.pull_request_number:
             return f"{self.path} [PR {self.pull_request_number}]"
         return self.path
+
+class GitWorktree:
+    """
+    Working tree for one ref of an AgnosticVRepo that shares the object store
+    of the repository clone, so that each ref stays checked out and refs can
+    be processed concurrently. Callers hold the lock while checking out and
+    reading files from the worktree.
+    """
+    def __init__(self, path, ref, repo_path, context_dir=None):
+        self.agnosticv_path = os.path.join(path, context_dir) if context_dir else path
+        self.hexsha = None
+        self.lock = asyncio.Lock()
+        self.path = path
+        self.ref = ref
+        self.repo_path = repo_path
+
+    def __str__(self):
+        return f"worktree {self.ref} [{self.hexsha}]"
+
+    async def checkout(self, hexsha, logger):
+        if hexsha == self.hexsha:
+            return
+        try:
+            if await aiofiles.os.path.exists(os.path.join(self.path, '.git')):
+                await self.git('-C', self.path, 'checkout', '--quiet', '--detach', '--force', hexsha)
+                await self.git('-C', self.path, 'clean', '--quiet', '-ffdx')
+            else:
+                # Worktree may be left incomplete by an interrupted add
+                try:
+                    await aioshutil.rmtree(self.path)
+                except FileNotFoundError:
+                    pass
+                await self.git('-C', self.repo_path, 'worktree', 'prune')
+                await self.git('-C', self.repo_path, 'worktree', 'add', '--quiet', '--detach', '--force', self.path, hexsha)
+                logger.info(f"Added worktree for {self.ref} at {self.path}")
+        except AgnosticVExecError as e:
+            self.hexsha = None
+            raise kopf.TemporaryError(f"Unable to checkout commit {hexsha} for {self.ref}: {e}", delay=60)
+        self.hexsha = hexsha
+
+    async def git(self, *cmd):
+        proc = await asyncio.create_subprocess_exec(
+            'git', *cmd,
+            stdout = asyncio.subprocess.PIPE,
+            stderr = asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise AgnosticVExecError(f"git {' '.join(cmd)}\n{stderr.decode('utf-8').strip()}")
+        return stdout.decode('utf-8')
+
+    async def remove(self, logger):
+        self.hexsha = None
+        if not await aiofiles.os.path.exists(self.path):
+            return
+        try:
+            await self.git('-C', self.repo_path, 'worktree', 'remove', '--force', self.path)
+        except AgnosticVExecError as e:
+            logger.warning(f"Failed to remove worktree for {self.ref}, deleting directory: {e}")
+            try:
+                await aioshutil.rmtree(self.path)
+            except FileNotFoundError:
+                pass
+            await self.git('-C', self.repo_path, 'worktree', 'prune')
+        logger.info(f"Removed worktree for {self.ref}")
@@ -0,0 +1,77 @@
+import json
+import os
+import time
+import uuid
+
+import aiofiles
+import aiofiles.os
+
+# Add aiofiles wrapping for utime
+aiofiles.os.utime = aiofiles.os.wrap(os.utime)
+
+class DefinitionCache:
+    """
+    Merged component definitions stored on disk by content key.
+
+    Keys are computed from the git object ids of every file that contributes
+    to a component along with the settings applied to the merged definition,
+    so entries never become stale. Entries that have not been used within
+    max_age seconds are removed by prune().
+    """
+    def __init__(self, path, max_age=7 * 24 * 3600):
+        self.hits = 0
+        self.max_age = max_age
+        self.misses = 0
+        self.path = path
+
+    def entry_path(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    async def get(self, key):
+        path = self.entry_path(key)
+        try:
+            async with aiofiles.open(path) as fh:
+                definition = json.loads(await fh.read())
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Refresh modification time so that prune keeps entries that are in use
+        try:
+            await aiofiles.os.utime(path)
+        except FileNotFoundError:
+            pass
+        return definition
+
+    async def set(self, key, definition):
+        path = self.entry_path(key)
+        await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename so that readers never see partial entries
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp_path, mode='w') as fh:
+            await fh.write(json.dumps(definition))
+        await aiofiles.os.replace(tmp_path, path)
+
+    async def prune(self):
+        """Remove entries not used within max_age, returning the number removed."""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        try:
+            subdirs = await aiofiles.os.listdir(self.path)
+        except FileNotFoundError:
+            return 0
+        for subdir in subdirs:
+            subdir_path = os.path.join(self.path, subdir)
+            try:
+                names = await aiofiles.os.listdir(subdir_path)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            for name in names:
+                path = os.path.join(subdir_path, name)
+                try:
+                    if (await aiofiles.os.stat(path)).st_mtime < cutoff:
+                        await aiofiles.os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
@@ -143,27 +143,24 @@ async def agnoticvrepo_daemon(logger, stopped, **kwargs):
             await asyncio.sleep(agnosticv_repo.polling_interval)
             if stopped:
                 break
-            async with agnosticv_repo.lock:
-                await agnosticv_repo.manage_components(
-                    changed_only = True,
-                    logger = logger,
-                )
+            # Queue sync so that it is coalesced with syncs triggered by webhooks
+            await agnosticv_repo.queue_sync(logger=logger).wait()
     except asyncio.CancelledError:
         pass
 
 async def manage_agnosticv_component(agnosticv_component: AgnosticVComponent, logger) -> None:
     """Manage all configuraton configured from AgnosticV"""
-    anarchy_governor, deprecated_anarchy_governors = await manage_anarchy_governor(
-        agnosticv_component, logger
-    )
-    catalog_item = await manage_catalog_item(
-        agnosticv_component, logger
-    )
-    resource_provider = await manage_resource_provider(
-        agnosticv_component, logger
-    )
-    tenant_cluster_pool = await manage_tenant_cluster_pool(
-        agnosticv_component, logger
+    # Child objects are independent of each other, so reconcile them concurrently
+    (
+        (anarchy_governor, deprecated_anarchy_governors),
+        catalog_item,
+        resource_provider,
+        tenant_cluster_pool,
+    ) = await asyncio.gather(
+        manage_anarchy_governor(agnosticv_component, logger),
+        manage_catalog_item(agnosticv_component, logger),
+        manage_resource_provider(agnosticv_component, logger),
+        manage_tenant_cluster_pool(agnosticv_component, logger),
     )
 
     await agnosticv_component.patch_status({
@@ -227,19 +224,24 @@ async def manage_anarchy_governor(
     elif await anarchy_governor.update_from_agnosticv(anarchy_governor_definition):
         logger.info("Updated %s", anarchy_governor)
 
-    deprecated_anarchy_governors = []
-    for item in agnosticv_component.deprecated_anarchy_governors:
+    async def update_deprecated_anarchy_governor(item):
         try:
             deprecated_anarchy_governor = await OperatorRuntime.babylon.get_anarchy_governor(
                 name=item.name,
                 namespace=item.namespace,
             )
             await deprecated_anarchy_governor.update_from_agnosticv(anarchy_governor_definition)
-            deprecated_anarchy_governors.append(deprecated_anarchy_governor)
+            return deprecated_anarchy_governor
         except BabylonApiException as exception:
             if exception.status != 404:
                 raise
 
+    deprecated_anarchy_governors = [
+        item for item in await asyncio.gather(*[
+            update_deprecated_anarchy_governor(item) for item in agnosticv_component.deprecated_anarchy_governors
+        ]) if item is not None
+    ]
+
     return anarchy_governor, deprecated_anarchy_governors
 
 async def manage_catalog_item(
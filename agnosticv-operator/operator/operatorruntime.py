@@ -4,6 +4,7 @@ import kubernetes_asyncio
 import yaml
 
 from babylon_async import BabylonClient
+from ratelimitedapiclient import RateLimitedApiClient
 
 class OperatorRuntime():
     """Class with access to global objects such as Babylon api."""
@@ -21,6 +22,12 @@ class OperatorRuntime():
     resource_broker_version = os.environ.get('RESOURCE_BROKER_VERSION', 'v1')
     resource_broker_namespace = os.environ.get('RESOURCE_BROKER_NAMESPACE', 'poolboy')
     default_polling_interval = os.environ.get('POLLING_INTERVAL', '1m')
+    agnosticv_merge_concurrency = int(os.environ.get('AGNOSTICV_MERGE_CONCURRENCY', 8))
+    component_apply_concurrency = int(os.environ.get('COMPONENT_APPLY_CONCURRENCY', 10))
+    kubernetes_api_burst = int(os.environ.get('KUBERNETES_API_BURST', 100))
+    kubernetes_api_qps = float(os.environ.get('KUBERNETES_API_QPS', 50))
+    work_queue_debounce = float(os.environ.get('WORK_QUEUE_DEBOUNCE', 5))
+    work_queue_max_delay = float(os.environ.get('WORK_QUEUE_MAX_DELAY', 30))
     execution_environment_allow_list = yaml.safe_load(os.environ.get('EXECUTION_ENVIRONMENT_ALLOW_LIST', '[]'))
 
     agnosticv_repo_label = f"{agnosticv_api_group}/AgnosticVRepo"
@@ -55,7 +62,10 @@ class OperatorRuntime():
                     'Please set OPERATOR_NAMESPACE environment variable.'
                 )
 
-        cls.api_client = kubernetes_asyncio.client.ApiClient()
+        cls.api_client = RateLimitedApiClient(
+            burst = cls.kubernetes_api_burst,
+            qps = cls.kubernetes_api_qps,
+        )
         cls.babylon = await BabylonClient.create(api_client=cls.api_client)
         cls.core_v1_api = kubernetes_asyncio.client.CoreV1Api(cls.api_client)
         cls.custom_objects_api = kubernetes_asyncio.client.CustomObjectsApi(cls.api_client)
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+import kubernetes_asyncio
+
+class RateLimitedApiClient(kubernetes_asyncio.client.ApiClient):
+    """
+    Kubernetes API client that limits requests to qps per second on average,
+    allowing bursts of up to burst requests, so that applying many changes
+    at once does not overload the API server.
+    """
+    def __init__(self, *args, qps=50, burst=100, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.burst = burst
+        self.qps = qps
+        self.rate_limit_lock = asyncio.Lock()
+        self.tokens = burst
+        self.tokens_updated = time.monotonic()
+
+    async def acquire(self):
+        if not self.qps:
+            return
+        async with self.rate_limit_lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.tokens_updated) * self.qps)
+            self.tokens_updated = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.qps)
+                self.tokens = 1
+                self.tokens_updated = time.monotonic()
+            self.tokens -= 1
+
+    async def request(self, *args, **kwargs):
+        await self.acquire()
+        return await super().request(*args, **kwargs)
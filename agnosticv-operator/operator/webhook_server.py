@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import json
 import logging
 import hmac
@@ -31,6 +32,7 @@ class WebhookServer:
         self.app.router.add_post('/webhook/github', self.handle_github_webhook)
         self.app.router.add_get('/health', self.health_check)
         self.app.router.add_get('/webhook/status', self.webhook_status)
+        self.app.router.add_get('/webhook/jobs/{job_id}', self.webhook_job_status)
 
     async def health_check(self, request):
         """Health check endpoint"""
@@ -48,6 +50,20 @@ class WebhookServer:
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
+    async def webhook_job_status(self, request):
+        """Status of a job queued by a webhook event"""
+        job_id = request.match_info['job_id']
+        for agnosticv_repo in AgnosticVRepo.cache.values():
+            job = agnosticv_repo.work_queue.get_job(job_id)
+            if job:
+                return web.json_response({
+                    "repo": agnosticv_repo.name,
+                    **job.as_dict(),
+                })
+        return web.json_response({
+            "error": "Job not found"
+        }, status=404)
+
     def verify_github_signature(self, payload_body, signature, secret):
         """Verify GitHub webhook signature"""
         if not secret:
@@ -160,6 +176,8 @@ class WebhookServer:
             async for agnosticv_repo in AgnosticVRepo.list(namespace=current_namespace):
                 # Check if git URL matches
                 if self.urls_match(agnosticv_repo.git_url, repo_url):
+                    # Use the cached AgnosticVRepo so that events share the work queue of the daemon
+                    agnosticv_repo = AgnosticVRepo.cache.get(agnosticv_repo.name, agnosticv_repo)
                     if event_type == 'push':
                         # For push events, match on the pushed branch
                         ref = payload.get('ref', '')
@@ -257,28 +275,24 @@ class WebhookServer:
             self.webhook_secret_cache.clear()
             self.logger.debug("Cleared entire webhook secret cache")
 
-    async def trigger_repo_update(self, agnosticv_repo, branch_name, commits):
-        """Trigger immediate repository update"""
-        try:
-            # Create a logger for this operation
-            logger = logging.getLogger(f'webhook.{agnosticv_repo.name}')
-            safe_branch_name = str(branch_name).replace('\r', '').replace('\n', '')
-
-            logger.info(f"Webhook triggered update for {agnosticv_repo.name}#{safe_branch_name}")
-
-            # Acquire lock and trigger update (skip PR processing for push events)
-            async with agnosticv_repo.lock:
-                await agnosticv_repo.manage_components(
-                    changed_only=True,
-                    logger=logger,
-                    skip_pr_processing=True
-                )
-
-            logger.info(f"Webhook update completed for {agnosticv_repo.name}")
+    def trigger_repo_update(self, agnosticv_repo, branch_name, commits, head_sha=None):
+        """Queue repository update, returning the queued job"""
+        # Create a logger for this operation
+        logger = logging.getLogger(f'webhook.{agnosticv_repo.name}')
+        safe_branch_name = self._sanitize_for_log(branch_name)
+        safe_head_sha = self._sanitize_for_log(head_sha)
+
+        # Skip PR processing for push events, pushes received before the update
+        # starts are coalesced into a single update
+        job = agnosticv_repo.queue_sync(
+            changed_only=True,
+            hexsha=safe_head_sha or None,
+            logger=logger,
+            skip_pr_processing=True,
+        )
 
-        except Exception as e:
-            self.logger.error(f"Error triggering repo update: {e}")
-            raise
+        logger.info(f"Webhook queued update job {job.id} for {agnosticv_repo.name}#{safe_branch_name} ({safe_head_sha})")
+        return job
 
     async def handle_push_event(self, agnosticv_repos, payload, payload_body, signature, repo_full_name):
         """Handle push webhook events"""
@@ -310,13 +324,18 @@ class WebhookServer:
                 continue
 
             try:
-                # For push events, trigger immediate update of the main branch only
+                # For push events, queue update of the main branch only
                 # This processes the main branch changes without processing all PRs
-                await self.trigger_repo_update(agnosticv_repo, branch_name, commits)
+                head_sha = payload.get('after')
+                if not isinstance(head_sha, str) or not head_sha.strip('0'):
+                    # Branch deletions have no head commit to sync to
+                    head_sha = None
+                job = self.trigger_repo_update(agnosticv_repo, branch_name, commits, head_sha)
                 results.append({
                     "repo": agnosticv_repo.name,
                     "branch": branch_name,
-                    "status": "updated"
+                    "status": "queued",
+                    "job": job.id
                 })
             except Exception as e:
                 self.logger.error(f"Error processing push for {agnosticv_repo.name}: {e}")
@@ -333,12 +352,12 @@ class WebhookServer:
             }, status=401)
 
         return web.json_response({
-            "status": "success",
+            "status": "queued",
             "event_type": "push",
             "branch": branch_name,
             "commits_processed": len(commits),
             "repositories": results
-        }, status=200)
+        }, status=202)
 
     async def handle_pull_request_event(self, agnosticv_repos, payload, payload_body, signature, repo_full_name):
         """Handle pull_request webhook events"""
@@ -417,41 +436,59 @@ class WebhookServer:
                 )
                 continue
 
+            # Events for the same PR received before its job starts are coalesced so
+            # that only the newest event is processed, with the newest head commit
             try:
                 if action == 'opened':
                     # PR opened - add to tracking (preloadPullRequests already verified)
-                    await self.trigger_pr_processing(agnosticv_repo, pr_number, head_ref, head_sha, 'opened')
+                    job = self.queue_pr_job(
+                        agnosticv_repo, pr_number, self.trigger_pr_processing,
+                        head_ref=head_ref, head_sha=head_sha, action='opened'
+                    )
                     results.append({
                         "repo": agnosticv_repo.name,
                         "pr": pr_number,
-                        "action": "added_to_tracking"
+                        "action": "added_to_tracking",
+                        "job": job.id
                     })
                 elif action == 'closed':
                     # PR closed - remove from tracking (all repos, regardless of preloadPullRequests)
                     merged = pull_request.get('merged', False)
                     safe_merged = self._sanitize_for_log(merged)
                     self.logger.info(f"PR #{pr_number} closed: merged={safe_merged}, state={safe_pr_state}")
-                    await self.trigger_pr_cleanup(agnosticv_repo, pr_number, head_ref, merged)
+                    job = self.queue_pr_job(
+                        agnosticv_repo, pr_number, self.trigger_pr_cleanup,
+                        head_ref=head_ref, merged=merged
+                    )
                     results.append({
                         "repo": agnosticv_repo.name,
                         "pr": pr_number,
-                        "action": "removed_from_tracking"
+                        "action": "removed_from_tracking",
+                        "job": job.id
                     })
                 elif action == 'reopened':
                     # PR reopened - add back to tracking (preloadPullRequests already verified)
-                    await self.trigger_pr_processing(agnosticv_repo, pr_number, head_ref, head_sha, 'reopened')
+                    job = self.queue_pr_job(
+                        agnosticv_repo, pr_number, self.trigger_pr_processing,
+                        head_ref=head_ref, head_sha=head_sha, action='reopened'
+                    )
                     results.append({
                         "repo": agnosticv_repo.name,
                         "pr": pr_number,
-                        "action": "readded_to_tracking"
+                        "action": "readded_to_tracking",
+                        "job": job.id
                     })
                 elif action == 'synchronize':
                     # PR updated - update tracking (preloadPullRequests already verified)
-                    await self.trigger_pr_processing(agnosticv_repo, pr_number, head_ref, head_sha, 'updated')
+                    job = self.queue_pr_job(
+                        agnosticv_repo, pr_number, self.trigger_pr_processing,
+                        head_ref=head_ref, head_sha=head_sha, action='updated'
+                    )
                     results.append({
                         "repo": agnosticv_repo.name,
                         "pr": pr_number,
-                        "action": "updated_tracking"
+                        "action": "updated_tracking",
+                        "job": job.id
                     })
 
             except Exception as e:
@@ -469,12 +506,12 @@ class WebhookServer:
             }, status=401)
 
         return web.json_response({
-            "status": "success",
+            "status": "queued",
             "event_type": "pull_request",
             "action": action,
             "pr_number": pr_number,
             "repositories": results
-        }, status=200)
+        }, status=202)
 
     def _sanitize_for_log(self, value):
         """Sanitize user-controlled values to prevent log injection."""
@@ -482,6 +519,15 @@ class WebhookServer:
             return ''
         return str(value).replace('\r', '').replace('\n', '')
 
+    def queue_pr_job(self, agnosticv_repo, pr_number, run, **params):
+        """Queue run for a PR, replacing any queued job for the same PR"""
+        job = agnosticv_repo.work_queue.submit(
+            f"pr-{pr_number}", run,
+            agnosticv_repo=agnosticv_repo, pr_number=pr_number, **params
+        )
+        self.logger.info(f"Queued job {job.id} for {agnosticv_repo.name} PR #{pr_number}")
+        return job
+
     async def trigger_pr_processing(self, agnosticv_repo, pr_number, head_ref, head_sha, action):
         """Process a single specific PR for webhook events"""
         try:
@@ -491,14 +537,14 @@ class WebhookServer:
             safe_head_sha = self._sanitize_for_log(head_sha)
             logger.info(f"PR {safe_action}: #{pr_number} ({safe_head_ref} -> {safe_head_sha})")
 
-            # Process only this specific PR
-            async with agnosticv_repo.lock:
-                await agnosticv_repo.manage_single_pr(
-                    pr_number=pr_number,
-                    head_ref=head_ref,
-                    head_sha=head_sha,
-                    logger=logger
-                )
+            # Process only this specific PR, in its own worktree under the PR lock so that
+            # main branch syncs and other PRs are not blocked
+            await agnosticv_repo.manage_single_pr(
+                pr_number=pr_number,
+                head_ref=head_ref,
+                head_sha=head_sha,
+                logger=logger
+            )
 
             logger.info(f"PR {safe_action} processing completed for #{pr_number}")
 
@@ -506,27 +552,18 @@ class WebhookServer:
             self.logger.error(f"Error processing PR {pr_number}: {e}")
             raise
 
-    async def trigger_main_branch_sync(self, agnosticv_repo, pr_number, logger):
-        """Trigger a full main branch reprocessing after PR merge"""
-        try:
-            logger.info(f"Starting full main branch sync after PR #{pr_number} merge")
-
-            # Trigger incremental sync to detect deletions properly
-            async with agnosticv_repo.lock:
-                await agnosticv_repo.manage_components(
-                    changed_only=True,
-                    skip_pr_processing=True,  # Skip PR processing, only main branch
-                    logger=logger
-                )
-
-                # Clean up the merged PR from all component used-by-prs annotations
-                await self.cleanup_merged_pr_annotations(agnosticv_repo, pr_number, logger)
-
-            logger.info(f"Completed full main branch sync after PR #{pr_number} merge")
-
-        except Exception as e:
-            logger.error(f"Failed to sync main branch after PR #{pr_number} merge: {e}")
-            # Don't raise - this is a background operation that shouldn't fail the webhook
+    def trigger_main_branch_sync(self, agnosticv_repo, pr_number, logger):
+        """Queue a main branch reprocessing after PR merge"""
+        # Trigger incremental sync to detect deletions properly, coalesced with the sync
+        # queued for the push of the merge commit
+        job = agnosticv_repo.queue_sync(
+            changed_only=True,
+            skip_pr_processing=True,  # Skip PR processing, only main branch
+            logger=logger,
+            # Clean up the merged PR from all component used-by-prs annotations
+            after_sync=[functools.partial(self.cleanup_merged_pr_annotations, agnosticv_repo, pr_number)],
+        )
+        logger.info(f"Queued main branch sync job {job.id} after PR #{pr_number} merge")
 
     async def cleanup_merged_pr_annotations(self, agnosticv_repo, pr_number, logger):
         """Remove merged PR from used-by-prs annotations on affected components only"""
@@ -660,6 +697,10 @@ class WebhookServer:
         try:
             logger = logging.getLogger(f'webhook.{agnosticv_repo.name}.pr{pr_number}')
             safe_head_ref = str(head_ref).replace('\r', '').replace('\n', '')
+
+            # The PR head is no longer processed, so its worktree is not needed
+            await agnosticv_repo.git_worktree_remove(head_ref, logger=logger)
+
             if merged:
                 logger.info(
                     "PR merged: #%s (%s) - triggering full main branch reprocessing",
@@ -667,7 +708,7 @@ class WebhookServer:
                 )
                 # For merged PRs, trigger a full reprocessing of the main branch
                 # This will apply any deletions and ensure components are up to date
-                await self.trigger_main_branch_sync(agnosticv_repo, pr_number, logger)
+                self.trigger_main_branch_sync(agnosticv_repo, pr_number, logger)
                 return
             logger.info(
                 "PR closed without merge: #%s (%s) - deleting components",
@@ -688,27 +729,15 @@ class WebhookServer:
                         # Ensure git repo is up to date before checking main branch
                         await agnosticv_repo.git_repo_sync(logger=logger)
 
-                        # Use git repo lock to prevent conflicts with other git operations
-                        async with agnosticv_repo.git_repo_lock:
-                            # Checkout main branch to see what components exist there
-                            original_ref = agnosticv_repo.git_checkout_ref
-                            if original_ref != agnosticv_repo.git_ref:
-                                logger.debug(f"Checking out main branch {agnosticv_repo.git_ref} to get component list")
-                                agnosticv_repo._AgnosticVRepo__git_repo_checkout(logger=logger, ref=agnosticv_repo.git_ref)
-
-                            main_component_paths, error_msg = await agnosticv_repo._agnosticv_get_all_component_paths_no_lock()
-                            if error_msg:
-                                logger.warning(f"Error getting main branch components: {error_msg}")
-                                main_component_paths = []
-
-                            # Convert paths to component names
-                            main_branch_component_names = {path_to_name(path) for path in main_component_paths}
-                            logger.debug(f"Main branch has {len(main_branch_component_names)} components")
-
-                            # Restore original checkout
-                            if original_ref and original_ref != agnosticv_repo.git_ref:
-                                logger.debug(f"Restoring checkout to {original_ref}")
-                                agnosticv_repo._AgnosticVRepo__git_repo_checkout(logger=logger, ref=original_ref)
+                        # List components in the main branch worktree to see what exists there
+                        main_component_paths, error_msg = await agnosticv_repo.agnosticv_get_all_component_paths()
+                        if error_msg:
+                            logger.warning(f"Error getting main branch components: {error_msg}")
+                            main_component_paths = []
+
+                        # Convert paths to component names
+                        main_branch_component_names = {path_to_name(path) for path in main_component_paths}
+                        logger.debug(f"Main branch has {len(main_branch_component_names)} components")
 
                     except Exception as e:
                         logger.warning(f"Failed to get main branch components for PR cleanup: {e}")
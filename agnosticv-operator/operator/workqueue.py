@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from collections import OrderedDict
+
+class WorkQueueJob:
+    def __init__(self, key, run, params):
+        self.coalesced = 0
+        self.error = None
+        self.finished = asyncio.Event()
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.queued_at = self.updated_at = time.monotonic()
+        self.run = run
+        self.state = 'queued'
+
+    def as_dict(self):
+        ret = {
+            "coalesced": self.coalesced,
+            "id": self.id,
+            "key": self.key,
+            "state": self.state,
+        }
+        if self.error:
+            ret['error'] = str(self.error)
+        return ret
+
+    async def wait(self):
+        """Wait for job to finish, raising any exception from the job."""
+        await self.finished.wait()
+        if self.error:
+            raise self.error
+
+class WorkQueue:
+    """
+    Queue of jobs for one AgnosticVRepo that coalesces jobs by key.
+
+    A job submitted while another job with the same key is still queued is
+    merged into the queued job rather than added, so a burst of events results
+    in a single run with the newest parameters. Jobs start once no job for the
+    key has been submitted for debounce seconds, or max_delay seconds after
+    the job was first queued, whichever comes first. Only one job runs at a
+    time for each key while jobs with different keys run concurrently.
+    """
+    def __init__(self, name, debounce=5, max_delay=30, max_finished_jobs=100):
+        self.debounce = debounce
+        self.finished_jobs = OrderedDict()
+        self.logger = logging.getLogger(f"workqueue.{name}")
+        self.max_delay = max_delay
+        self.max_finished_jobs = max_finished_jobs
+        self.queued_jobs = {}
+        self.running_jobs = {}
+        self.task = None
+        self.tasks = set()
+        self.wakeup = asyncio.Event()
+
+    def get_job(self, job_id):
+        for jobs in (self.queued_jobs, self.running_jobs, self.finished_jobs):
+            for job in jobs.values():
+                if job.id == job_id:
+                    return job
+        return None
+
+    def submit(self, key, run, merge=None, **params):
+        """
+        Queue call of run with params under key, returning the job. If a job for
+        key is already queued then it is updated to call run with params, or with
+        the result of merge(queued_params, params) if merge is given.
+        """
+        job = self.queued_jobs.get(key)
+        if job:
+            job.coalesced += 1
+            job.params = merge(job.params, params) if merge else params
+            job.run = run
+            job.updated_at = time.monotonic()
+            self.logger.debug(f"Coalesced {key} into queued job {job.id}")
+        else:
+            job = WorkQueueJob(key=key, run=run, params=params)
+            self.queued_jobs[key] = job
+            self.logger.debug(f"Queued {key} job {job.id}")
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self.__dispatch())
+        self.wakeup.set()
+        return job
+
+    async def stop(self):
+        tasks = [task for task in (self.task, *self.tasks) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.task = None
+
+    async def __dispatch(self):
+        while self.queued_jobs or self.running_jobs:
+            self.wakeup.clear()
+            now = time.monotonic()
+            next_ready_at = None
+            for key, job in list(self.queued_jobs.items()):
+                if key in self.running_jobs:
+                    continue
+                ready_at = min(job.updated_at + self.debounce, job.queued_at + self.max_delay)
+                if ready_at <= now:
+                    del self.queued_jobs[key]
+                    self.running_jobs[key] = job
+                    task = asyncio.create_task(self.__run(job))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                elif next_ready_at is None or ready_at < next_ready_at:
+                    next_ready_at = ready_at
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(),
+                    timeout = None if next_ready_at is None else next_ready_at - now,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def __run(self, job):
+        job.state = 'running'
+        self.logger.info(
+            f"Running {job.key} job {job.id} after {time.monotonic() - job.queued_at:.1f}s "
+            f"with {job.coalesced} coalesced events"
+        )
+        try:
+            await job.run(**job.params)
+            job.state = 'succeeded'
+        except asyncio.CancelledError:
+            job.state = 'cancelled'
+            raise
+        except Exception as exception:
+            job.error = exception
+            job.state = 'failed'
+            self.logger.exception(f"Failed {job.key} job {job.id}")
+        finally:
+            job.finished.set()
+            del self.running_jobs[job.key]
+            self.finished_jobs[job.key, job.id] = job
+            while len(self.finished_jobs) > self.max_finished_jobs:
+                self.finished_jobs.popitem(last=False)
+            self.wakeup.set()
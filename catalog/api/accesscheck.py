@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+
+from metrics import cache_requests, operation_duration
+from singleflight import SingleFlight
+
+cache_hit = cache_requests.labels('access_review', 'hit')
+cache_miss = cache_requests.labels('access_review', 'miss')
+review_duration = operation_duration.labels('access_review')
+
+def api_client_identity(api_client):
+    """Return the effective identity of api_client for use in cache keys."""
+    headers = api_client.default_headers
+    return (
+        headers.get('Impersonate-User'),
+        tuple(sorted(headers.getlist('Impersonate-Group'))),
+    )
+
+def api_client_impersonation_headers(api_client):
+    """Return impersonation headers of api_client as a list of (header, value) tuples."""
+    return [
+        (header, value)
+        for header in ('Impersonate-User', 'Impersonate-Group')
+        for value in api_client.default_headers.getlist(header)
+    ]
+
+class AccessChecker:
+    """
+    Evaluate SelfSubjectAccessReviews with bounded concurrency and cache the
+    decisions per identity and resource attributes for a short time.
+
+    Concurrent checks for the same identity share one review. If api_client
+    is set, shared reviews are sent with it using the impersonation headers
+    of the caller's client, so that a review does not fail when the caller
+    that started it ends and closes its client.
+    """
+    def __init__(self, concurrency=20, max_entries=10000, ttl=30, api_client=None):
+        self.api_client = api_client
+        self.cache = OrderedDict()
+        self.max_entries = max_entries
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.single_flight = SingleFlight()
+        self.ttl = ttl
+
+    async def check(self, api_client, group, plural, verb, namespace=None, name=None):
+        """Return True if api_client has the requested access."""
+        key = (api_client_identity(api_client), group, plural, verb, namespace, name)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if cached[1] > time.monotonic():
+                cache_hit.inc()
+                return cached[0]
+            del self.cache[key]
+        cache_miss.inc()
+        allowed = await self.single_flight.run(
+            key,
+            lambda: self.__review(api_client, group, plural, verb, namespace, name),
+            label='access',
+        )
+        self.cache.pop(key, None)
+        self.prune()
+        self.cache[key] = (allowed, time.monotonic() + self.ttl)
+        return allowed
+
+    async def check_all(self, api_client, checks, concurrency=None):
+        """
+        Run checks concurrently, where each check is a tuple of arguments to
+        check() after api_client. Returns list of results in the same order.
+        If concurrency is given it further limits reviews for this call.
+        """
+        if not concurrency:
+            return await asyncio.gather(*[self.check(api_client, *check) for check in checks])
+
+        semaphore = asyncio.Semaphore(concurrency)
+        async def limited_check(check):
+            async with semaphore:
+                return await self.check(api_client, *check)
+        return await asyncio.gather(*[limited_check(check) for check in checks])
+
+    def prune(self):
+        """
+        Remove expired entries, then the oldest entries if still over size.
+        Entries are kept in insertion order and share one ttl, so expired
+        entries are always at the front and pruning stops at the first live one.
+        """
+        now = time.monotonic()
+        while self.cache and next(iter(self.cache.values()))[1] <= now:
+            self.cache.popitem(last=False)
+        while len(self.cache) >= self.max_entries:
+            self.cache.popitem(last=False)
+
+    async def __review(self, api_client, group, plural, verb, namespace, name):
+        self_subject_access_review = {
+            "apiVersion": "authorization.k8s.io/v1",
+            "kind": "SelfSubjectAccessReview",
+            "spec": {
+                "resourceAttributes": {
+                    "group": group,
+                    "resource": plural,
+                    "verb": verb,
+                }
+            }
+        }
+        if namespace is not None:
+            self_subject_access_review['spec']['resourceAttributes']['namespace'] = namespace
+        if name is not None:
+            self_subject_access_review['spec']['resourceAttributes']['name'] = name
+        header_params = None
+        if self.api_client:
+            header_params = api_client_impersonation_headers(api_client)
+            api_client = self.api_client
+        async with self.semaphore:
+            with review_duration.time():
+                (data, status, headers) = await api_client.call_api(
+                    '/apis/authorization.k8s.io/v1/selfsubjectaccessreviews',
+                    'POST',
+                    auth_settings = ['BearerToken'],
+                    body = self_subject_access_review,
+                    header_params = header_params,
+                    response_types_map = {
+                        201: "object",
+                        401: None,
+                    }
+                )
+        return data.get('status', {}).get('allowed', False)
@@ -2,26 +2,50 @@
 
 import asyncio
 import base64
-import copy
 import gzip
 import json
 import logging
 import os
+import random
 import re
+import sys
 import time
 from datetime import datetime, timezone
 from urllib.parse import quote, urlencode, urlparse
 
-import aiohttp
 from aiohttp import web
 
 import kubernetes_asyncio
 import redis.asyncio as redis
 from hotfix import HotfixKubeApiClient
+from jsontransform import apply_projection, decode_json, encode_json, iter_encoded_json, parse_projection, run_transform, select_content_encoding, strip_managed_fields, transform_json
 from randomstring import random_string
-from audit import audit_log, audit_log_api_action
+from accesscheck import AccessChecker, api_client_identity, api_client_impersonation_headers
+from audit import (
+    FileAuditWriter, HttpAuditWriter, LogAuditWriter, StreamAuditWriter,
+    audit_log, audit_log_api_action, parse_k8s_path, start_audit_sink, stop_audit_sink,
+)
+from catalogitemcache import CatalogItemCache
+from groupmembership import GroupMembershipCache
+from metrics import cache_requests, http_request_duration, http_requests, http_requests_in_flight, operation_duration, registry
+from multiworkshopcache import MultiWorkshopCache
+from responsecache import ResponseCache
+from sessionstore import SessionStore
+from sandboxtoken import SandboxTokenManager
+from sandboxtemplate import SandboxTemplateCache
+from seatallocator import SeatAllocator
+from singleflight import SingleFlight
+from systemstatus import SystemStatusCache, etag_matches, system_status_from_configmap_data
+from tracing import OtlpExporter, TraceBudgets, trace_request
+from upstream import UpstreamSessions
 
 app_api_client = core_v1_api = custom_objects_api = None
+catalog_item_cache = None
+group_membership_cache = None
+multiworkshop_cache = None
+system_status_cache = None
+sandbox_template_cache = None
+selfpacedlab_seat_allocator = workshop_seat_allocator = None
 console_url = None
 redis_connection = None
 babylon_namespace = os.environ.get('BABYLON_NAMESPACE')
@@ -39,11 +63,81 @@ jira_base_url = os.environ.get('JIRA_BASE_URL', 'https://redhat.atlassian.net')
 jira_api_token = os.environ.get('JIRA_API_TOKEN')
 jira_user_email = os.environ.get('JIRA_USER_EMAIL')
 jira_project_key = os.environ.get('JIRA_PROJECT_KEY', 'RHDPSPPT')
-response_cache = {}
+response_cache = None
 response_cache_clean_interval = int(os.environ.get('RESPONSE_CACHE_CLEAN_INTERVAL', 60))
+response_cache_max_entries = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000))
+# Share cached responses between replicas through redis
+response_cache_redis = os.environ.get('RESPONSE_CACHE_REDIS', 'false') == 'true'
 response_cache_clean_task = None
-session_cache = {}
+# Audit records are written by a background task to log, stdout, file, or http
+audit_sink_type = os.environ.get('AUDIT_SINK', 'log')
+audit_sink_file = os.environ.get('AUDIT_SINK_FILE')
+audit_sink_url = os.environ.get('AUDIT_SINK_URL')
+audit_batch_size = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+audit_queue_size = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+audit_sink = None
+session_cache_max_entries = int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', 10000))
+session_cache_ttl = int(os.environ.get('SESSION_CACHE_TTL', 60))
 session_lifetime = int(os.environ.get('SESSION_LIFETIME', 600))
+session_store = None
+trace_budgets = TraceBudgets.from_environment()
+trace_export_sample_rate = float(os.environ.get('TRACE_EXPORT_SAMPLE_RATE', 0))
+trace_export_url = os.environ.get('TRACE_EXPORT_URL')
+trace_exporter = None
+upstream_single_flight = SingleFlight()
+access_checker = AccessChecker(
+    concurrency = int(os.environ.get('ACCESS_CHECK_CONCURRENCY', 20)),
+    ttl = int(os.environ.get('ACCESS_CHECK_CACHE_TTL', 30)),
+)
+rbac_filter_concurrency = int(os.environ.get('RBAC_FILTER_CONCURRENCY', 10))
+# Maximum page size for proxied resource lists, 0 for no limit
+proxy_list_limit_max = int(os.environ.get('PROXY_LIST_LIMIT_MAX', 0))
+upstream_sessions = UpstreamSessions()
+sandbox_token_manager = SandboxTokenManager(upstream_sessions, sandbox_api)
+
+session_lookup_duration = operation_duration.labels('session_lookup')
+
+# Counters that components keep for their admin stats, read at scrape time
+registry.callback(
+    'babylon_catalog_api_upstream_requests_in_flight',
+    'Upstream calls currently in flight by target.',
+    ('target',),
+    lambda: {(name,): count for name, count in upstream_sessions.in_flight.items()},
+)
+registry.callback(
+    'babylon_catalog_api_single_flight_calls_total',
+    'Upstream calls issued versus coalesced into an in-flight call, by label.',
+    ('label', 'result'),
+    lambda: {
+        (label, result): stats[result]
+        for label, stats in upstream_single_flight.stats().items()
+        for result in ('coalesced', 'issued')
+    },
+    type = 'counter',
+)
+registry.callback(
+    'babylon_catalog_api_response_cache_entries',
+    'Entries in the in-process response cache.',
+    (),
+    lambda: {(): len(response_cache.entries)},
+)
+registry.callback(
+    'babylon_catalog_api_audit_records_total',
+    'Audit records written or dropped by the audit sink.',
+    ('result',),
+    lambda: {(result,): audit_sink.stats()[result] for result in ('dropped', 'written')},
+    type = 'counter',
+)
+registry.callback(
+    'babylon_catalog_api_seat_claim_conflicts_total',
+    'Seat assignment updates retried after a conflict, by assignment kind.',
+    ('plural',),
+    lambda: {
+        (allocator.plural,): allocator.conflicts
+        for allocator in (selfpacedlab_seat_allocator, workshop_seat_allocator)
+    },
+    type = 'counter',
+)
 
 logging.basicConfig(level=os.environ.get('LOGGING_LEVEL', 'INFO'))
 
@@ -62,22 +156,22 @@ def set_impersonation_for_session(api_client, session):
         api_client.default_headers.add('Impersonate-Group', group)
     return api_client
 
-async def api_proxy(method, url, headers, data=None, params=None):
-    async with aiohttp.ClientSession() as session:
-        headers = {
-            key: value for (key, value) in headers.items()
-            if key.lower() not in ('host', 'content-length')
-        }
-        if data:
-            headers['Content-Length'] = str(len(data))
-        resp = await session.request(
-            allow_redirects=False,
-            data=data,
-            headers=headers,
-            method=method,
-            params=params,
-            url=url,
-        )
+async def api_proxy(method, url, headers, upstream, data=None, params=None):
+    headers = {
+        key: value for (key, value) in headers.items()
+        if key.lower() not in ('host', 'content-length')
+    }
+    if data:
+        headers['Content-Length'] = str(len(data))
+    async with upstream_sessions.request(
+        upstream,
+        method,
+        url,
+        allow_redirects=False,
+        data=data,
+        headers=headers,
+        params=params,
+    ) as resp:
         excluded_headers = [
             'connection',
             'content-encoding',
@@ -104,7 +198,7 @@ async def api_proxy(method, url, headers, data=None, params=None):
         )
 
 async def on_startup(app):
-    global app_api_client, babylon_namespace, console_url, core_v1_api, custom_objects_api, redis_connection, response_cache_clean_task
+    global app_api_client, audit_sink, babylon_namespace, catalog_item_cache, console_url, group_membership_cache, core_v1_api, custom_objects_api, multiworkshop_cache, redis_connection, sandbox_template_cache, system_status_cache, response_cache, response_cache_clean_task, selfpacedlab_seat_allocator, session_store, trace_exporter, workshop_seat_allocator
     if os.path.exists('/run/secrets/kubernetes.io/serviceaccount'):
         kubernetes_asyncio.config.load_incluster_config()
         if not babylon_namespace:
@@ -117,28 +211,96 @@ async def on_startup(app):
                 'Unable to determine babylon namespace. '
                 'Please set BABYLON_NAMESPACE environment variable.'
             )
-    app_api_client = kubernetes_asyncio.client.ApiClient()
+    app_api_client = HotfixKubeApiClient()
+    access_checker.api_client = app_api_client
     core_v1_api = kubernetes_asyncio.client.CoreV1Api(app_api_client)
     custom_objects_api = kubernetes_asyncio.client.CustomObjectsApi(app_api_client)
+    sandbox_template_cache = SandboxTemplateCache(app_api_client, custom_objects_api)
+    selfpacedlab_seat_allocator = SeatAllocator(
+        custom_objects_api, 'selfpacedlabuserassignments', 'babylon.gpte.redhat.com/selfpacedlab'
+    )
+    workshop_seat_allocator = SeatAllocator(
+        custom_objects_api, 'workshopuserassignments', 'babylon.gpte.redhat.com/workshop'
+    )
     console_url = (
         await core_v1_api.read_namespaced_config_map('console-public', 'openshift-config-managed')
     ).data['consoleURL']
 
+    response_cache_redis_connection = None
     if 'REDIS_PASSWORD' in os.environ:
-        redis_connection = redis.Redis(
+        redis_kwargs = dict(
             db = 0,
-            decode_responses = True,
             host = os.environ.get('REDIS_SERVER', 'redis'),
             password = os.environ.get('REDIS_PASSWORD'),
             port = int(os.environ.get('REDIS_PORT', 6379)),
             username = os.environ.get('REDIS_USER', 'default'),
         )
+        redis_connection = redis.Redis(decode_responses=True, **redis_kwargs)
+        if response_cache_redis:
+            # Cached response bodies are binary
+            response_cache_redis_connection = redis.Redis(decode_responses=False, **redis_kwargs)
+
+    response_cache = ResponseCache(
+        max_entries = response_cache_max_entries,
+        redis_connection = response_cache_redis_connection,
+        ttl = response_cache_clean_interval,
+    )
+
+    session_store = SessionStore(
+        lifetime = session_lifetime,
+        max_entries = session_cache_max_entries,
+        redis_connection = redis_connection,
+        ttl = session_cache_ttl,
+    )
+    await session_store.start()
+
+    for upstream in ('admin', 'jira', 'reporting', 'sandbox'):
+        upstream_sessions.add(upstream)
+
+    if audit_sink_type == 'file':
+        audit_writer = FileAuditWriter(audit_sink_file)
+    elif audit_sink_type == 'http':
+        upstream_sessions.add('audit')
+        audit_writer = HttpAuditWriter(upstream_sessions, audit_sink_url)
+    elif audit_sink_type == 'stdout':
+        audit_writer = StreamAuditWriter(sys.stdout)
+    else:
+        audit_writer = LogAuditWriter()
+    audit_sink = start_audit_sink(audit_writer, batch_size=audit_batch_size, queue_size=audit_queue_size)
+
+    if trace_export_url:
+        upstream_sessions.add('otlp')
+        trace_exporter = OtlpExporter(upstream_sessions, trace_export_url)
+        trace_exporter.start()
+
+    catalog_item_cache = CatalogItemCache(custom_objects_api)
+    catalog_item_cache.informer.add_handler(on_catalog_item_event)
+    await catalog_item_cache.start()
+    group_membership_cache = GroupMembershipCache(custom_objects_api)
+    await group_membership_cache.start()
+    multiworkshop_cache = MultiWorkshopCache(custom_objects_api, catalog_item_cache.informer)
+    await multiworkshop_cache.start()
+    system_status_cache = SystemStatusCache(core_v1_api, babylon_namespace, system_status_configmap_name)
+    await system_status_cache.start()
+    await selfpacedlab_seat_allocator.start()
+    await workshop_seat_allocator.start()
 
     response_cache_clean_task = asyncio.create_task(response_cache_clean())
 
 async def on_cleanup(app):
+    await stop_audit_sink()
+    if trace_exporter:
+        await trace_exporter.stop()
     response_cache_clean_task.cancel()
     await response_cache_clean_task
+    await catalog_item_cache.stop()
+    await group_membership_cache.stop()
+    await multiworkshop_cache.stop()
+    await system_status_cache.stop()
+    await selfpacedlab_seat_allocator.stop()
+    await workshop_seat_allocator.stop()
+    await session_store.stop()
+    await upstream_sessions.close()
     await app_api_client.close()
 
 async def check_admin_access(api_client):
@@ -151,33 +313,9 @@ async def check_admin_access(api_client):
 async def check_api_access(api_client, group, plural, verb, namespace=None, name=None):
     """
     Check and return true if api_client has specified access rights.
+    Decisions are cached briefly per impersonated user and groups.
     """
-    self_subject_access_review = {
-        "apiVersion": "authorization.k8s.io/v1",
-        "kind": "SelfSubjectAccessReview",
-        "spec": {
-            "resourceAttributes": {
-                "group": group,
-                "resource": plural,
-                "verb": verb,
-            }
-        }
-    }
-    if namespace is not None:
-        self_subject_access_review['spec']['resourceAttributes']['namespace'] = namespace
-    if name is not None:
-        self_subject_access_review['spec']['resourceAttributes']['name'] = name
-    (data, status, headers) = await api_client.call_api(
-        '/apis/authorization.k8s.io/v1/selfsubjectaccessreviews',
-        'POST',
-        auth_settings = ['BearerToken'],
-        body = self_subject_access_review,
-        response_types_map = {
-            201: "object",
-            401: None,
-        }
-    )
-    return data.get('status', {}).get('allowed', False)
+    return await access_checker.check(api_client, group, plural, verb, namespace, name)
 
 async def check_user_support_access(api_client):
     """
@@ -191,10 +329,12 @@ async def get_catalog_namespaces(api_client):
     namespace_list = await core_v1_api.list_namespace(
         label_selector = f"babylon.gpte.redhat.com/interface={interface_name}" if interface_name else 'babylon.gpte.redhat.com/catalog'
     )
-    for ns in namespace_list.items:
-        if await check_api_access(
-            api_client, "babylon.gpte.redhat.com", "catalogitems", "list", ns.metadata.name
-        ):
+    allowed = await access_checker.check_all(api_client, [
+        ("babylon.gpte.redhat.com", "catalogitems", "list", ns.metadata.name)
+        for ns in namespace_list.items
+    ])
+    for ns, ns_allowed in zip(namespace_list.items, allowed):
+        if ns_allowed:
             namespaces.append({
                 'name': ns.metadata.name,
                 'displayName': ns.metadata.annotations.get('openshift.io/display-name', ns.metadata.name),
@@ -209,7 +349,15 @@ async def get_openshift_auth_user():
     return(user['metadata']['name'])
 
 async def get_user_groups(user):
-    global groups
+    """
+    Return names of groups for user from the watch-maintained group membership
+    index, falling back to listing groups until the watch is synced.
+    """
+    global groups, groups_last_update
+    user_name = user['metadata']['name'] if isinstance(user, dict) else user
+    if group_membership_cache and group_membership_cache.is_synced:
+        return group_membership_cache.get_user_groups(user_name)
+
     if groups_last_update < time.time() - 60:
         group_list = await custom_objects_api.list_cluster_custom_object(
             group='user.openshift.io',
@@ -217,45 +365,48 @@ async def get_user_groups(user):
             version='v1',
         )
         groups = group_list.get('items', [])
+        groups_last_update = time.time()
 
-    user_name = user['metadata']['name'] if isinstance(user, dict) else user
     user_groups = []
     for group in groups:
         if user_name in group.get('users', []):
             user_groups.append(group['metadata']['name'])
     return user_groups
 
-async def get_proxy_user(request):
-    email = request.headers.get('X-Forwarded-Email')
-    user = request.headers.get('X-Forwarded-User')
-    # In development get user from authentication
-    if not user and os.environ.get('ENVIRONMENT') == 'development':
-        user = await get_openshift_auth_user()
-    if not user:
-        raise web.HTTPUnauthorized(reason="No X-Forwarded-User header")
-
-    if email:
+async def get_openshift_user(email, user):
+    """Return OpenShift User by email if given, falling back to name, or None if not found."""
+    for name in (email, user):
+        if not name:
+            continue
         try:
             return await custom_objects_api.get_cluster_custom_object(
                 group='user.openshift.io',
-                name=email,
+                name=name,
                 plural='users',
                 version='v1',
             )
         except kubernetes_asyncio.client.exceptions.ApiException as exception:
             if exception.status != 404:
                 raise
+    return None
 
-    try:
-        return await custom_objects_api.get_cluster_custom_object(
-            group='user.openshift.io',
-            name=user,
-            plural='users',
-            version='v1',
-        )
-    except kubernetes_asyncio.client.exceptions.ApiException as exception:
-        if exception.status != 404:
-            raise
+async def get_proxy_user(request):
+    email = request.headers.get('X-Forwarded-Email')
+    user = request.headers.get('X-Forwarded-User')
+    # In development get user from authentication
+    if not user and os.environ.get('ENVIRONMENT') == 'development':
+        user = await get_openshift_auth_user()
+    if not user:
+        raise web.HTTPUnauthorized(reason="No X-Forwarded-User header")
+
+    cached_user = session_store.get_user((user, email))
+    if cached_user:
+        return cached_user
+
+    resolved_user = await get_openshift_user(email, user)
+    if resolved_user:
+        session_store.set_user((user, email), resolved_user)
+        return resolved_user
 
     raise web.HTTPUnauthorized(reason=f"Unable to find user by name ({user}) or email ({email})")
 
@@ -294,13 +445,8 @@ async def get_user_session(request, user):
         raise web.HTTPUnauthorized(reason="Authentication header is not a bearer token")
     token = authentication_header[7:]
 
-    session = None
-    if redis_connection:
-        session_json = await redis_connection.get(token)
-        if session_json:
-            session = json.loads(session_json)
-    else:
-        session = session_cache.get(token)
+    with session_lookup_duration.time():
+        session = await session_store.get(token)
 
     if not session:
         raise web.HTTPUnauthorized(reason="Invalid bearer token, no session for token")
@@ -326,67 +472,88 @@ async def start_user_session(user, user_groups):
     }
 
     api_client = proxy_api_client(session)
-    if await check_admin_access(api_client):
+    user_is_admin, user_is_user_support, catalog_namespaces, (user_namespace, service_namespaces) = await asyncio.gather(
+        check_admin_access(api_client),
+        check_user_support_access(api_client),
+        get_catalog_namespaces(api_client),
+        get_service_namespaces(user, api_client),
+    )
+    if user_is_admin:
         session['admin'] = True
-    elif await check_user_support_access(api_client):
+    elif user_is_user_support:
         session['roles'].append('userSupport')
 
-    session['catalogNamespaces'] = await get_catalog_namespaces(api_client)
-
-    user_namespace, service_namespaces = await get_service_namespaces(user, api_client)
+    session['catalogNamespaces'] = catalog_namespaces
     session['userNamespace'] = user_namespace
     session['serviceNamespaces'] = service_namespaces
 
     token = random_string(32)
-    if redis_connection:
-        await redis_connection.setex(token, session_lifetime, json.dumps(session, separators=(',',':')))
-    else:
-        session_cache[token] = session
+    await session_store.set(token, session)
 
     return api_client, session, token
 
-def replace_template_variables(data, job_vars):
-    """
-    Replace Jinja2-like template variables in a data structure with values from job_vars.
-
-    Template format: {{ job_vars.variable_name | default('default_value') }}
-    Only replaces variables that exist in the job_vars dictionary.
-
-    Args:
-        data: The data structure (dict, list, str, etc.) to process
-        job_vars: Dictionary containing variable values
+def request_route(request):
+    """Return route pattern matched by request for use in metrics and traces."""
+    resource = request.match_info.route.resource
+    return resource.canonical if resource else 'unmatched'
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Record request count, latency, and in-flight requests per route."""
+    route = request_route(request)
+    status = 500
+    start = time.monotonic()
+    http_requests_in_flight.inc()
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as exception:
+        status = exception.status
+        raise
+    finally:
+        http_requests_in_flight.dec()
+        http_request_duration.labels(request.method, route).observe(time.monotonic() - start)
+        http_requests.labels(request.method, route, str(status)).inc()
 
-    Returns:
-        The data structure with template variables replaced where applicable
+@web.middleware
+async def tracing_middleware(request, handler):
     """
-    if isinstance(data, dict):
-        return {key: replace_template_variables(value, job_vars) for key, value in data.items()}
-    if isinstance(data, list):
-        return [replace_template_variables(item, job_vars) for item in data]
-    if isinstance(data, str):
-        # Pattern to match both:
-        # {{ job_vars.variable_name }} and
-        # {{ job_vars.variable_name | default('default_value') }}
-        pattern = r'\{\{\s*(job_vars\.[^|\s}]+)(?:\s*\|\s*default\([\'"]([^\'"]*)[\'"]?\))?\s*\}\}'
-
-        def replace_match(match):
-            var_name = match.group(1)
-            default_value = match.group(2)  # The default value if present
-
-            # If variable exists in job_vars, use it
-            if var_name in job_vars:
-                return str(job_vars[var_name])
-            # If variable doesn't exist but there's a default value, use the default
-            elif default_value is not None:
-                return default_value
-            else:
-                # Return the original template unchanged (no variable and no default)
-                return match.group(0)
-
-        return re.sub(pattern, replace_match, data)
-    return data
+    Trace upstream calls made while handling request, logging requests that
+    are slow, fan out to many upstream calls, or exceed their route budget.
+    """
+    route = request_route(request)
+    with trace_request(
+        f"{request.method} {route}",
+        traceparent = request.headers.get('traceparent'),
+        method = request.method,
+        route = route,
+    ) as span:
+        try:
+            response = await handler(request)
+            span.set(status=response.status)
+            return response
+        except web.HTTPException as exception:
+            span.set(status=exception.status)
+            raise
+        except Exception:
+            span.set(status=500)
+            raise
+        finally:
+            span.finish()
+            logged = trace_budgets.check(route, span)
+            if trace_exporter and (logged or random.random() < trace_export_sample_rate):
+                trace_exporter.export(span)
 
 routes = web.RouteTableDef()
+@routes.get('/metrics')
+async def metrics_get(request):
+    """Expose metrics in the Prometheus text format."""
+    return web.Response(
+        body=registry.render(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
 @routes.get('/auth/session')
 async def get_auth_session(request):
     user = await get_proxy_user(request)
@@ -481,11 +648,6 @@ async def get_auth_users_info(request):
         user_groups = await get_user_groups(user_name)
         for group in user_groups:
             test_api_client.default_headers.add('Impersonate-Group', group)
-        user_is_admin = await check_admin_access(test_api_client)
-        roles = []
-        if not user_is_admin:
-            if await check_user_support_access(test_api_client):
-                roles.append('userSupport')
 
         try:
             user = await custom_objects_api.get_cluster_custom_object(
@@ -499,8 +661,15 @@ async def get_auth_users_info(request):
                 raise web.HTTPNotFound()
             raise
 
-        catalog_namespaces = await get_catalog_namespaces(test_api_client)
-        user_namespace, service_namespaces = await get_service_namespaces(user, test_api_client)
+        user_is_admin, user_is_user_support, catalog_namespaces, (user_namespace, service_namespaces) = await asyncio.gather(
+            check_admin_access(test_api_client),
+            check_user_support_access(test_api_client),
+            get_catalog_namespaces(test_api_client),
+            get_service_namespaces(user, test_api_client),
+        )
+        roles = []
+        if not user_is_admin and user_is_user_support:
+            roles.append('userSupport')
 
         ret = {
             "admin": user_is_admin,
@@ -532,6 +701,7 @@ async def provision_rating_get(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/rating/v1/request/{quote(request_uid, safe='')}/email/{quote(email, safe='')}",
     )
 
@@ -549,6 +719,7 @@ async def provision_rating_post(request):
         data=json.dumps(data),
         headers=headers,
         method="POST",
+        upstream='reporting',
         url=f"{reporting_api}/rating/v1/request/{quote(request_uid, safe='')}",
     )
 
@@ -563,6 +734,7 @@ async def bookmark_get(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/bookmark/v1/{quote(email, safe='')}",
     )
 
@@ -579,6 +751,7 @@ async def bookmark_post(request):
         data=json.dumps(data),
         headers=headers,
         method="POST",
+        upstream='reporting',
         url=f"{reporting_api}/bookmark/v1/",
     )
 
@@ -593,6 +766,7 @@ async def bookmark_delete(request):
     return await api_proxy(
         headers=headers,
         method="DELETE",
+        upstream='reporting',
         url=f"{reporting_api}/bookmark/v1/{quote(email, safe='')}/{quote(asset_uuid, safe='')}",
     )
 
@@ -606,6 +780,7 @@ async def catalog_item_rating_average(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/rating/v1/catalog/{quote(asset_uuid, safe='')}",
     )
 
@@ -622,6 +797,7 @@ async def provision_rating_get_history(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/rating/v1/catalog/{quote(asset_uuid, safe='')}/history",
     )
 
@@ -636,6 +812,7 @@ async def ratings_list(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/rating/v1/list{queryString}",
     )
 
@@ -646,6 +823,7 @@ async def incidents_get(request):
         headers=request.headers,
         method="GET",
         params=request.query,
+        upstream='admin',
         url=f"{admin_api}/api/admin/v1/incidents",
     )
 
@@ -660,6 +838,7 @@ async def create_incident(request):
         data=json.dumps(data),
         headers=request.headers,
         method="POST",
+        upstream='admin',
         url=f"{admin_api}/api/admin/v1/incidents",
     )
 
@@ -675,9 +854,46 @@ async def update_incident(request):
         data=json.dumps(data),
         headers=request.headers,
         method="POST",
+        upstream='admin',
         url=f"{admin_api}/api/admin/v1/incidents/{quote(incident_id, safe='')}",
     )
 
+@routes.get("/api/admin/request-coalescing")
+async def request_coalescing_stats(request):
+    """Report counts of issued versus coalesced upstream calls (admin only)."""
+    user = await get_proxy_user(request)
+    session = await get_user_session(request, user)
+    if not session.get('admin'):
+        raise web.HTTPForbidden()
+    return web.json_response(upstream_single_flight.stats())
+
+@routes.get("/api/admin/response-cache")
+async def response_cache_stats(request):
+    """Report response cache size and hit counts (admin only)."""
+    user = await get_proxy_user(request)
+    session = await get_user_session(request, user)
+    if not session.get('admin'):
+        raise web.HTTPForbidden()
+    return web.json_response(response_cache.stats())
+
+@routes.get("/api/admin/session-cache")
+async def session_cache_stats(request):
+    """Report session near-cache size and hit counts (admin only)."""
+    user = await get_proxy_user(request)
+    session = await get_user_session(request, user)
+    if not session.get('admin'):
+        raise web.HTTPForbidden()
+    return web.json_response(session_store.stats())
+
+@routes.get("/api/admin/upstream-pools")
+async def upstream_pool_stats(request):
+    """Report connection pool usage for outbound integrations (admin only)."""
+    user = await get_proxy_user(request)
+    session = await get_user_session(request, user)
+    if not session.get('admin'):
+        raise web.HTTPForbidden()
+    return web.json_response(upstream_sessions.stats())
+
 @routes.post("/api/admin/workshop/support")
 async def create_support(request):
     user = await get_proxy_user(request)
@@ -696,6 +912,7 @@ async def create_support(request):
         data=json.dumps(data),
         headers=request.headers,
         method="POST",
+        upstream='admin',
         url=f"{admin_api}/api/admin/v1/workshop/support",
     )
 
@@ -714,6 +931,7 @@ async def list_sfdc_accounts(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/search/accounts?{urlencode(params)}",
     )
 @routes.get("/api/salesforce/accounts/{account_id}")
@@ -730,6 +948,7 @@ async def list_sfdc_accounts(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/search/accounts/sfdc?{urlencode(params)}",
     )
 
@@ -747,9 +966,30 @@ async def salesforce_id_validation(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/sales_validation/check?{urlencode(params)}",
     )
 
+async def sandbox_api_proxy(method, url, auth_token, headers=None, data=None):
+    """
+    Proxy request to the sandbox API using a cached access token for
+    auth_token, discarding the token if the sandbox API rejects it.
+    """
+    access_token = await sandbox_token_manager.get_access_token(auth_token)
+    response = await api_proxy(
+        data=data,
+        headers={
+            **(headers or {}),
+            "Authorization": f"Bearer {access_token}",
+        },
+        method=method,
+        upstream='sandbox',
+        url=url,
+    )
+    if response.status == 401:
+        sandbox_token_manager.invalidate(auth_token)
+    return response
+
 # Expects a request body with the following structure:
 # {
 #   [
@@ -765,25 +1005,9 @@ async def salesforce_id_validation(request):
 async def catalog_item_check_availability(request):
     agnosticv_name = request.match_info.get('agnosticv_name')
     # TODO: Look if there is a resourcePool that is available for this catalog item
-    agnosticv_component = await custom_objects_api.get_namespaced_custom_object(
-        group = 'gpte.redhat.com',
-        name = agnosticv_name,
-        namespace = 'babylon-config',
-        plural = 'agnosticvcomponents',
-        version = 'v1',
-    )
-    spec = agnosticv_component.get('spec')
-    if not spec:
-        raise web.HTTPNotFound(reason="AgnosticV component has no spec")
-    definition = spec.get('definition')
-    if not definition:
-        raise web.HTTPNotFound(reason="AgnosticV component has no definition")
-    meta = definition.get('__meta__')
-    if not meta:
-        raise web.HTTPNotFound(reason="AgnosticV component has no __meta__ section")
-    sandboxes = meta.get('sandboxes')
-    if not sandboxes:
-        raise web.HTTPNotFound(reason="AgnosticV component has no sandboxes defined")
+    sandbox_templates = await sandbox_template_cache.get(agnosticv_name)
+    if sandbox_templates.error:
+        raise web.HTTPNotFound(reason=sandbox_templates.error)
 
     # Get request data (array of objects)
     request_data = await request.json()
@@ -797,38 +1021,14 @@ async def catalog_item_check_availability(request):
         # Prepend 'job_vars.param_selector_' to each annotation key
         job_vars = {f"job_vars.param_selector_{key}": value for key, value in annotations.items()}
 
-        # Find matching sandbox for this request's kind
-        for sandbox in sandboxes:
-            if sandbox.get('kind') == request_kind:
-                # Deep copy the sandbox to avoid modifying the original
-                sandbox_copy = copy.deepcopy(sandbox)
-                # Replace all template variables in the sandbox with this request's variables
-                sandbox_copy = replace_template_variables(sandbox_copy, job_vars)
-                # Create processed request object with the modified sandbox
-                resources.append(sandbox_copy)
-
-    # First, get access token from login endpoint
-    async with aiohttp.ClientSession() as session:
-        login_headers = {
-            "Authorization": f"Bearer {sandbox_api_authorization_token}"
-        }
-        async with session.get(f"{sandbox_api}/api/v1/login", headers=login_headers) as login_resp:
-            if login_resp.status != 200:
-                raise web.HTTPInternalServerError(reason=f"Failed to login to sandbox API: {login_resp.status}")
-            login_data = await login_resp.json()
-            access_token = login_data.get("access_token")
+        # Fill in this request's variables in the sandboxes matching its kind
+        resources.extend(sandbox_templates.render(request_kind, job_vars))
 
-            if not access_token:
-                raise web.HTTPInternalServerError(reason="Failed to get access token from sandbox API")
-
-    # Use access token for placements/dry-run endpoint
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-    return await api_proxy(
-        headers=headers,
+    # Use cached access token for placements/dry-run endpoint
+    return await sandbox_api_proxy(
+        auth_token=sandbox_api_authorization_token,
         data=json.dumps({"resources": resources}),
+        headers={"Content-Type": "application/json"},
         method="POST",
         url=f"{sandbox_api}/api/v1/placements/dry-run",
     )
@@ -842,23 +1042,8 @@ async def sandbox_cluster_placements(request):
 
     cluster_name = request.match_info.get('name')
 
-    async with aiohttp.ClientSession() as http_session:
-        login_headers = {
-            "Authorization": f"Bearer {shared_cluster_manager_token}"
-        }
-        async with http_session.get(f"{sandbox_api}/api/v1/login", headers=login_headers) as login_resp:
-            if login_resp.status != 200:
-                raise web.HTTPInternalServerError(reason=f"Failed to login to sandbox API: {login_resp.status}")
-            login_data = await login_resp.json()
-            access_token = login_data.get("access_token")
-            if not access_token:
-                raise web.HTTPInternalServerError(reason="Failed to get access token from sandbox API")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-    }
-    return await api_proxy(
-        headers=headers,
+    return await sandbox_api_proxy(
+        auth_token=shared_cluster_manager_token,
         method="GET",
         url=f"{sandbox_api}/api/v1/ocp-shared-cluster-configurations/{quote(cluster_name, safe='')}/placements",
     )
@@ -872,23 +1057,8 @@ async def sandbox_cluster_config(request):
 
     cluster_name = request.match_info.get('name')
 
-    async with aiohttp.ClientSession() as http_session:
-        login_headers = {
-            "Authorization": f"Bearer {shared_cluster_manager_token}"
-        }
-        async with http_session.get(f"{sandbox_api}/api/v1/login", headers=login_headers) as login_resp:
-            if login_resp.status != 200:
-                raise web.HTTPInternalServerError(reason=f"Failed to login to sandbox API: {login_resp.status}")
-            login_data = await login_resp.json()
-            access_token = login_data.get("access_token")
-            if not access_token:
-                raise web.HTTPInternalServerError(reason="Failed to get access token from sandbox API")
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-    }
-    return await api_proxy(
-        headers=headers,
+    return await sandbox_api_proxy(
+        auth_token=shared_cluster_manager_token,
         method="GET",
         url=f"{sandbox_api}/api/v1/ocp-shared-cluster-configurations/{quote(cluster_name, safe='')}",
     )
@@ -903,6 +1073,7 @@ async def catalog_item_metrics(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/catalog_item/metrics/{quote(asset_uuid, safe='')}?use_cache=true",
     )
 
@@ -919,6 +1090,7 @@ async def catalog_item_active_incidents(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/catalog_incident/active-incidents{queryString}",
     )
 
@@ -933,6 +1105,7 @@ async def catalog_item_last_incident(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/catalog_incident/last-incident/{quote(asset_uuid, safe='')}/{quote(stage, safe='')}",
     )
 
@@ -953,6 +1126,7 @@ async def catalog_item_incidents(request):
         headers=headers,
         method="POST",
         data=json.dumps(data),
+        upstream='reporting',
         url=f"{reporting_api}/catalog_incident/incidents/{quote(asset_uuid, safe='')}/{quote(stage, safe='')}",
     )
 
@@ -970,6 +1144,7 @@ async def external_item_request(request):
         headers=headers,
         method="POST",
         data=json.dumps(data),
+        upstream='reporting',
         url=f"{reporting_api}/external_item/{quote(asset_uuid, safe='')}/request",
     )
 
@@ -1055,17 +1230,17 @@ async def create_jira_wgr_ticket(request):
         "Content-Type": "application/json",
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{jira_base_url}/rest/api/3/issue",
-            headers=headers,
-            data=json.dumps(jira_payload),
-        ) as resp:
-            if resp.status not in (200, 201):
-                error_body = await resp.text()
-                logging.error(f"Jira API error ({resp.status}): {error_body}")
-                raise web.HTTPBadGateway(reason=f"Failed to create Jira ticket: {resp.status}")
-            result = await resp.json()
+    async with upstream_sessions.post(
+        'jira',
+        f"{jira_base_url}/rest/api/3/issue",
+        headers=headers,
+        data=json.dumps(jira_payload),
+    ) as resp:
+        if resp.status not in (200, 201):
+            error_body = await resp.text()
+            logging.error(f"Jira API error ({resp.status}): {error_body}")
+            raise web.HTTPBadGateway(reason=f"Failed to create Jira ticket: {resp.status}")
+        result = await resp.json()
 
     ticket_key = result['key']
     ticket_url = f"{jira_base_url}/browse/{ticket_key}"
@@ -1090,28 +1265,29 @@ async def get_jira_issue_details(request):
         "Authorization": f"Basic {credentials}",
     }
 
-    async with aiohttp.ClientSession() as http_session:
-        async with http_session.get(
-            f"{jira_base_url}/rest/api/3/issue/{issue_key}?fields=assignee,status",
-            headers=headers,
-        ) as issue_resp:
-            if issue_resp.status == 404:
-                raise web.HTTPNotFound(reason=f"Jira issue {issue_key} not found")
-            if issue_resp.status != 200:
-                error_body = await issue_resp.text()
-                logging.error(f"Jira API error fetching issue ({issue_resp.status}): {error_body}")
-                raise web.HTTPBadGateway(reason=f"Failed to fetch Jira issue: {issue_resp.status}")
-            issue_data = await issue_resp.json()
-
-        async with http_session.get(
-            f"{jira_base_url}/rest/api/3/issue/{issue_key}/comment?orderBy=-created",
-            headers=headers,
-        ) as comments_resp:
-            if comments_resp.status != 200:
-                error_body = await comments_resp.text()
-                logging.error(f"Jira API error fetching comments ({comments_resp.status}): {error_body}")
-                raise web.HTTPBadGateway(reason=f"Failed to fetch Jira comments: {comments_resp.status}")
-            comments_data = await comments_resp.json()
+    async with upstream_sessions.get(
+        'jira',
+        f"{jira_base_url}/rest/api/3/issue/{issue_key}?fields=assignee,status",
+        headers=headers,
+    ) as issue_resp:
+        if issue_resp.status == 404:
+            raise web.HTTPNotFound(reason=f"Jira issue {issue_key} not found")
+        if issue_resp.status != 200:
+            error_body = await issue_resp.text()
+            logging.error(f"Jira API error fetching issue ({issue_resp.status}): {error_body}")
+            raise web.HTTPBadGateway(reason=f"Failed to fetch Jira issue: {issue_resp.status}")
+        issue_data = await issue_resp.json()
+
+    async with upstream_sessions.get(
+        'jira',
+        f"{jira_base_url}/rest/api/3/issue/{issue_key}/comment?orderBy=-created",
+        headers=headers,
+    ) as comments_resp:
+        if comments_resp.status != 200:
+            error_body = await comments_resp.text()
+            logging.error(f"Jira API error fetching comments ({comments_resp.status}): {error_body}")
+            raise web.HTTPBadGateway(reason=f"Failed to fetch Jira comments: {comments_resp.status}")
+        comments_data = await comments_resp.json()
 
     assignee_field = issue_data.get('fields', {}).get('assignee')
     status_field = issue_data.get('fields', {}).get('status')
@@ -1183,17 +1359,17 @@ async def add_jira_issue_comment(request):
         "Content-Type": "application/json",
     }
 
-    async with aiohttp.ClientSession() as http_session:
-        async with http_session.post(
-            f"{jira_base_url}/rest/api/3/issue/{issue_key}/comment",
-            headers=headers,
-            data=json.dumps(jira_body),
-        ) as resp:
-            if resp.status not in (200, 201):
-                error_body = await resp.text()
-                logging.error(f"Jira API error posting comment ({resp.status}): {error_body}")
-                raise web.HTTPBadGateway(reason=f"Failed to post Jira comment: {resp.status}")
-            result = await resp.json()
+    async with upstream_sessions.post(
+        'jira',
+        f"{jira_base_url}/rest/api/3/issue/{issue_key}/comment",
+        headers=headers,
+        data=json.dumps(jira_body),
+    ) as resp:
+        if resp.status not in (200, 201):
+            error_body = await resp.text()
+            logging.error(f"Jira API error posting comment ({resp.status}): {error_body}")
+            raise web.HTTPBadGateway(reason=f"Failed to post Jira comment: {resp.status}")
+        result = await resp.json()
 
     audit_log('jira_comment_added', user=user_email, details={'ticket': issue_key})
     return web.json_response({"ok": True, "id": result.get('id')})
@@ -1233,16 +1409,16 @@ async def update_jira_issue_labels(request):
         "Content-Type": "application/json",
     }
 
-    async with aiohttp.ClientSession() as http_session:
-        async with http_session.put(
-            f"{jira_base_url}/rest/api/3/issue/{issue_key}",
-            headers=headers,
-            data=json.dumps({"update": {"labels": update_ops}}),
-        ) as resp:
-            if resp.status not in (200, 204):
-                error_body = await resp.text()
-                logging.error(f"Jira API error updating labels ({resp.status}): {error_body}")
-                raise web.HTTPBadGateway(reason=f"Failed to update Jira labels: {resp.status}")
+    async with upstream_sessions.put(
+        'jira',
+        f"{jira_base_url}/rest/api/3/issue/{issue_key}",
+        headers=headers,
+        data=json.dumps({"update": {"labels": update_ops}}),
+    ) as resp:
+        if resp.status not in (200, 204):
+            error_body = await resp.text()
+            logging.error(f"Jira API error updating labels ({resp.status}): {error_body}")
+            raise web.HTTPBadGateway(reason=f"Failed to update Jira labels: {resp.status}")
 
     audit_log('jira_labels_updated', user=user['metadata']['name'], details={'ticket': issue_key, 'add': add_labels, 'remove': remove_labels})
     return web.json_response({"ok": True})
@@ -1258,6 +1434,7 @@ async def usage_cost_request(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/usage-cost/request/{quote(request_id, safe='')}",
     )
 
@@ -1271,6 +1448,7 @@ async def usage_cost_workshop(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/usage-cost/workshop/{quote(workshop_id, safe='')}",
     )
 
@@ -1291,6 +1469,7 @@ async def user_activity(request):
     return await api_proxy(
         headers=headers,
         method="GET",
+        upstream='reporting',
         url=f"{reporting_api}/users/activity/{quote(email, safe='')}{queryString}",
     )
 
@@ -1302,110 +1481,12 @@ async def public_multiworkshop_get(request):
     how workshops are found by workshop-id.
     """
     multi_workshop_id = request.match_info.get('multi_workshop_id')
-
-    try:
-        multiworkshop_list = await custom_objects_api.list_cluster_custom_object(
-            group='babylon.gpte.redhat.com',
-            version='v1',
-            plural='multiworkshops',
-            label_selector=f"babylon.gpte.redhat.com/multi-workshop-id={multi_workshop_id}",
-        )
-        if not multiworkshop_list.get('items'):
-            return web.json_response({'error': 'MultiWorkshop not found'}, status=404)
-        multiworkshop = multiworkshop_list['items'][0]
-
-        # Enrich each catalog asset with availableSeats from its Workshop status
-        assets = multiworkshop.get('spec', {}).get('assets', [])
-        for asset in assets:
-            asset_type = asset.get('type', 'Workshop')
-            workshop_name = asset.get('name')
-            workshop_namespace = asset.get('namespace')
-
-            if asset_type == 'external':
-                asset_url = asset.get('url', '')
-                parsed = urlparse(asset_url)
-                if parsed.path and parsed.path.strip('/').split('/')[0] == 'lab-event':
-                    catalog_item_name = parsed.path.rstrip('/').split('/')[-1]
-                    try:
-                        handles_resp = await custom_objects_api.list_namespaced_custom_object(
-                            group='poolboy.gpte.redhat.com',
-                            version='v1',
-                            namespace='poolboy',
-                            plural='resourcehandles',
-                            label_selector=f"poolboy.gpte.redhat.com/resource-pool-name={catalog_item_name}",
-                        )
-                        available = sum(
-                            1 for h in handles_resp.get('items', [])
-                            if not h.get('spec', {}).get('resourceClaim')
-                            and h.get('status', {}).get('healthy')
-                            and h.get('status', {}).get('ready')
-                        )
-                        asset['availableSeats'] = available
-                    except Exception as e:
-                        logging.error(f"Error getting available seats: {e}")
-                    
-                    catalog_item_namespace = "babylon-catalog-prod"
-                    try:
-                        catalog_item = await custom_objects_api.get_namespaced_custom_object(
-                            group='babylon.gpte.redhat.com',
-                            version='v1',
-                            namespace=catalog_item_namespace,
-                            plural='catalogitems',
-                            name=catalog_item_name
-                        )
-                        catalog_item_labels = catalog_item.get('metadata', {}).get('labels', {})
-                        product_family = catalog_item_labels.get('babylon.gpte.redhat.com/Product_Family')
-                        product = catalog_item_labels.get('babylon.gpte.redhat.com/Product')
-                        if product_family:
-                            asset['productFamily'] = product_family
-                        if product:
-                            asset['product'] = product
-                    except Exception as e:
-                        logging.error(f"Error fetching catalogItem {catalog_item_namespace}/{catalog_item_name}: {e}")
-                continue
-
-            elif not workshop_name or not workshop_namespace:
-                continue
-            try:
-                workshop = await custom_objects_api.get_namespaced_custom_object(
-                    group='babylon.gpte.redhat.com',
-                    version='v1',
-                    namespace=workshop_namespace,
-                    plural='workshops',
-                    name=workshop_name
-                )
-                available = workshop.get('status', {}).get('userCount', {}).get('available')
-                if available is not None:
-                    asset['availableSeats'] = available
-
-                catalog_item_name = workshop.get('metadata', {}).get('labels', {}).get('babylon.gpte.redhat.com/catalogItemName')
-                catalog_item_namespace = workshop.get('metadata', {}).get('labels', {}).get('babylon.gpte.redhat.com/catalogItemNamespace')
-                if catalog_item_name and catalog_item_namespace:
-                    try:
-                        catalog_item = await custom_objects_api.get_namespaced_custom_object(
-                            group='babylon.gpte.redhat.com',
-                            version='v1',
-                            namespace=catalog_item_namespace,
-                            plural='catalogitems',
-                            name=catalog_item_name
-                        )
-                        catalog_item_labels = catalog_item.get('metadata', {}).get('labels', {})
-                        product_family = catalog_item_labels.get('babylon.gpte.redhat.com/Product_Family')
-                        product = catalog_item_labels.get('babylon.gpte.redhat.com/Product')
-                        if product_family:
-                            asset['productFamily'] = product_family
-                        if product:
-                            asset['product'] = product
-                    except Exception as e:
-                        logging.error(f"Error fetching catalogItem {catalog_item_namespace}/{catalog_item_name}: {e}")
-            except Exception as e:
-                logging.error(f"Error getting available seats: {e}")
-                pass
-        return web.json_response(multiworkshop)
-
-    except Exception as e:
-        logging.error(f"Error fetching multiworkshop {multi_workshop_id}: {str(e)}")
-        return web.json_response({'error': 'Internal server error'}, status=500)
+    status, data = await upstream_single_flight.run(
+        ('GET', '/api/event', multi_workshop_id, None),
+        lambda: multiworkshop_cache.get(multi_workshop_id),
+        label='event',
+    )
+    return web.json_response(data, status=status)
 
 @routes.get("/api/workshop/{workshop_id}")
 async def workshop_get(request):
@@ -1413,11 +1494,16 @@ async def workshop_get(request):
     Fetch workshop for a workshop attendee in order to present overview.
     """
     workshop_id = request.match_info.get('workshop_id')
-    workshop_list = await custom_objects_api.list_cluster_custom_object(
-        group='babylon.gpte.redhat.com',
-        label_selector=f"babylon.gpte.redhat.com/workshop-id={workshop_id}",
-        plural='workshops',
-        version='v1',
+    label_selector = f"babylon.gpte.redhat.com/workshop-id={workshop_id}"
+    workshop_list = await upstream_single_flight.run(
+        ('GET', '/apis/babylon.gpte.redhat.com/v1/workshops', label_selector, None),
+        lambda: custom_objects_api.list_cluster_custom_object(
+            group='babylon.gpte.redhat.com',
+            label_selector=label_selector,
+            plural='workshops',
+            version='v1',
+        ),
+        label='workshop',
     )
     if not workshop_list.get('items'):
         raise web.HTTPNotFound()
@@ -1471,15 +1557,8 @@ async def workshop_post(request):
     elif workshop_access_password:
         raise web.HTTPBadRequest()
 
-    workshop_user_assignments = await custom_objects_api.list_namespaced_custom_object(
-        group='babylon.gpte.redhat.com',
-        label_selector=f"babylon.gpte.redhat.com/workshop={workshop_name}",
-        namespace=workshop_namespace,
-        plural='workshopuserassignments',
-        version='v1',
-    )
-
-    if not workshop_user_assignments.get('items'):
+    seat_index = await workshop_seat_allocator.get_index(workshop_namespace, workshop_name)
+    if not seat_index.assignments:
         raise web.HTTPNotFound()
 
     ret = {
@@ -1493,33 +1572,19 @@ async def workshop_post(request):
             or workshop['metadata'].get('annotations', {}).get('demo.redhat.com/info-message-template')
     }
 
-    for user_assignment in workshop_user_assignments.get('items', []):
-        if email == user_assignment['spec'].get('assignment', {}).get('email'):
-            ret['assignment'] = user_assignment['spec']
-            return web.json_response(ret)
+    user_assignment = seat_index.get_by_email(email)
+    if user_assignment is not None:
+        ret['assignment'] = user_assignment['spec']
+        return web.json_response(ret)
 
     if not workshop_open_registration:
         raise web.HTTPConflict()
 
-    for user_assignment in workshop_user_assignments.get('items', []):
-        if not 'assignment' in user_assignment['spec']:
-            try:
-                user_assignment['spec']['assignment'] = {"email": email}
-                await custom_objects_api.replace_namespaced_custom_object(
-                    body=user_assignment,
-                    group='babylon.gpte.redhat.com',
-                    name=user_assignment['metadata']['name'],
-                    namespace=user_assignment['metadata']['namespace'],
-                    plural='workshopuserassignments',
-                    version='v1',
-                )
-                ret['assignment'] = user_assignment['spec']
-                return web.json_response(ret)
-            except kubernetes_asyncio.client.exceptions.ApiException as exception:
-                if exception.status != 409:
-                    raise
-
-    raise web.HTTPConflict()
+    user_assignment = await workshop_seat_allocator.claim(seat_index, workshop_namespace, workshop_name, email)
+    if user_assignment is None:
+        raise web.HTTPConflict()
+    ret['assignment'] = user_assignment['spec']
+    return web.json_response(ret)
 
 
 @routes.get("/api/selfpacedlab/{selfpacedlab_id}")
@@ -1587,15 +1652,8 @@ async def selfpacedlab_post(request):
     elif selfpacedlab_access_password:
         raise web.HTTPBadRequest()
 
-    selfpacedlab_user_assignments = await custom_objects_api.list_namespaced_custom_object(
-        group='babylon.gpte.redhat.com',
-        label_selector=f"babylon.gpte.redhat.com/selfpacedlab={selfpacedlab_name}",
-        namespace=selfpacedlab_namespace,
-        plural='selfpacedlabuserassignments',
-        version='v1',
-    )
-
-    if not selfpacedlab_user_assignments.get('items'):
+    seat_index = await selfpacedlab_seat_allocator.get_index(selfpacedlab_namespace, selfpacedlab_name)
+    if not seat_index.assignments:
         raise web.HTTPNotFound()
 
     ret = {
@@ -1609,33 +1667,19 @@ async def selfpacedlab_post(request):
             or selfpacedlab['metadata'].get('annotations', {}).get('demo.redhat.com/info-message-template')
     }
 
-    for user_assignment in selfpacedlab_user_assignments.get('items', []):
-        if email == user_assignment['spec'].get('assignment', {}).get('email'):
-            ret['assignment'] = user_assignment['spec']
-            return web.json_response(ret)
+    user_assignment = seat_index.get_by_email(email)
+    if user_assignment is not None:
+        ret['assignment'] = user_assignment['spec']
+        return web.json_response(ret)
 
     if not selfpacedlab_open_registration:
         raise web.HTTPConflict()
 
-    for user_assignment in selfpacedlab_user_assignments.get('items', []):
-        if not 'assignment' in user_assignment['spec']:
-            try:
-                user_assignment['spec']['assignment'] = {"email": email}
-                await custom_objects_api.replace_namespaced_custom_object(
-                    body=user_assignment,
-                    group='babylon.gpte.redhat.com',
-                    name=user_assignment['metadata']['name'],
-                    namespace=user_assignment['metadata']['namespace'],
-                    plural='selfpacedlabuserassignments',
-                    version='v1',
-                )
-                ret['assignment'] = user_assignment['spec']
-                return web.json_response(ret)
-            except kubernetes_asyncio.client.exceptions.ApiException as exception:
-                if exception.status != 409:
-                    raise
-
-    raise web.HTTPConflict()
+    user_assignment = await selfpacedlab_seat_allocator.claim(seat_index, selfpacedlab_namespace, selfpacedlab_name, email)
+    if user_assignment is None:
+        raise web.HTTPConflict()
+    ret['assignment'] = user_assignment['spec']
+    return web.json_response(ret)
 
 
 
@@ -1644,34 +1688,13 @@ async def get_system_status_from_configmap():
     Read system status from the ConfigMap.
     Returns default values if ConfigMap doesn't exist or on error.
     """
-    default_status = {
-        'workshops_ordering_blocked': False,
-        'workshops_ordering_blocked_message': '',
-        'services_ordering_blocked': False,
-        'services_ordering_blocked_message': '',
-        'wg_blocked_dates': [],
-        'last_updated_by': '',
-        'last_updated_at': '',
-    }
+    default_status = system_status_from_configmap_data(None)
     try:
         configmap = await core_v1_api.read_namespaced_config_map(
             name=system_status_configmap_name,
             namespace=babylon_namespace
         )
-        data = configmap.data or {}
-        try:
-            wg_blocked_dates = json.loads(data.get('wg_blocked_dates', '[]'))
-        except (json.JSONDecodeError, TypeError):
-            wg_blocked_dates = []
-        return {
-            'workshops_ordering_blocked': data.get('workshops_ordering_blocked', 'false').lower() == 'true',
-            'workshops_ordering_blocked_message': data.get('workshops_ordering_blocked_message', ''),
-            'services_ordering_blocked': data.get('services_ordering_blocked', 'false').lower() == 'true',
-            'services_ordering_blocked_message': data.get('services_ordering_blocked_message', ''),
-            'wg_blocked_dates': wg_blocked_dates,
-            'last_updated_by': data.get('last_updated_by', ''),
-            'last_updated_at': data.get('last_updated_at', ''),
-        }
+        return system_status_from_configmap_data(configmap.data)
     except kubernetes_asyncio.client.exceptions.ApiException as e:
         if e.status == 404:
             logging.warning(f"System status ConfigMap '{system_status_configmap_name}' not found in namespace '{babylon_namespace}'")
@@ -1688,9 +1711,23 @@ async def get_system_status(request):
     """
     Get current system status including workshop/service ordering blocks.
     This endpoint is publicly accessible (no auth required) so the UI can check status.
+    Status is served from the watch-backed cache once synced, with an ETag so
+    that clients can revalidate without transferring the body.
     """
-    status = await get_system_status_from_configmap()
-    return web.json_response(status)
+    if not system_status_cache or not system_status_cache.is_synced:
+        status = await get_system_status_from_configmap()
+        return web.json_response(status, headers={'Cache-Control': 'no-cache'})
+    headers = {
+        'Cache-Control': 'no-cache',
+        'ETag': system_status_cache.etag,
+    }
+    if etag_matches(system_status_cache.etag, request.headers.get('If-None-Match')):
+        return web.Response(status=304, headers=headers)
+    return web.Response(
+        body=system_status_cache.body,
+        content_type='application/json',
+        headers=headers,
+    )
 
 
 @routes.patch("/api/system/status")
@@ -1796,8 +1833,9 @@ async def update_system_status(request):
 
         audit_log('system_status_updated', user=user['metadata']['name'], details=data)
 
-        # Return updated status
-        return web.json_response(await get_system_status_from_configmap())
+        # Update cache immediately rather than waiting on the watch event
+        system_status_cache.set_data(current_data)
+        return web.json_response(system_status_cache.status)
 
     except kubernetes_asyncio.client.exceptions.ApiException as e:
         logging.error(f"Error updating system status ConfigMap: {e}")
@@ -1837,36 +1875,45 @@ async def openshift_api_list_by_get_rbac(request):
             auth_settings = ['BearerToken'],
             body = await request.json() if request.can_read_body else None,
             header_params = header_params,
-            query_params = [(k, v) for k, v in request.query.items()] if request.query else None,
+            query_params = get_upstream_query_params(request),
             _preload_content = False,
         )
-        data = json.loads(await response.read())
+        raw_data = await response.read()
+        data = await run_transform(len(raw_data), json.loads, raw_data)
+        projection = get_projection(request)
 
         # Filter list result by only items for which get is allowed
+        items = data.get('items', [])
+        filter_start = time.monotonic()
+        allowed = await access_checker.check_all(
+            api_client,
+            [(api_group, plural, 'get', namespace, item['metadata']['name']) for item in items],
+            concurrency = rbac_filter_concurrency,
+        )
+        filter_duration = time.monotonic() - filter_start
         filtered_items = []
-        for item in data.get('items', []):
-            if await check_api_access(
-                api_client, api_group, plural, 'get', namespace, item['metadata']['name']
-            ):
-                # Strip out metadata.managedFields
-                item['metadata'].pop('managedFields', None)
+        for item, item_allowed in zip(items, allowed):
+            if item_allowed:
                 filtered_items.append(item)
         data['items'] = filtered_items
+        logging.info(
+            f"Filtered {plural} in {namespace} for {session['user']} by get access: "
+            f"{len(filtered_items)} of {len(items)} allowed in {filter_duration:.3f}s"
+        )
 
         headers={
             key: val for key, val in response.headers.items()
             if key.lower() not in ('content-encoding', 'content-length', 'content-type', 'transfer-encoding')
         }
+        headers['Server-Timing'] = f'rbac-filter;dur={filter_duration * 1000:.1f};desc="{len(items)} items checked"'
 
-        data = gzip.compress(bytes(json.dumps(data), 'utf-8'), compresslevel=5)
-        headers['Content-Encoding'] = 'gzip'
-        headers['Content-Type'] = 'application/json'
+        content_encoding = select_content_encoding(request.headers.get('Accept-Encoding'))
+        data = apply_projection(strip_managed_fields(data), projection)
+        if content_encoding:
+            data = await run_transform(len(raw_data), encode_json, data, content_encoding)
+        set_content_headers(headers, content_encoding)
 
-        return web.Response(
-            body=data,
-            headers=headers,
-            status=response.status,
-        )
+        return await proxy_response(request, response.status, headers, data)
     except kubernetes_asyncio.client.exceptions.ApiException as exception:
         if exception.body:
             return web.Response(
@@ -1880,6 +1927,63 @@ async def openshift_api_list_by_get_rbac(request):
     finally:
         await api_client.close()
 
+def get_catalog_item_cache_response(request):
+    """
+    Return response for CatalogItem get or list from the watch-backed cache.
+    Returns None if the cache is not synced or the query cannot be handled
+    from the cache so that the request is proxied to the API instead.
+    """
+    if not catalog_item_cache or not catalog_item_cache.is_synced:
+        return None
+    # Cached response bodies are gzip compressed
+    if select_content_encoding(request.headers.get('Accept-Encoding')) != 'gzip':
+        return None
+    namespace = request.match_info.get('namespace')
+    name = request.match_info.get('name')
+    projection = get_projection(request)
+    if name:
+        if set(request.query.keys()) - {'projection'}:
+            return None
+        status, body = catalog_item_cache.get(namespace, name, projection=projection)
+    else:
+        if set(request.query.keys()) - {'continue', 'labelSelector', 'limit', 'projection'}:
+            return None
+        try:
+            status, body = catalog_item_cache.list(
+                namespace,
+                continue_token = request.query.get('continue'),
+                label_selector = request.query.get('labelSelector'),
+                limit = get_list_limit(request.query.get('limit')),
+                projection = projection,
+            )
+        except ValueError:
+            return None
+    return web.Response(
+        body=body,
+        headers={
+            'Content-Encoding': 'gzip',
+            'Content-Type': 'application/json',
+            'Vary': 'Accept-Encoding',
+        },
+        status=status,
+    )
+
+def on_catalog_item_event(event_type, obj, previous):
+    """
+    Set response cache version of the namespace from its CatalogItems so that
+    replicas derive the same version and share cached responses, including
+    after writes through this API once the change is seen by the watch.
+    Versions are set on first use for changes seen in the initial list.
+    """
+    if catalog_item_cache.is_synced:
+        namespace = obj['metadata']['namespace']
+        response_cache.set_version(namespace, catalog_item_cache.namespace_digest(namespace))
+
+def get_response_cache_version(namespace):
+    if catalog_item_cache and catalog_item_cache.is_synced:
+        response_cache.set_version(namespace, catalog_item_cache.namespace_digest(namespace))
+    return response_cache.get_version(namespace)
+
 @routes.get("/apis/babylon.gpte.redhat.com/v1/namespaces/{namespace}/catalogitems")
 @routes.get("/apis/babylon.gpte.redhat.com/v1/namespaces/{namespace}/catalogitems/{name}")
 async def openshift_api_proxy_with_cache(request):
@@ -1894,16 +1998,25 @@ async def openshift_api_proxy_with_cache(request):
     else:
         raise web.HTTPForbidden()
 
-    resp, cache_time = response_cache.get(request.path_qs, (None, None))
-    if resp is not None and time.time() - cache_time < response_cache_clean_interval:
+    resp = get_catalog_item_cache_response(request)
+    if resp is not None:
+        return resp
+
+    cache_key = f"{select_content_encoding(request.headers.get('Accept-Encoding')) or 'identity'}:{request.path_qs}"
+    cache_version = get_response_cache_version(namespace)
+    cached = await response_cache.get(namespace, cache_version, cache_key)
+    if cached is not None:
+        status, headers, body = cached
         return web.Response(
-            body=resp.body,
-            headers=resp.headers,
-            status=resp.status,
+            body=body,
+            headers=headers,
+            status=status,
         )
 
     resp = await openshift_api_proxy(request)
-    response_cache[request.path_qs] = (resp, time.time())
+    # Uncompressed responses are streamed and not cached
+    if resp.status == 200 and isinstance(resp, web.Response):
+        await response_cache.set(namespace, cache_version, cache_key, resp.status, resp.headers, resp.body)
     return resp
 
 @routes.delete("/{path:apis?/.*}")
@@ -1921,57 +2034,42 @@ async def openshift_api_proxy(request, api_client=None):
         opened_api_client = True
         api_client = proxy_api_client(session)
 
+    request_body = None
     try:
         await set_impersonation_for_request(api_client, session, request)
 
-        header_params = {}
-        if request.headers.get('Accept'):
-            header_params['Accept'] = request.headers['Accept']
-        if request.content_type and request.can_read_body:
-            header_params['Content-Type'] = request.content_type
-
         request_body = await request.json() if request.can_read_body else None
-
-        response = await api_client.call_api(
-            request.path,
-            request.method,
-            auth_settings = ['BearerToken'],
-            body = request_body,
-            header_params = header_params,
-            query_params = [(k, v) for k, v in request.query.items()] if request.query else None,
-            _preload_content = False,
-        )
-        data = json.loads(await response.read())
-
-        # Strip out metadata.managedFields
-        data['metadata'].pop('managedFields', None)
-        for item in data.get('items', []):
-            item['metadata'].pop('managedFields', None)
-
-        headers={
-            key: val for key, val in response.headers.items()
-            if key.lower() not in ('content-encoding', 'content-length', 'content-type', 'transfer-encoding')
-        }
-
-        data = gzip.compress(bytes(json.dumps(data), 'utf-8'), compresslevel=5)
-        headers['Content-Encoding'] = 'gzip'
-        headers['Content-Type'] = 'application/json'
-
-        if request.method != 'GET':
+        content_encoding = select_content_encoding(request.headers.get('Accept-Encoding'))
+
+        if request.method == 'GET':
+            # Shared call is sent with the app client, the client of this request is closed when it ends
+            impersonation_headers = api_client_impersonation_headers(api_client)
+            status, headers, data = await upstream_single_flight.run(
+                (
+                    request.method,
+                    request.path,
+                    request.query_string,
+                    request.headers.get('Accept'),
+                    content_encoding,
+                    api_client_identity(api_client),
+                ),
+                lambda: openshift_api_proxy_call(
+                    request, app_api_client, request_body, content_encoding, impersonation_headers
+                ),
+                label='kube',
+            )
+        else:
+            status, headers, data = await openshift_api_proxy_call(request, api_client, request_body, content_encoding)
             audit_log_api_action(
                 user=session['user'],
                 effective_user=api_client.default_headers.get('Impersonate-User'),
                 method=request.method,
                 path=request.path,
-                status=response.status,
+                status=status,
                 body=request_body,
             )
 
-        return web.Response(
-            body=data,
-            headers=headers,
-            status=response.status,
-        )
+        return await proxy_response(request, status, headers, data)
     except kubernetes_asyncio.client.exceptions.ApiException as exception:
         if request.method != 'GET':
             audit_log_api_action(
@@ -1995,19 +2093,111 @@ async def openshift_api_proxy(request, api_client=None):
         if opened_api_client:
             await api_client.close()
 
+async def openshift_api_proxy_call(request, api_client, request_body, content_encoding, impersonation_headers=None):
+    """
+    Send proxied request to the API and return status, headers, and body
+    with metadata.managedFields stripped, encoded with content_encoding.
+    Without content_encoding the body is returned as data to be streamed
+    by proxy_response. Impersonation headers, if given, are sent in addition
+    to the headers of api_client.
+    """
+    header_params = list(impersonation_headers or [])
+    if request.headers.get('Accept'):
+        header_params.append(('Accept', request.headers['Accept']))
+    if request.content_type and request.can_read_body:
+        header_params.append(('Content-Type', request.content_type))
+
+    response = await api_client.call_api(
+        request.path,
+        request.method,
+        auth_settings = ['BearerToken'],
+        body = request_body,
+        header_params = header_params,
+        query_params = get_upstream_query_params(request),
+        _preload_content = False,
+    )
+    raw_data = await response.read()
+    if content_encoding:
+        data = await run_transform(
+            len(raw_data), transform_json, raw_data, content_encoding, 5, get_projection(request)
+        )
+    else:
+        data = await run_transform(len(raw_data), decode_json, raw_data, get_projection(request))
+
+    headers={
+        key: val for key, val in response.headers.items()
+        if key.lower() not in ('content-encoding', 'content-length', 'content-type', 'transfer-encoding')
+    }
+    set_content_headers(headers, content_encoding)
+    return response.status, headers, data
+
+def get_projection(request):
+    """
+    Return parsed JSONPath projection from the projection query parameter,
+    which may be repeated or comma separated, or None to return full objects.
+    """
+    try:
+        return parse_projection(request.query.getall('projection', []))
+    except ValueError as exception:
+        raise web.HTTPBadRequest(reason=str(exception))
+
+def get_list_limit(limit):
+    """Return list page size limit with proxy_list_limit_max applied."""
+    try:
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise web.HTTPBadRequest(reason=f"Invalid limit {limit}")
+    if proxy_list_limit_max and (not limit or limit > proxy_list_limit_max):
+        return proxy_list_limit_max
+    return limit
+
+def get_upstream_query_params(request):
+    """
+    Return query parameters to pass to the API, removing parameters handled
+    by the proxy and applying the list page size limit. Kubernetes limit and
+    continue are passed through so that clients page through lists.
+    """
+    query_params = [(k, v) for k, v in request.query.items() if k not in ('limit', 'projection')]
+    limit = request.query.get('limit')
+    k8s_path = parse_k8s_path(request.path)
+    if request.method == 'GET' and k8s_path and not k8s_path['name']:
+        limit = get_list_limit(limit)
+    if limit:
+        query_params.append(('limit', str(limit)))
+    return query_params or None
+
+async def proxy_response(request, status, headers, body):
+    """
+    Return response for a proxied API call. A body that is not already
+    encoded is serialized in blocks that are written to the client as they
+    are produced, so that the full uncompressed JSON is never held in memory.
+    """
+    if isinstance(body, bytes):
+        return web.Response(body=body, headers=headers, status=status)
+    response = web.StreamResponse(headers=headers, status=status)
+    await response.prepare(request)
+    for block in iter_encoded_json(body):
+        await response.write(block)
+    await response.write_eof()
+    return response
+
+def set_content_headers(headers, content_encoding):
+    headers['Content-Type'] = 'application/json'
+    headers['Vary'] = 'Accept-Encoding'
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+
 async def response_cache_clean():
     """Periodically remove old cache entries to avoid memory leak."""
     try:
         while True:
-            for key, value in list(response_cache.items()):
-                cache_time = value[1]
-                if time.time() - cache_time > response_cache_clean_interval:
-                    response_cache.pop(key, None)
+            response_cache.prune()
+            session_store.prune()
             await asyncio.sleep(response_cache_clean_interval)
     except asyncio.CancelledError:
         return
 
-app = web.Application()
+app = web.Application(middlewares=[metrics_middleware, tracing_middleware])
 app.add_routes(routes)
 app.on_startup.append(on_startup)
 app.on_cleanup.append(on_cleanup)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import re
@@ -368,44 +369,41 @@ def extract_details(action, body):
         return {}  # body format unrecognized; log the event without details
 
 
-def audit_log(event, user, effective_user=None, action=None, resource_type=None,
-              resource_name=None, namespace=None, status=None, details=None, **extra):
-    try:
-        record = {
-            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
-            'event': event,
-            'user': user,
-        }
-        if effective_user and effective_user != user:
-            record['effective_user'] = effective_user
-        if action:
-            record['action'] = action
-        if resource_type:
-            record['resource_type'] = resource_type
-        if resource_name:
-            record['resource_name'] = resource_name
-        if namespace:
-            record['namespace'] = namespace
-        if status is not None:
-            record['status'] = status
-        if details:
-            record['details'] = details
-        for k, v in extra.items():
-            record[k] = v
-        audit_logger.info(json.dumps(record, separators=(',', ':')))
-    except Exception as exc:
-        logging.getLogger(__name__).warning('audit_log failed: %s', exc)
-
-
-def audit_log_api_action(user, effective_user, method, path, status, body):
-    """Parse K8s path and body to emit a structured audit log entry. Never raises."""
+def _audit_record(timestamp, event, user, effective_user=None, action=None, resource_type=None,
+                  resource_name=None, namespace=None, status=None, details=None, **extra):
+    record = {
+        'timestamp': timestamp.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'event': event,
+        'user': user,
+    }
+    if effective_user and effective_user != user:
+        record['effective_user'] = effective_user
+    if action:
+        record['action'] = action
+    if resource_type:
+        record['resource_type'] = resource_type
+    if resource_name:
+        record['resource_name'] = resource_name
+    if namespace:
+        record['namespace'] = namespace
+    if status is not None:
+        record['status'] = status
+    if details:
+        record['details'] = details
+    for k, v in extra.items():
+        record[k] = v
+    return record
+
+
+def _api_action_record(timestamp, user, effective_user, method, path, status, body):
     try:
         parsed = parse_k8s_path(path)
         if parsed:
             plural = parsed['plural']
             action = classify_action(method, plural, body)
             details = extract_details(action, body)
-            audit_log(
+            return _audit_record(
+                timestamp,
                 'api_action',
                 user=user,
                 effective_user=effective_user,
@@ -416,25 +414,230 @@ def audit_log_api_action(user, effective_user, method, path, status, body):
                 status=status,
                 details=details or None,
             )
-        else:
-            audit_log(
-                'api_action',
-                user=user,
-                effective_user=effective_user,
-                action=f'{str(method).lower()}_request',
-                status=status,
-                details={'path': path},
-            )
+        return _audit_record(
+            timestamp,
+            'api_action',
+            user=user,
+            effective_user=effective_user,
+            action=f'{str(method).lower()}_request',
+            status=status,
+            details={'path': path},
+        )
     except Exception as exc:
         logging.getLogger(__name__).warning('audit_log_api_action failed: %s', exc)
+        return _audit_record(
+            timestamp,
+            'api_action',
+            user=user,
+            effective_user=effective_user,
+            action='unknown',
+            status=status,
+            details={'path': path, 'method': method},
+        )
+
+
+def _format_record(build, timestamp, args, kwargs):
+    return json.dumps(build(timestamp, *args, **kwargs), separators=(',', ':'))
+
+
+def _emit(build, *args, **kwargs):
+    """
+    Write audit record built by build(timestamp, *args, **kwargs). If the
+    audit sink is running the record is queued so that classification,
+    serialization, and output happen off the request path.
+    """
+    timestamp = datetime.now(timezone.utc)
+    if audit_sink is not None:
+        audit_sink.submit(build, timestamp, args, kwargs)
+    else:
+        audit_logger.info(_format_record(build, timestamp, args, kwargs))
+
+
+def audit_log(event, user, effective_user=None, action=None, resource_type=None,
+              resource_name=None, namespace=None, status=None, details=None, **extra):
+    try:
+        _emit(
+            _audit_record, event, user,
+            effective_user=effective_user, action=action, resource_type=resource_type,
+            resource_name=resource_name, namespace=namespace, status=status, details=details,
+            **extra
+        )
+    except Exception as exc:
+        logging.getLogger(__name__).warning('audit_log failed: %s', exc)
+
+
+def audit_log_api_action(user, effective_user, method, path, status, body):
+    """Parse K8s path and body to emit a structured audit log entry. Never raises."""
+    try:
+        _emit(_api_action_record, user, effective_user, method, path, status, body)
+    except Exception as exc:
+        logging.getLogger(__name__).warning('audit_log_api_action failed: %s', exc)
+
+
+class LogAuditWriter:
+    """Write audit records through the audit logger."""
+
+    async def write(self, lines):
+        for line in lines:
+            audit_logger.info(line)
+
+    async def close(self):
+        pass
+
+
+class StreamAuditWriter:
+    """Write audit records as JSON lines to a stream such as stdout."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def write(self, lines):
+        self.stream.write(''.join(line + '\n' for line in lines))
+        self.stream.flush()
+
+    async def close(self):
+        pass
+
+
+class FileAuditWriter:
+    """Append audit records as JSON lines to a file, writing from a worker thread."""
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def __write(self, data):
+        self.file.write(data)
+        self.file.flush()
+
+    async def write(self, lines):
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.__write, ''.join(line + '\n' for line in lines)
+        )
+
+    async def close(self):
+        self.file.close()
+
+
+class HttpAuditWriter:
+    """
+    POST batches of audit records as newline delimited JSON to a collector.
+    Batches that cannot be delivered are written through the audit logger
+    so that they are not lost.
+    """
+
+    def __init__(self, upstream_sessions, url, retries=3, retry_delay=1):
+        self.failed = 0
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.upstream_sessions = upstream_sessions
+        self.url = url
+
+    async def write(self, lines):
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+        for attempt in range(self.retries):
+            try:
+                async with self.upstream_sessions.post(
+                    'audit', self.url, data=data, headers={'Content-Type': 'application/x-ndjson'},
+                ) as response:
+                    if response.status < 300:
+                        return
+                    logging.getLogger(__name__).warning('audit collector returned %s', response.status)
+            except Exception as exc:
+                logging.getLogger(__name__).warning('audit collector request failed: %s', exc)
+            if attempt + 1 < self.retries:
+                await asyncio.sleep(self.retry_delay)
+        self.failed += len(lines)
+        await LogAuditWriter().write(lines)
+
+    async def close(self):
+        pass
+
+
+class AuditSink:
+    """
+    Bounded queue of audit records with a background task that formats and
+    writes them in batches, preserving order. Records submitted while the
+    queue is full are counted as dropped rather than blocking the request.
+    """
+
+    def __init__(self, writer, batch_size=100, queue_size=10000):
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.task = None
+        self.writer = writer
+        self.written = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self.__run())
+
+    async def stop(self, timeout=10):
+        """Wait for queued records to be written, then stop."""
         try:
-            audit_log(
-                'api_action',
-                user=user,
-                effective_user=effective_user,
-                action='unknown',
-                status=status,
-                details={'path': path, 'method': method},
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.getLogger(__name__).warning(
+                'audit sink stopped with %s records not written', self.queue.qsize()
             )
-        except Exception:
-            pass  # last-resort fallback: silently drop rather than crash the request
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        await self.writer.close()
+
+    def submit(self, build, timestamp, args, kwargs):
+        try:
+            self.queue.put_nowait((build, timestamp, args, kwargs))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logging.getLogger(__name__).warning('audit queue full, %s records dropped', self.dropped)
+
+    async def __run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            lines = []
+            for build, timestamp, args, kwargs in batch:
+                try:
+                    lines.append(_format_record(build, timestamp, args, kwargs))
+                except Exception as exc:
+                    logging.getLogger(__name__).warning('audit_log failed: %s', exc)
+            try:
+                await self.writer.write(lines)
+                self.written += len(lines)
+            except Exception as exc:
+                logging.getLogger(__name__).warning('audit sink write failed: %s', exc)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def stats(self):
+        return {
+            "dropped": self.dropped,
+            "queued": self.queue.qsize(),
+            "written": self.written,
+        }
+
+
+audit_sink = None
+
+
+def start_audit_sink(writer, batch_size=100, queue_size=10000):
+    """Start writing audit records asynchronously through writer."""
+    global audit_sink
+    audit_sink = AuditSink(writer, batch_size=batch_size, queue_size=queue_size)
+    audit_sink.start()
+    return audit_sink
+
+
+async def stop_audit_sink():
+    """Drain queued audit records and return to writing records synchronously."""
+    global audit_sink
+    if audit_sink is None:
+        return
+    # Records submitted while draining are still queued so that order is preserved
+    await audit_sink.stop()
+    audit_sink = None
@@ -0,0 +1,161 @@
+import base64
+import binascii
+import gzip
+import hashlib
+import json
+
+from collections import OrderedDict
+
+from informer import Informer, match_label_selector, parse_label_selector
+from jsontransform import apply_projection, project
+
+class CatalogItemCache:
+    """
+    Serve CatalogItem list and get requests from a watch-backed informer.
+
+    Responses are serialized and gzip compressed once and then reused until a
+    CatalogItem in the same namespace changes. Cache keys come from client
+    queries, so responses are kept in a size bounded LRU and not found
+    responses are not cached.
+    """
+    api_version = 'babylon.gpte.redhat.com/v1'
+
+    def __init__(self, custom_objects_api, compresslevel=5, max_entries=1000):
+        self.compresslevel = compresslevel
+        self.informer = Informer(
+            'CatalogItem',
+            custom_objects_api.list_cluster_custom_object,
+            group = 'babylon.gpte.redhat.com',
+            plural = 'catalogitems',
+            version = 'v1',
+        )
+        self.informer.add_handler(self.on_event)
+        self.max_entries = max_entries
+        # Per namespace digest of CatalogItem names and resourceVersions
+        self.namespace_digests = {}
+        # Per namespace count of changes, part of response keys
+        self.namespace_generations = {}
+        # Serialized response bodies by namespace, namespace generation, and query
+        self.responses = OrderedDict()
+        # Per namespace latest resourceVersion used in list metadata
+        self.namespace_versions = {}
+
+    @property
+    def is_synced(self):
+        return self.informer.is_synced
+
+    async def start(self):
+        await self.informer.start()
+
+    async def stop(self):
+        await self.informer.stop()
+
+    def on_event(self, event_type, obj, previous):
+        # Responses for the previous namespace generation are no longer returned and age out of the LRU
+        namespace = obj['metadata']['namespace']
+        self.namespace_digests.pop(namespace, None)
+        self.namespace_generations[namespace] = self.namespace_generations.get(namespace, 0) + 1
+        self.namespace_versions[namespace] = obj['metadata'].get('resourceVersion')
+
+    def namespace_digest(self, namespace):
+        """
+        Return digest of the CatalogItems in namespace, which is the same on
+        every replica for the same items regardless of the order of events.
+        """
+        digest = self.namespace_digests.get(namespace)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            for name, resource_version in sorted(
+                (catalog_item['metadata']['name'], catalog_item['metadata'].get('resourceVersion', ''))
+                for catalog_item in self.informer.list(namespace)
+            ):
+                sha256.update(f"{name}\0{resource_version}\n".encode('utf-8'))
+            digest = self.namespace_digests[namespace] = sha256.hexdigest()[:16]
+        return digest
+
+    def __get_response(self, key):
+        response = self.responses.get(key)
+        if response is not None:
+            self.responses.move_to_end(key)
+        return response
+
+    def __set_response(self, key, response):
+        self.responses[key] = response
+        while len(self.responses) > self.max_entries:
+            self.responses.popitem(last=False)
+        return response
+
+    def __compress(self, data):
+        return gzip.compress(
+            json.dumps(data, separators=(',', ':')).encode('utf-8'),
+            compresslevel=self.compresslevel,
+        )
+
+    def get(self, namespace, name, projection=None):
+        """Return (status, body) for a CatalogItem get."""
+        key = (namespace, self.namespace_generations.get(namespace), 'get', name, projection)
+        response = self.__get_response(key)
+        if response is not None:
+            return response
+        catalog_item = self.informer.get(namespace, name)
+        if catalog_item is None:
+            return 404, self.__compress({
+                "apiVersion": "v1",
+                "code": 404,
+                "details": {
+                    "group": "babylon.gpte.redhat.com",
+                    "kind": "catalogitems",
+                    "name": name,
+                },
+                "kind": "Status",
+                "message": f"catalogitems.babylon.gpte.redhat.com \"{name}\" not found",
+                "metadata": {},
+                "reason": "NotFound",
+                "status": "Failure",
+            })
+        return self.__set_response(key, (200, self.__compress(apply_projection(catalog_item, projection))))
+
+    def list(self, namespace, label_selector=None, limit=None, continue_token=None, projection=None):
+        """
+        Return (status, body) for a CatalogItem list with Kubernetes style
+        limit and continue handling. Raises ValueError for unsupported query.
+        """
+        key = (namespace, self.namespace_generations.get(namespace), 'list', label_selector, limit, continue_token, projection)
+        response = self.__get_response(key)
+        if response is not None:
+            return response
+
+        requirements = parse_label_selector(label_selector)
+        start_after = None
+        if continue_token:
+            try:
+                start_after = json.loads(base64.urlsafe_b64decode(continue_token))['start']
+            except (binascii.Error, KeyError, TypeError, ValueError):
+                raise ValueError("Invalid continue token")
+
+        items = sorted(
+            (
+                catalog_item for catalog_item in self.informer.list(namespace)
+                if match_label_selector(requirements, catalog_item['metadata'].get('labels'))
+            ),
+            key=lambda catalog_item: catalog_item['metadata']['name']
+        )
+        if start_after is not None:
+            items = [item for item in items if item['metadata']['name'] > start_after]
+
+        resource_version = self.namespace_versions.get(namespace) or self.informer.resource_version
+        metadata = {"resourceVersion": resource_version}
+        if limit and len(items) > limit:
+            metadata['remainingItemCount'] = len(items) - limit
+            items = items[:limit]
+            metadata['continue'] = base64.urlsafe_b64encode(json.dumps({
+                "rv": resource_version,
+                "start": items[-1]['metadata']['name'],
+            }).encode('utf-8')).decode('utf-8')
+
+        return self.__set_response(key, (200, self.__compress({
+            "apiVersion": self.api_version,
+            "items": [project(item, projection) for item in items] if projection else items,
+            "kind": "CatalogItemList",
+            "metadata": metadata,
+        })))
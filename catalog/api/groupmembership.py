@@ -0,0 +1,43 @@
+from informer import Informer
+
+class GroupMembershipCache:
+    """
+    Reverse index of OpenShift Group membership from user name to group
+    names, kept current from a watch on user.openshift.io Groups.
+    """
+    def __init__(self, custom_objects_api):
+        self.informer = Informer(
+            'Group',
+            custom_objects_api.list_cluster_custom_object,
+            group = 'user.openshift.io',
+            plural = 'groups',
+            version = 'v1',
+        )
+        self.informer.add_handler(self.on_event)
+        self.user_groups = {}
+
+    @property
+    def is_synced(self):
+        return self.informer.is_synced
+
+    async def start(self):
+        await self.informer.start()
+
+    async def stop(self):
+        await self.informer.stop()
+
+    def on_event(self, event_type, obj, previous):
+        group_name = obj['metadata']['name']
+        previous_users = set(previous.get('users') or []) if previous else set()
+        users = set() if event_type == 'DELETED' else set(obj.get('users') or [])
+        for user_name in previous_users - users:
+            user_groups = self.user_groups.get(user_name)
+            if user_groups is not None:
+                user_groups.discard(group_name)
+                if not user_groups:
+                    del self.user_groups[user_name]
+        for user_name in users - previous_users:
+            self.user_groups.setdefault(user_name, set()).add(group_name)
+
+    def get_user_groups(self, user_name):
+        return sorted(self.user_groups.get(user_name, ()))
@@ -2,12 +2,15 @@
 
 import kubernetes_asyncio
 import re
+import time
 import urllib3
 
 import six
 from six.moves.urllib.parse import quote
 from urllib3.connection import HTTPHeaderDict
 from kubernetes_asyncio.client.exceptions import ApiException
+from metrics import observe_upstream
+from tracing import trace_span
 
 def urllib3_hotfix_request_encode_body(
     self,
@@ -81,6 +84,28 @@ class HotfixKubeApiClient(kubernetes_asyncio.client.ApiClient):
         else:
             return super().sanitize_for_serialization(cls, obj)
 
+    async def request(self, method, url, **kwargs):
+        """
+        Override of request to record Kubernetes API call latency and trace span.
+        """
+        start = time.monotonic()
+        status = 'error'
+        with trace_span(f"kube {method}", kind='client', method=method, target='kube', url=url.split('?')[0]) as span:
+            try:
+                response = await super().request(method, url, **kwargs)
+                status = response.status
+                if span:
+                    data = getattr(response, 'data', None)
+                    span.set(size=len(data) if data is not None else response.content_length, status=status)
+                return response
+            except ApiException as e:
+                status = e.status
+                if span:
+                    span.set(status=status)
+                raise
+            finally:
+                observe_upstream('kube', status, time.monotonic() - start)
+
     # Force override of private method in ApiClient class
     async def _ApiClient__call_api(
         self,
@@ -111,11 +136,13 @@ class HotfixKubeApiClient(kubernetes_asyncio.client.ApiClient):
         if self.cookie:
             headers['Cookie'] = self.cookie
         if header_params:
-            headers.update(
-                HTTPHeaderDict(self.parameters_to_tuples(
-                    self.sanitize_for_serialization(header_params), collection_formats
-                ))
-            )
+            # Replace default headers with header params, keeping all values of multi-value headers
+            params = HTTPHeaderDict(self.parameters_to_tuples(
+                self.sanitize_for_serialization(header_params), collection_formats
+            ))
+            for key in params:
+                headers.discard(key)
+            headers.extend(params)
 
         # path parameters
         if path_params:
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+
+import kubernetes_asyncio
+
+logger = logging.getLogger('informer')
+
+class Informer:
+    """
+    Keep an in-memory copy of Kubernetes resources current by listing them
+    once and then following a watch from the list resourceVersion.
+
+    Objects are stored as plain dicts keyed by (namespace, name). Handlers
+    registered with add_handler are called as handler(event_type, obj, previous)
+    for every ADDED, MODIFIED and DELETED change, including the differences
+    found when the informer has to relist after the watch expires.
+    """
+    def __init__(self, name, list_method, retry_delay=5, watch_timeout=300, **list_kwargs):
+        self.name = name
+        self.list_method = list_method
+        self.list_kwargs = list_kwargs
+        self.retry_delay = retry_delay
+        self.watch_timeout = watch_timeout
+        self.handlers = []
+        self.objects = {}
+        self.resource_version = None
+        self.synced = asyncio.Event()
+        self.task = None
+
+    @property
+    def is_synced(self):
+        return self.synced.is_set()
+
+    def add_handler(self, handler):
+        self.handlers.append(handler)
+
+    def get(self, namespace, name):
+        return self.objects.get((namespace, name))
+
+    def list(self, namespace=None):
+        if namespace is None:
+            return list(self.objects.values())
+        return [obj for (obj_namespace, _), obj in self.objects.items() if obj_namespace == namespace]
+
+    async def start(self):
+        self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def wait_synced(self, timeout=None):
+        """Wait for initial list to complete, return False on timeout."""
+        try:
+            await asyncio.wait_for(self.synced.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def __notify(self, event_type, obj, previous):
+        for handler in self.handlers:
+            try:
+                handler(event_type, obj, previous)
+            except Exception:
+                logger.exception(f"{self.name} informer handler failed on {event_type}")
+
+    def __apply(self, event_type, obj):
+        metadata = obj.get('metadata', {})
+        key = (metadata.get('namespace'), metadata['name'])
+        metadata.pop('managedFields', None)
+        if event_type == 'DELETED':
+            previous = self.objects.pop(key, None)
+            if previous is not None:
+                self.__notify('DELETED', previous, previous)
+        else:
+            previous = self.objects.get(key)
+            self.objects[key] = obj
+            self.__notify('MODIFIED' if previous else 'ADDED', obj, previous)
+        if metadata.get('resourceVersion'):
+            self.resource_version = metadata['resourceVersion']
+
+    async def __list(self):
+        response = await self.list_method(**self.list_kwargs, _preload_content=False)
+        data = json.loads(await response.read())
+        seen = set()
+        for obj in data.get('items', []):
+            metadata = obj['metadata']
+            key = (metadata.get('namespace'), metadata['name'])
+            seen.add(key)
+            previous = self.objects.get(key)
+            if previous and previous['metadata'].get('resourceVersion') == metadata.get('resourceVersion'):
+                continue
+            self.__apply('MODIFIED' if previous else 'ADDED', obj)
+        for key in [key for key in self.objects if key not in seen]:
+            self.__apply('DELETED', self.objects[key])
+        self.resource_version = data.get('metadata', {}).get('resourceVersion')
+        self.synced.set()
+
+    async def __watch(self):
+        watch = kubernetes_asyncio.watch.Watch()
+        try:
+            async for event in watch.stream(
+                self.list_method,
+                **self.list_kwargs,
+                allow_watch_bookmarks=True,
+                resource_version=self.resource_version,
+                timeout_seconds=self.watch_timeout,
+            ):
+                event_type = event['type']
+                obj = event['raw_object']
+                if event_type == 'BOOKMARK':
+                    self.resource_version = obj['metadata']['resourceVersion']
+                elif event_type in ('ADDED', 'MODIFIED', 'DELETED'):
+                    self.__apply(event_type, obj)
+        finally:
+            await watch.close()
+
+    async def __run(self):
+        while True:
+            try:
+                await self.__list()
+                while True:
+                    await self.__watch()
+            except asyncio.CancelledError:
+                raise
+            except kubernetes_asyncio.client.exceptions.ApiException as exception:
+                if exception.status == 410:
+                    logger.info(f"{self.name} informer resourceVersion expired, relisting")
+                    continue
+                logger.warning(f"{self.name} informer failed: {exception.status} {exception.reason}")
+            except Exception:
+                logger.exception(f"{self.name} informer failed")
+            await asyncio.sleep(self.retry_delay)
+
+def parse_label_selector(label_selector):
+    """
+    Parse a Kubernetes label selector into a list of (key, operator, values).
+    Raises ValueError for selector syntax that is not supported.
+    """
+    requirements = []
+    if not label_selector:
+        return requirements
+    terms = []
+    depth = 0
+    term = ''
+    for char in label_selector:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            terms.append(term)
+            term = ''
+        else:
+            term += char
+    terms.append(term)
+
+    for term in terms:
+        term = term.strip()
+        if not term:
+            raise ValueError(f"Empty label selector requirement in {label_selector}")
+        for operator in (' notin ', ' in '):
+            if operator in term:
+                key, values = term.split(operator, 1)
+                values = values.strip()
+                if not values.startswith('(') or not values.endswith(')'):
+                    raise ValueError(f"Invalid label selector requirement {term}")
+                requirements.append((
+                    key.strip(), operator.strip(),
+                    {value.strip() for value in values[1:-1].split(',') if value.strip()},
+                ))
+                break
+        else:
+            if '!=' in term:
+                key, value = term.split('!=', 1)
+                requirements.append((key.strip(), '!=', {value.strip()}))
+            elif '==' in term:
+                key, value = term.split('==', 1)
+                requirements.append((key.strip(), '=', {value.strip()}))
+            elif '=' in term:
+                key, value = term.split('=', 1)
+                requirements.append((key.strip(), '=', {value.strip()}))
+            elif term.startswith('!'):
+                requirements.append((term[1:].strip(), '!', set()))
+            elif ' ' in term or '(' in term or ')' in term:
+                raise ValueError(f"Invalid label selector requirement {term}")
+            else:
+                requirements.append((term, 'exists', set()))
+    return requirements
+
+def match_label_selector(requirements, labels):
+    """Check labels against requirements returned by parse_label_selector."""
+    labels = labels or {}
+    for key, operator, values in requirements:
+        if operator == '=':
+            if labels.get(key) not in values:
+                return False
+        elif operator == '!=':
+            if labels.get(key) in values:
+                return False
+        elif operator == 'in':
+            if labels.get(key) not in values:
+                return False
+        elif operator == 'notin':
+            if key in labels and labels[key] in values:
+                return False
+        elif operator == 'exists':
+            if key not in labels:
+                return False
+        elif operator == '!':
+            if key in labels:
+                return False
+    return True
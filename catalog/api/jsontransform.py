@@ -0,0 +1,238 @@
+import asyncio
+import json
+import re
+import zlib
+
+from metrics import operation_duration
+from tracing import trace_span
+
+# Bodies at least this large are transformed in a worker thread so that the
+# event loop keeps serving other requests. zlib releases the GIL while
+# compressing so compression of large lists also runs in parallel.
+offload_threshold = 64 * 1024
+chunk_size = 64 * 1024
+
+transform_duration = operation_duration.labels('transform')
+
+def select_content_encoding(accept_encoding):
+    """
+    Choose response content encoding from an Accept-Encoding header value.
+    Returns 'gzip', 'deflate', or None for identity.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    for coding in ('gzip', 'deflate'):
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+def strip_managed_fields(data):
+    """Remove metadata.managedFields from object or list of objects."""
+    if not isinstance(data, dict):
+        return data
+    if isinstance(data.get('metadata'), dict):
+        data['metadata'].pop('managedFields', None)
+    for item in data.get('items') or []:
+        if isinstance(item, dict) and isinstance(item.get('metadata'), dict):
+            item['metadata'].pop('managedFields', None)
+    return data
+
+def iter_json_chunks(data):
+    """Serialize data as JSON one list item at a time."""
+    if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+        yield json.dumps(data, separators=(',', ':'))
+        return
+    head = {key: value for key, value in data.items() if key != 'items'}
+    head_json = json.dumps(head, separators=(',', ':'))
+    yield head_json[:-1] + (',' if head else '') + '"items":['
+    for index, item in enumerate(data['items']):
+        yield (',' if index else '') + json.dumps(item, separators=(',', ':'))
+    yield ']}'
+
+def iter_encoded_json(data, content_encoding=None, compresslevel=5):
+    """
+    Serialize and compress data in chunks, yielding blocks of the response
+    body as they are produced so that they can be streamed to the client.
+    """
+    if content_encoding == 'gzip':
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif content_encoding == 'deflate':
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, zlib.MAX_WBITS)
+    else:
+        compressor = None
+
+    buffered = []
+    buffered_size = 0
+    for chunk in iter_json_chunks(data):
+        buffered.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= chunk_size:
+            block = ''.join(buffered).encode('utf-8')
+            buffered = []
+            buffered_size = 0
+            if compressor:
+                block = compressor.compress(block)
+            if block:
+                yield block
+    block = ''.join(buffered).encode('utf-8')
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
+
+def encode_json(data, content_encoding=None, compresslevel=5):
+    """Serialize and compress data in chunks, returning the response body."""
+    return b''.join(iter_encoded_json(data, content_encoding, compresslevel))
+
+def decode_json(raw, projection=None):
+    """Parse API response body, strip managedFields, and apply projection."""
+    return apply_projection(strip_managed_fields(json.loads(raw)), projection)
+
+def transform_json(raw, content_encoding=None, compresslevel=5, projection=None):
+    """
+    Parse API response body, strip managedFields, apply projection, and encode
+    for response.
+    """
+    return encode_json(decode_json(raw, projection), content_encoding, compresslevel)
+
+async def run_transform(size, func, *args):
+    """Run func in the default executor if size is over offload_threshold."""
+    with transform_duration.time(), trace_span('transform', size=size):
+        if size < offload_threshold:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+# Fields always kept in projected objects so that clients can still identify them
+projection_required_paths = (
+    ('apiVersion',),
+    ('kind',),
+    ('metadata', 'name'),
+    ('metadata', 'namespace'),
+    ('metadata', 'resourceVersion'),
+    ('metadata', 'uid'),
+)
+projection_wildcard = '*'
+_projection_token_re = re.compile(
+    r"""\.(?P<key>[^.\[\]]+)|\[(?:'(?P<single>[^']*)'|"(?P<double>[^"]*)"|(?P<index>-?\d+)|(?P<wildcard>\*))\]"""
+)
+
+def parse_projection_path(path):
+    """
+    Parse a simple JSONPath such as "$.metadata.labels['app']" or
+    "status.resources[*].state.kind" into a tuple of keys, list indexes and
+    wildcards. Raises ValueError for unsupported syntax.
+    """
+    path = path.strip()
+    if path.startswith('$'):
+        path = path[1:]
+    elif path and not path.startswith(('.', '[')):
+        path = '.' + path
+    tokens = []
+    position = 0
+    while position < len(path):
+        match = _projection_token_re.match(path, position)
+        if not match:
+            raise ValueError(f"Unsupported projection path {path}")
+        if match.group('key') is not None:
+            tokens.append(projection_wildcard if match.group('key') == '*' else match.group('key'))
+        elif match.group('single') is not None:
+            tokens.append(match.group('single'))
+        elif match.group('double') is not None:
+            tokens.append(match.group('double'))
+        elif match.group('index') is not None:
+            tokens.append(int(match.group('index')))
+        else:
+            tokens.append(projection_wildcard)
+        position = match.end()
+    if not tokens:
+        raise ValueError("Empty projection path")
+    return tuple(tokens)
+
+def parse_projection(values):
+    """
+    Parse projection query parameter values, each of which may hold several
+    comma separated paths. Returns None if no projection was requested.
+    """
+    paths = []
+    for value in values:
+        depth = 0
+        path = ''
+        for char in value:
+            if char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+            if char == ',' and depth == 0:
+                if path.strip():
+                    paths.append(parse_projection_path(path))
+                path = ''
+            else:
+                path += char
+        if path.strip():
+            paths.append(parse_projection_path(path))
+    if not paths:
+        return None
+    return tuple(projection_required_paths) + tuple(paths)
+
+def _project_path(source, tokens, dest):
+    if dest is source or not tokens:
+        return source
+    token, rest = tokens[0], tokens[1:]
+    if isinstance(source, dict):
+        if token == projection_wildcard:
+            keys = list(source)
+        elif isinstance(token, str) and token in source:
+            keys = [token]
+        else:
+            return dest
+        for key in keys:
+            value = _project_path(source[key], rest, None if dest is None else dest.get(key))
+            # Value is None when nothing was selected under key
+            if value is not None or not rest:
+                if dest is None:
+                    dest = {}
+                dest[key] = value
+        return dest
+    if isinstance(source, list):
+        if token == projection_wildcard:
+            indexes = range(len(source))
+        elif isinstance(token, int) and -len(source) <= token < len(source):
+            indexes = [token % len(source)]
+        else:
+            return dest
+        for index in indexes:
+            value = _project_path(source[index], rest, None if dest is None else dest[index])
+            if value is not None or not rest:
+                if dest is None:
+                    dest = [None] * len(source)
+                dest[index] = value
+        return dest
+    return dest
+
+def project(obj, paths):
+    """Return copy of obj with only the values selected by parsed paths."""
+    dest = None
+    for tokens in paths:
+        dest = _project_path(obj, tokens, dest)
+    return dest if dest is not None else {}
+
+def apply_projection(data, paths):
+    """Apply projection to each item of a list or to a single object."""
+    if not paths or not isinstance(data, dict):
+        return data
+    if isinstance(data.get('items'), list):
+        data['items'] = [project(item, paths) for item in data['items']]
+        return data
+    return project(data, paths)
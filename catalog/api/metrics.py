@@ -0,0 +1,248 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds for HTTP requests and upstream calls
+default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_labels(labelnames, labelvalues, extra=None):
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class Metric:
+    """
+    Base for metrics in the Prometheus text exposition format. Children for
+    each combination of label values are created once and kept, so callers
+    on hot paths should hold on to the result of labels().
+    """
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.children = {}
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.name = name
+        if not self.labelnames:
+            self.children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues):
+        child = self.children.get(labelvalues)
+        if child is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self.children[labelvalues] = self._new_child()
+        return child
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for labelvalues, child in sorted(self.children.items()):
+            lines.extend(self._samples(labelvalues, child))
+        return lines
+
+    def _samples(self, labelvalues, child):
+        return [f"{self.name}{format_labels(self.labelnames, labelvalues)} {format_value(child.value)}"]
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+class GaugeChild(CounterChild):
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+class HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.count = 0
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+    @contextmanager
+    def time(self):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start)
+
+class Counter(Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1):
+        self.children[()].inc(amount)
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def dec(self, amount=1):
+        self.children[()].dec(amount)
+
+    def inc(self, amount=1):
+        self.children[()].inc(amount)
+
+    def set(self, value):
+        self.children[()].set(value)
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=default_buckets):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.children[()].observe(value)
+
+    def _samples(self, labelvalues, child):
+        samples = []
+        cumulative = 0
+        for bucket, count in zip(self.buckets, child.counts):
+            cumulative += count
+            labels = format_labels(self.labelnames, labelvalues, f'le="{format_value(float(bucket))}"')
+            samples.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = format_labels(self.labelnames, labelvalues, 'le="+Inf"')
+        samples.append(f"{self.name}_bucket{labels} {child.count}")
+        labels = format_labels(self.labelnames, labelvalues)
+        samples.append(f"{self.name}_sum{labels} {format_value(child.sum)}")
+        samples.append(f"{self.name}_count{labels} {child.count}")
+        return samples
+
+class CallbackMetric(Metric):
+    """
+    Metric read at collection time from callback, which returns a dict of
+    label value tuples to values. Used to expose counters that components
+    already keep for their stats.
+    """
+    def __init__(self, name, documentation, labelnames, callback, type='gauge'):
+        self.callback = callback
+        self.type = type
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return None
+
+    def collect(self):
+        try:
+            values = self.callback()
+        except Exception:
+            # Component is not started, skip rather than fail the scrape
+            return []
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, labelvalues)} {format_value(value)}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=default_buckets):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, labelnames, callback, type='gauge'):
+        return self.register(CallbackMetric(name, documentation, labelnames, callback, type))
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.collect())
+        lines.append('')
+        return '\n'.join(lines).encode('utf-8')
+
+registry = Registry()
+
+cache_requests = registry.counter(
+    'babylon_catalog_api_cache_requests_total',
+    'Cache lookups by cache and result.',
+    ('cache', 'result'),
+)
+http_request_duration = registry.histogram(
+    'babylon_catalog_api_http_request_duration_seconds',
+    'HTTP request latency by method and route.',
+    ('method', 'route'),
+)
+http_requests = registry.counter(
+    'babylon_catalog_api_http_requests_total',
+    'HTTP requests by method, route, and response status.',
+    ('method', 'route', 'status'),
+)
+http_requests_in_flight = registry.gauge(
+    'babylon_catalog_api_http_requests_in_flight',
+    'HTTP requests currently being handled.',
+)
+operation_duration = registry.histogram(
+    'babylon_catalog_api_operation_duration_seconds',
+    'Latency of internal operations such as access reviews, session lookups, and response transforms.',
+    ('operation',),
+)
+upstream_request_duration = registry.histogram(
+    'babylon_catalog_api_upstream_request_duration_seconds',
+    'Upstream call latency by target.',
+    ('target',),
+)
+upstream_requests = registry.counter(
+    'babylon_catalog_api_upstream_requests_total',
+    'Upstream calls by target and response status.',
+    ('target', 'status'),
+)
+
+def observe_upstream(target, status, duration):
+    """Record an upstream call to target."""
+    upstream_request_duration.labels(target).observe(duration)
+    upstream_requests.labels(target, str(status)).inc()
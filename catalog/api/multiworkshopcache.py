@@ -0,0 +1,261 @@
+import asyncio
+import copy
+import logging
+from urllib.parse import urlparse
+
+from informer import Informer
+
+logger = logging.getLogger('multiworkshopcache')
+
+class MultiWorkshopCache:
+    """
+    Build public MultiWorkshop event responses enriched with seat
+    availability and product information.
+
+    MultiWorkshops, Workshops, and pool ResourceHandles are followed by
+    watches and CatalogItems are read from the CatalogItem cache informer,
+    so that once synced a response is built from memory. Enriched responses
+    are cached per multi-workshop-id until a watch event changes one of the
+    resources the response was built from. Until the watches are synced,
+    the resources are fetched from the API concurrently across assets and
+    responses are not cached. Responses for unknown ids are never cached as
+    the endpoint does not require login.
+    """
+    def __init__(self, custom_objects_api, catalog_item_informer, resource_handle_namespace='poolboy'):
+        self.available_handles = {}
+        self.catalog_item_informer = catalog_item_informer
+        self.catalog_item_informer.add_handler(self.on_catalog_item_event)
+        self.custom_objects_api = custom_objects_api
+        self.building = []
+        self.dependents = {}
+        self.multiworkshop_informer = Informer(
+            'MultiWorkshop',
+            custom_objects_api.list_cluster_custom_object,
+            group = 'babylon.gpte.redhat.com',
+            plural = 'multiworkshops',
+            version = 'v1',
+        )
+        self.multiworkshop_informer.add_handler(self.on_multiworkshop_event)
+        self.resource_handle_informer = Informer(
+            'ResourceHandle',
+            custom_objects_api.list_namespaced_custom_object,
+            group = 'poolboy.gpte.redhat.com',
+            # Only pooled ResourceHandles count towards seat availability
+            label_selector = 'poolboy.gpte.redhat.com/resource-pool-name',
+            namespace = resource_handle_namespace,
+            plural = 'resourcehandles',
+            version = 'v1',
+        )
+        self.resource_handle_informer.add_handler(self.on_resource_handle_event)
+        self.resource_handle_namespace = resource_handle_namespace
+        self.responses = {}
+        self.workshop_informer = Informer(
+            'Workshop',
+            custom_objects_api.list_cluster_custom_object,
+            group = 'babylon.gpte.redhat.com',
+            plural = 'workshops',
+            version = 'v1',
+        )
+        self.workshop_informer.add_handler(self.on_workshop_event)
+
+    @property
+    def is_synced(self):
+        return (
+            self.catalog_item_informer.is_synced and
+            self.multiworkshop_informer.is_synced and
+            self.resource_handle_informer.is_synced and
+            self.workshop_informer.is_synced
+        )
+
+    async def start(self):
+        await self.multiworkshop_informer.start()
+        await self.resource_handle_informer.start()
+        await self.workshop_informer.start()
+
+    async def stop(self):
+        await self.multiworkshop_informer.stop()
+        await self.resource_handle_informer.stop()
+        await self.workshop_informer.stop()
+
+    def invalidate(self, dependency):
+        """Discard cached responses built from dependency."""
+        for invalidated in self.building:
+            invalidated.add(dependency)
+        for multi_workshop_id in self.dependents.pop(dependency, ()):
+            self.responses.pop(multi_workshop_id, None)
+
+    def on_catalog_item_event(self, event_type, obj, previous):
+        self.invalidate(('catalogitem', obj['metadata']['namespace'], obj['metadata']['name']))
+
+    def on_multiworkshop_event(self, event_type, obj, previous):
+        for multiworkshop in (obj, previous):
+            if multiworkshop:
+                multi_workshop_id = (multiworkshop['metadata'].get('labels') or {}).get('babylon.gpte.redhat.com/multi-workshop-id')
+                self.invalidate(('multiworkshop', multi_workshop_id))
+
+    def on_workshop_event(self, event_type, obj, previous):
+        self.invalidate(('workshop', obj['metadata']['namespace'], obj['metadata']['name']))
+
+    def __handle_availability(self, resource_handle):
+        pool_name = (resource_handle['metadata'].get('labels') or {}).get('poolboy.gpte.redhat.com/resource-pool-name')
+        available = bool(
+            not resource_handle.get('spec', {}).get('resourceClaim')
+            and resource_handle.get('status', {}).get('healthy')
+            and resource_handle.get('status', {}).get('ready')
+        )
+        return pool_name, available
+
+    def on_resource_handle_event(self, event_type, obj, previous):
+        """Maintain count of available ResourceHandles per pool."""
+        previous_pool_name, previous_available = self.__handle_availability(previous) if previous else (None, False)
+        pool_name, available = (None, False) if event_type == 'DELETED' else self.__handle_availability(obj)
+        if (previous_pool_name, previous_available) == (pool_name, available):
+            return
+        if previous_available:
+            self.available_handles[previous_pool_name] -= 1
+            if not self.available_handles[previous_pool_name]:
+                del self.available_handles[previous_pool_name]
+        if available:
+            self.available_handles[pool_name] = self.available_handles.get(pool_name, 0) + 1
+        self.invalidate(('pool', previous_pool_name))
+        self.invalidate(('pool', pool_name))
+
+    async def get(self, multi_workshop_id):
+        """Return status and MultiWorkshop enriched with seat availability and product info."""
+        cached = self.responses.get(multi_workshop_id)
+        if cached is not None:
+            return cached
+
+        synced = self.is_synced
+        dependencies = {('multiworkshop', multi_workshop_id)}
+        # Collect dependencies invalidated while building the response
+        invalidated = set()
+        self.building.append(invalidated)
+        try:
+            multiworkshop = await self.__get_multiworkshop(multi_workshop_id, synced)
+            if multiworkshop is None:
+                return 404, {'error': 'MultiWorkshop not found'}
+            # Enrich copy so that the informer or shared list result is not modified
+            multiworkshop = copy.deepcopy(multiworkshop)
+            assets = multiworkshop.get('spec', {}).get('assets', [])
+            await asyncio.gather(*[
+                self.__enrich_asset(asset, dependencies, synced) for asset in assets
+            ])
+            response = (200, multiworkshop)
+        except Exception as e:
+            logger.error(f"Error fetching multiworkshop {multi_workshop_id}: {str(e)}")
+            return 500, {'error': 'Internal server error'}
+        finally:
+            self.building.remove(invalidated)
+
+        # Only cache if built from watched resources with no change to them while building
+        if synced and not dependencies & invalidated:
+            self.responses[multi_workshop_id] = response
+            for dependency in dependencies:
+                self.dependents.setdefault(dependency, set()).add(multi_workshop_id)
+        return response
+
+    async def __enrich_asset(self, asset, dependencies, synced):
+        asset_type = asset.get('type', 'Workshop')
+        workshop_name = asset.get('name')
+        workshop_namespace = asset.get('namespace')
+
+        if asset_type == 'external':
+            asset_url = asset.get('url', '')
+            parsed = urlparse(asset_url)
+            if parsed.path and parsed.path.strip('/').split('/')[0] == 'lab-event':
+                catalog_item_name = parsed.path.rstrip('/').split('/')[-1]
+                dependencies.add(('pool', catalog_item_name))
+                try:
+                    asset['availableSeats'] = await self.__get_available_handles(catalog_item_name, synced)
+                except Exception as e:
+                    logger.error(f"Error getting available seats: {e}")
+                await self.__add_product_info(asset, 'babylon-catalog-prod', catalog_item_name, dependencies, synced)
+            return
+
+        if not workshop_name or not workshop_namespace:
+            return
+        dependencies.add(('workshop', workshop_namespace, workshop_name))
+        try:
+            workshop = await self.__get_workshop(workshop_namespace, workshop_name, synced)
+            if workshop is None:
+                return
+            available = workshop.get('status', {}).get('userCount', {}).get('available')
+            if available is not None:
+                asset['availableSeats'] = available
+
+            catalog_item_name = workshop.get('metadata', {}).get('labels', {}).get('babylon.gpte.redhat.com/catalogItemName')
+            catalog_item_namespace = workshop.get('metadata', {}).get('labels', {}).get('babylon.gpte.redhat.com/catalogItemNamespace')
+            if catalog_item_name and catalog_item_namespace:
+                await self.__add_product_info(asset, catalog_item_namespace, catalog_item_name, dependencies, synced)
+        except Exception as e:
+            logger.error(f"Error getting available seats: {e}")
+
+    async def __add_product_info(self, asset, catalog_item_namespace, catalog_item_name, dependencies, synced):
+        dependencies.add(('catalogitem', catalog_item_namespace, catalog_item_name))
+        try:
+            catalog_item = await self.__get_catalog_item(catalog_item_namespace, catalog_item_name, synced)
+            if catalog_item is None:
+                return
+            catalog_item_labels = catalog_item.get('metadata', {}).get('labels', {})
+            product_family = catalog_item_labels.get('babylon.gpte.redhat.com/Product_Family')
+            product = catalog_item_labels.get('babylon.gpte.redhat.com/Product')
+            if product_family:
+                asset['productFamily'] = product_family
+            if product:
+                asset['product'] = product
+        except Exception as e:
+            logger.error(f"Error fetching catalogItem {catalog_item_namespace}/{catalog_item_name}: {e}")
+
+    async def __get_multiworkshop(self, multi_workshop_id, synced):
+        if synced:
+            for multiworkshop in self.multiworkshop_informer.list():
+                if (multiworkshop['metadata'].get('labels') or {}).get('babylon.gpte.redhat.com/multi-workshop-id') == multi_workshop_id:
+                    return multiworkshop
+            return None
+        multiworkshop_list = await self.custom_objects_api.list_cluster_custom_object(
+            group='babylon.gpte.redhat.com',
+            version='v1',
+            plural='multiworkshops',
+            label_selector=f"babylon.gpte.redhat.com/multi-workshop-id={multi_workshop_id}",
+        )
+        if not multiworkshop_list.get('items'):
+            return None
+        return multiworkshop_list['items'][0]
+
+    async def __get_workshop(self, namespace, name, synced):
+        if synced:
+            return self.workshop_informer.get(namespace, name)
+        return await self.custom_objects_api.get_namespaced_custom_object(
+            group='babylon.gpte.redhat.com',
+            version='v1',
+            namespace=namespace,
+            plural='workshops',
+            name=name
+        )
+
+    async def __get_catalog_item(self, namespace, name, synced):
+        if synced:
+            return self.catalog_item_informer.get(namespace, name)
+        return await self.custom_objects_api.get_namespaced_custom_object(
+            group='babylon.gpte.redhat.com',
+            version='v1',
+            namespace=namespace,
+            plural='catalogitems',
+            name=name
+        )
+
+    async def __get_available_handles(self, pool_name, synced):
+        if synced:
+            return self.available_handles.get(pool_name, 0)
+        handles_resp = await self.custom_objects_api.list_namespaced_custom_object(
+            group='poolboy.gpte.redhat.com',
+            version='v1',
+            namespace=self.resource_handle_namespace,
+            plural='resourcehandles',
+            label_selector=f"poolboy.gpte.redhat.com/resource-pool-name={pool_name}",
+        )
+        return sum(
+            1 for resource_handle in handles_resp.get('items', [])
+            if self.__handle_availability(resource_handle)[1]
+        )
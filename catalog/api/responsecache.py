@@ -0,0 +1,124 @@
+import json
+import logging
+from collections import OrderedDict
+from time import monotonic
+
+from redis.exceptions import RedisError
+
+from metrics import cache_requests
+from tracing import trace_span
+
+logger = logging.getLogger('responsecache')
+
+cache_hit = cache_requests.labels('response', 'hit')
+cache_miss = cache_requests.labels('response', 'miss')
+cache_redis_hit = cache_requests.labels('response', 'redis_hit')
+
+class ResponseCache:
+    """
+    Two-tier cache of proxied API responses.
+
+    Responses are kept in a size bounded in-process LRU and, if a Redis
+    connection is given, in Redis so that all replicas share one fetch per
+    change. Cache keys include a version per scope, such as a digest of the
+    resources in a namespace, so that entries for older versions are never
+    returned. Versions must be derived the same way on every replica for
+    replicas to share entries in Redis.
+    """
+    def __init__(self, max_entries=1000, ttl=60, redis_connection=None, key_prefix='babylon-catalog-api:response-cache:'):
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.key_prefix = key_prefix
+        self.max_entries = max_entries
+        self.misses = 0
+        self.redis_connection = redis_connection
+        self.redis_hits = 0
+        self.ttl = ttl
+        self.versions = {}
+
+    def __redis_key(self, scope, version, key):
+        return f"{self.key_prefix}{scope}:{version}:{key}"
+
+    def set_version(self, scope, version):
+        """Set current version for scope, discarding local entries for other versions."""
+        if self.versions.get(scope) == version:
+            return
+        self.versions[scope] = version
+        for cache_key in [cache_key for cache_key in self.entries if cache_key[0] == scope]:
+            del self.entries[cache_key]
+
+    def get_version(self, scope):
+        """Return current version for scope."""
+        return self.versions.setdefault(scope, '0')
+
+    async def get(self, scope, version, key):
+        """Return cached (status, headers, body) or None."""
+        cache_key = (scope, version, key)
+        entry = self.entries.get(cache_key)
+        if entry is not None:
+            expires, value = entry
+            if expires > monotonic():
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                cache_hit.inc()
+                return value
+            del self.entries[cache_key]
+
+        if self.redis_connection:
+            try:
+                with trace_span('redis GET', kind='client', target='redis'):
+                    raw = await self.redis_connection.get(self.__redis_key(scope, version, key))
+            except RedisError as exception:
+                logger.warning(f"Failed to get cached response from redis: {exception}")
+                raw = None
+            if raw:
+                head, _, body = raw.partition(b'\n')
+                status, headers = json.loads(head)
+                value = (status, headers, body)
+                self.__store(cache_key, value)
+                self.redis_hits += 1
+                cache_redis_hit.inc()
+                return value
+
+        self.misses += 1
+        cache_miss.inc()
+        return None
+
+    async def set(self, scope, version, key, status, headers, body):
+        """Cache response, version should be read before the response was fetched."""
+        value = (status, dict(headers), body)
+        self.__store((scope, version, key), value)
+        if self.redis_connection:
+            try:
+                await self.redis_connection.set(
+                    self.__redis_key(scope, version, key),
+                    json.dumps([status, value[1]], separators=(',', ':')).encode('utf-8') + b'\n' + body,
+                    ex=self.ttl,
+                )
+            except RedisError as exception:
+                logger.warning(f"Failed to set cached response in redis: {exception}")
+
+    def __store(self, cache_key, value):
+        # Ignore responses fetched for a version that is already outdated
+        if self.versions.get(cache_key[0], cache_key[1]) != cache_key[1]:
+            return
+        self.entries[cache_key] = (monotonic() + self.ttl, value)
+        self.entries.move_to_end(cache_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def prune(self):
+        """Remove expired entries."""
+        now = monotonic()
+        for cache_key in [cache_key for cache_key, (expires, _) in self.entries.items() if expires <= now]:
+            del self.entries[cache_key]
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "maxEntries": self.max_entries,
+            "misses": self.misses,
+            "redisHits": self.redis_hits,
+            "shared": self.redis_connection is not None,
+        }
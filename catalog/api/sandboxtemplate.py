@@ -0,0 +1,154 @@
+import json
+import re
+
+from singleflight import SingleFlight
+
+# Matches both {{ job_vars.variable_name }} and
+# {{ job_vars.variable_name | default('default_value') }}
+template_variable_pattern = re.compile(
+    r'\{\{\s*(job_vars\.[^|\s}]+)(?:\s*\|\s*default\([\'"]([^\'"]*)[\'"]?\))?\s*\}\}'
+)
+
+class TemplateString:
+    """String split into literal text and template variable references."""
+    def __init__(self, parts):
+        self.parts = parts
+
+    def render(self, job_vars):
+        output = []
+        for part in self.parts:
+            if isinstance(part, str):
+                output.append(part)
+                continue
+            var_name, default_value, original = part
+            # Use value if variable exists in job_vars, then default, else leave template unchanged
+            if var_name in job_vars:
+                output.append(str(job_vars[var_name]))
+            elif default_value is not None:
+                output.append(default_value)
+            else:
+                output.append(original)
+        return ''.join(output)
+
+class TemplateDict:
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, job_vars):
+        return {key: render_template(value, job_vars) for key, value in self.items}
+
+class TemplateList:
+    def __init__(self, items):
+        self.items = items
+
+    def render(self, job_vars):
+        return [render_template(item, job_vars) for item in self.items]
+
+def compile_template(data):
+    """
+    Compile data into a substitution plan for render_template. Subtrees
+    without template variables are returned unchanged so that they are
+    shared between rendered results, which must be treated as read-only.
+    """
+    if isinstance(data, dict):
+        items = [(key, compile_template(value)) for key, value in data.items()]
+        if not any(isinstance(value, (TemplateDict, TemplateList, TemplateString)) for _, value in items):
+            return data
+        return TemplateDict(items)
+    if isinstance(data, list):
+        items = [compile_template(item) for item in data]
+        if not any(isinstance(item, (TemplateDict, TemplateList, TemplateString)) for item in items):
+            return data
+        return TemplateList(items)
+    if isinstance(data, str):
+        parts = []
+        position = 0
+        for match in template_variable_pattern.finditer(data):
+            if match.start() > position:
+                parts.append(data[position:match.start()])
+            parts.append((match.group(1), match.group(2), match.group(0)))
+            position = match.end()
+        if not parts:
+            return data
+        if position < len(data):
+            parts.append(data[position:])
+        return TemplateString(parts)
+    return data
+
+def render_template(plan, job_vars):
+    """Fill in job_vars values in a plan from compile_template."""
+    if isinstance(plan, (TemplateDict, TemplateList, TemplateString)):
+        return plan.render(job_vars)
+    return plan
+
+class SandboxTemplates:
+    """
+    Compiled sandbox definitions of an AgnosticVComponent by kind. If the
+    component has no sandboxes then error is set to the reason.
+    """
+    def __init__(self, agnosticv_component):
+        self.error = None
+        self.plans_by_kind = {}
+        spec = agnosticv_component.get('spec')
+        if not spec:
+            self.error = "AgnosticV component has no spec"
+            return
+        definition = spec.get('definition')
+        if not definition:
+            self.error = "AgnosticV component has no definition"
+            return
+        meta = definition.get('__meta__')
+        if not meta:
+            self.error = "AgnosticV component has no __meta__ section"
+            return
+        sandboxes = meta.get('sandboxes')
+        if not sandboxes:
+            self.error = "AgnosticV component has no sandboxes defined"
+            return
+        for sandbox in sandboxes:
+            self.plans_by_kind.setdefault(sandbox.get('kind'), []).append(compile_template(sandbox))
+
+    def render(self, kind, job_vars):
+        """Return sandboxes of kind with template variables filled in from job_vars."""
+        return [render_template(plan, job_vars) for plan in self.plans_by_kind.get(kind, [])]
+
+class SandboxTemplateCache:
+    """
+    Cache SandboxTemplates per AgnosticVComponent keyed on resourceVersion.
+
+    The current resourceVersion is read with a metadata-only request so that
+    the full component is only fetched and compiled when it has changed.
+    """
+    def __init__(self, api_client, custom_objects_api, namespace='babylon-config'):
+        self.api_client = api_client
+        self.custom_objects_api = custom_objects_api
+        self.namespace = namespace
+        self.single_flight = SingleFlight()
+        self.templates = {}
+
+    async def get(self, name):
+        return await self.single_flight.run(name, lambda: self.__get(name), label='sandbox-template')
+
+    async def __get(self, name):
+        response = await self.api_client.call_api(
+            f"/apis/gpte.redhat.com/v1/namespaces/{self.namespace}/agnosticvcomponents/{name}",
+            'GET',
+            auth_settings = ['BearerToken'],
+            header_params = {'Accept': 'application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1'},
+            _preload_content = False,
+        )
+        resource_version = json.loads(await response.read())['metadata']['resourceVersion']
+        cached = self.templates.get(name)
+        if cached and cached[0] == resource_version:
+            return cached[1]
+
+        agnosticv_component = await self.custom_objects_api.get_namespaced_custom_object(
+            group = 'gpte.redhat.com',
+            name = name,
+            namespace = self.namespace,
+            plural = 'agnosticvcomponents',
+            version = 'v1',
+        )
+        templates = SandboxTemplates(agnosticv_component)
+        self.templates[name] = (agnosticv_component['metadata']['resourceVersion'], templates)
+        return templates
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from datetime import datetime
+from time import time
+
+from aiohttp import web
+
+logger = logging.getLogger('sandboxtoken')
+
+class SandboxTokenManager:
+    """
+    Cache Sandbox API access tokens per login credential so that the login
+    endpoint is only called when a token is missing or about to expire.
+    """
+    def __init__(self, upstream_sessions, base_url, refresh_margin=30, default_lifetime=300):
+        self.base_url = base_url
+        self.default_lifetime = default_lifetime
+        self.lock = asyncio.Lock()
+        self.refresh_margin = refresh_margin
+        self.tokens = {}
+        self.upstream_sessions = upstream_sessions
+
+    def __cached_token(self, auth_token):
+        access_token, access_token_exp = self.tokens.get(auth_token, (None, 0))
+        if access_token is not None and access_token_exp - self.refresh_margin > time():
+            return access_token
+        return None
+
+    async def get_access_token(self, auth_token):
+        """Return access token for auth_token, logging in if needed."""
+        access_token = self.__cached_token(auth_token)
+        if access_token is not None:
+            return access_token
+        async with self.lock:
+            # Another request may have refreshed the token while waiting on the lock
+            access_token = self.__cached_token(auth_token)
+            if access_token is not None:
+                return access_token
+            async with self.upstream_sessions.get(
+                'sandbox',
+                f"{self.base_url}/api/v1/login",
+                headers={
+                    "Authorization": f"Bearer {auth_token}"
+                },
+            ) as login_resp:
+                if login_resp.status != 200:
+                    raise web.HTTPInternalServerError(reason=f"Failed to login to sandbox API: {login_resp.status}")
+                login_data = await login_resp.json()
+            access_token = login_data.get("access_token")
+            if not access_token:
+                raise web.HTTPInternalServerError(reason="Failed to get access token from sandbox API")
+            self.tokens[auth_token] = (access_token, self.__parse_exp(login_data.get("access_token_exp")))
+            return access_token
+
+    def invalidate(self, auth_token):
+        """Discard cached token, such as after it was rejected."""
+        self.tokens.pop(auth_token, None)
+
+    def __parse_exp(self, access_token_exp):
+        if access_token_exp:
+            try:
+                return datetime.fromisoformat(access_token_exp).timestamp()
+            except (TypeError, ValueError):
+                logger.warning(f"Unable to parse sandbox API access_token_exp {access_token_exp}")
+        return time() + self.default_lifetime
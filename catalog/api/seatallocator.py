@@ -0,0 +1,224 @@
+import asyncio
+import copy
+import logging
+import random
+
+import kubernetes_asyncio
+
+from informer import Informer
+from singleflight import SingleFlight
+
+logger = logging.getLogger('seatallocator')
+
+class SeatIndex:
+    """
+    Index of the user assignments of one workshop or self-paced lab by name,
+    by assigned email, and of the seats that are still free.
+    """
+    def __init__(self):
+        self.assignments = {}
+        self.by_email = {}
+        self.free = set()
+
+    def get_by_email(self, email):
+        name = self.by_email.get(email)
+        return None if name is None else self.assignments[name]
+
+    def remove(self, name):
+        user_assignment = self.assignments.pop(name, None)
+        if user_assignment is None:
+            return
+        self.free.discard(name)
+        email = user_assignment['spec'].get('assignment', {}).get('email')
+        if email and self.by_email.get(email) == name:
+            del self.by_email[email]
+
+    def update(self, user_assignment):
+        name = user_assignment['metadata']['name']
+        self.remove(name)
+        self.assignments[name] = user_assignment
+        if 'assignment' in user_assignment['spec']:
+            email = user_assignment['spec']['assignment'].get('email')
+            if email:
+                self.by_email[email] = name
+        else:
+            self.free.add(name)
+
+class SeatAllocator:
+    """
+    Assign workshop or self-paced lab user assignments (seats) to attendees.
+
+    Once started, a watch on user assignments keeps a SeatIndex per workshop
+    or self-paced lab so that lookups by email are answered from memory.
+    Until the watch is synced, concurrent requests share one list of user
+    assignments instead. Each claim is handed a distinct, randomly chosen
+    free seat which is then confirmed with an optimistic replace.
+    Randomizing the choice also spreads requests from other replicas across
+    the free seats so that conflicts stay rare.
+    """
+    def __init__(self, custom_objects_api, plural, parent_label, max_attempts=20):
+        self.claimed = 0
+        self.conflicts = 0
+        self.custom_objects_api = custom_objects_api
+        self.indexes = {}
+        self.informer = Informer(
+            plural,
+            custom_objects_api.list_cluster_custom_object,
+            group = 'babylon.gpte.redhat.com',
+            plural = plural,
+            version = 'v1',
+        )
+        self.informer.add_handler(self.on_event)
+        self.max_attempts = max_attempts
+        self.parent_label = parent_label
+        self.plural = plural
+        self.released = asyncio.Condition()
+        self.reserved = set()
+        self.single_flight = SingleFlight()
+
+    @property
+    def is_synced(self):
+        return self.informer.is_synced
+
+    async def start(self):
+        await self.informer.start()
+
+    async def stop(self):
+        await self.informer.stop()
+
+    def __index_key(self, user_assignment):
+        parent_name = (user_assignment['metadata'].get('labels') or {}).get(self.parent_label)
+        if parent_name is None:
+            return None
+        return (user_assignment['metadata']['namespace'], parent_name)
+
+    def on_event(self, event_type, obj, previous):
+        name = obj['metadata']['name']
+        index_key = self.__index_key(obj)
+        previous_index_key = self.__index_key(previous) if previous else None
+        if previous_index_key and (event_type == 'DELETED' or previous_index_key != index_key):
+            index = self.indexes.get(previous_index_key)
+            if index is not None:
+                index.remove(name)
+                if not index.assignments:
+                    del self.indexes[previous_index_key]
+        if index_key and event_type != 'DELETED':
+            self.indexes.setdefault(index_key, SeatIndex()).update(obj)
+
+    async def get_index(self, namespace, parent_name):
+        """
+        Return SeatIndex for the user assignments of parent_name. When the
+        watch is synced this is the watch-maintained index, otherwise the
+        user assignments are listed with concurrent callers sharing both the
+        list call and the resulting index.
+        """
+        if self.is_synced:
+            return self.indexes.get((namespace, parent_name)) or SeatIndex()
+        return await self.single_flight.run(
+            ('index', namespace, parent_name),
+            lambda: self.__list_index(namespace, parent_name),
+            label=self.plural,
+        )
+
+    async def __list_index(self, namespace, parent_name):
+        user_assignment_list = await self.custom_objects_api.list_namespaced_custom_object(
+            group='babylon.gpte.redhat.com',
+            label_selector=f"{self.parent_label}={parent_name}",
+            namespace=namespace,
+            plural=self.plural,
+            version='v1',
+        )
+        index = SeatIndex()
+        for user_assignment in user_assignment_list.get('items', []):
+            index.update(user_assignment)
+        return index
+
+    async def claim(self, index, namespace, parent_name, email):
+        """
+        Assign a free seat from index to email and return the updated user
+        assignment, or None if no seat could be claimed. Concurrent claims for
+        the same email share one seat.
+        """
+        return await self.single_flight.run(
+            ('claim', namespace, parent_name, email),
+            lambda: self.__claim(index, namespace, email),
+            label=f"{self.plural}-claim",
+        )
+
+    async def __claim(self, index, namespace, email):
+        for attempt in range(self.max_attempts):
+            user_assignment = index.get_by_email(email)
+            if user_assignment is not None:
+                return user_assignment
+
+            name = await self.__reserve(index, namespace)
+            if name is None:
+                return None
+            try:
+                body = copy.deepcopy(index.assignments[name])
+                body['spec']['assignment'] = {"email": email}
+                user_assignment = await self.custom_objects_api.replace_namespaced_custom_object(
+                    body=body,
+                    group='babylon.gpte.redhat.com',
+                    name=name,
+                    namespace=namespace,
+                    plural=self.plural,
+                    version='v1',
+                )
+                index.update(user_assignment)
+                self.claimed += 1
+                return user_assignment
+            except kubernetes_asyncio.client.exceptions.ApiException as exception:
+                if exception.status not in (404, 409):
+                    raise
+                self.conflicts += 1
+                logger.info(f"Conflict claiming {self.plural} {namespace}/{name}, attempt {attempt + 1}")
+                await self.__refresh(index, namespace, name)
+            finally:
+                async with self.released:
+                    self.reserved.discard((namespace, name))
+                    self.released.notify_all()
+        return None
+
+    async def __reserve(self, index, namespace):
+        """
+        Reserve a random free seat not reserved by another request. If every
+        free seat is reserved, wait for a reservation to be released since the
+        claim holding it may fail.
+        """
+        async with self.released:
+            while True:
+                candidates = [name for name in index.free if (namespace, name) not in self.reserved]
+                if candidates:
+                    name = random.choice(candidates)
+                    self.reserved.add((namespace, name))
+                    return name
+                if not any((namespace, name) in self.reserved for name in index.free):
+                    return None
+                await self.released.wait()
+
+    async def __refresh(self, index, namespace, name):
+        """Update index with the current state of a seat after a failed claim."""
+        try:
+            index.update(
+                await self.custom_objects_api.get_namespaced_custom_object(
+                    group='babylon.gpte.redhat.com',
+                    name=name,
+                    namespace=namespace,
+                    plural=self.plural,
+                    version='v1',
+                )
+            )
+        except kubernetes_asyncio.client.exceptions.ApiException as exception:
+            if exception.status != 404:
+                raise
+            index.remove(name)
+
+    def stats(self):
+        return {
+            "claimed": self.claimed,
+            "conflicts": self.conflicts,
+            "indexed": len(self.informer.objects),
+            "reserved": len(self.reserved),
+            "synced": self.is_synced,
+        }
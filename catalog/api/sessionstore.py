@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from time import monotonic
+
+from redis.exceptions import RedisError
+
+from metrics import cache_requests
+from tracing import trace_span
+
+logger = logging.getLogger('sessionstore')
+
+session_hit = cache_requests.labels('session', 'hit')
+session_miss = cache_requests.labels('session', 'miss')
+session_redis_hit = cache_requests.labels('session', 'redis_hit')
+user_hit = cache_requests.labels('user', 'hit')
+user_miss = cache_requests.labels('user', 'miss')
+
+# Keyspace notification classes needed to see sessions removed from Redis:
+# E for keyevent channels, g for del, x for expired, and e for evicted.
+# These are configured on the Redis server, which may be shared.
+notify_keyspace_events = 'Egxe'
+
+class SessionStore:
+    """
+    User sessions keyed by token with a per-process near-cache of decoded
+    sessions and resolved User objects.
+
+    Sessions are stored in Redis if a connection is given, otherwise only
+    in process. Near-cache entries expire after ttl, which is bounded by the
+    session lifetime and the remaining Redis TTL of the session, and are
+    discarded early when Redis reports that the session key was deleted,
+    expired, or evicted through keyspace notifications.
+    """
+    def __init__(self, redis_connection=None, lifetime=600, ttl=60, max_entries=10000, db=0):
+        self.db = db
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.invalidations = 0
+        self.lifetime = lifetime
+        self.listener_task = None
+        self.max_entries = max_entries
+        self.misses = 0
+        self.redis_connection = redis_connection
+        self.redis_hits = 0
+        self.ttl = min(ttl, lifetime)
+        self.users = OrderedDict()
+
+    @property
+    def channels(self):
+        return [f"__keyevent@{self.db}__:{event}" for event in ('del', 'evicted', 'expired')]
+
+    async def start(self):
+        if not self.redis_connection:
+            return
+        try:
+            config = await self.redis_connection.config_get('notify-keyspace-events')
+            flags = config.get('notify-keyspace-events', '')
+            # A is an alias for all event classes other than key miss and new key
+            enabled = set(flags) | (set('g$lshzxetd') if 'A' in flags else set())
+            missing = ''.join(flag for flag in notify_keyspace_events if flag not in enabled)
+            if missing:
+                logger.warning(
+                    f"Redis notify-keyspace-events is missing {missing}, session near-cache relies on ttl. "
+                    f"Configure Redis with notify-keyspace-events {notify_keyspace_events}."
+                )
+        except RedisError as exception:
+            logger.warning(f"Unable to check Redis keyspace notifications, session near-cache relies on ttl: {exception}")
+        self.listener_task = asyncio.create_task(self.__listen())
+
+    async def stop(self):
+        if self.listener_task:
+            self.listener_task.cancel()
+            try:
+                await self.listener_task
+            except asyncio.CancelledError:
+                pass
+            self.listener_task = None
+
+    async def __listen(self):
+        pubsub = self.redis_connection.pubsub()
+        try:
+            while True:
+                try:
+                    await pubsub.subscribe(*self.channels)
+                    # Removals may have been missed while not subscribed
+                    self.entries.clear()
+                    async for message in pubsub.listen():
+                        self.on_message(message)
+                except RedisError as exception:
+                    logger.warning(f"Session invalidation listener failed: {exception}")
+                    await asyncio.sleep(5)
+        finally:
+            await pubsub.aclose()
+
+    def on_message(self, message):
+        """Handle keyevent notification for a removed key."""
+        if message.get('type') != 'message':
+            return
+        self.invalidate(message['data'])
+
+    def invalidate(self, token):
+        self.invalidations += 1
+        self.entries.pop(token, None)
+
+    async def get(self, token):
+        """Return session for token or None."""
+        entry = self.entries.get(token)
+        if entry is not None:
+            expires, session = entry
+            if expires > monotonic():
+                self.entries.move_to_end(token)
+                self.hits += 1
+                session_hit.inc()
+                return session
+            del self.entries[token]
+
+        if not self.redis_connection:
+            self.misses += 1
+            session_miss.inc()
+            return None
+
+        invalidations = self.invalidations
+        with trace_span('redis GET', kind='client', target='redis'):
+            async with self.redis_connection.pipeline(transaction=False) as pipe:
+                session_json, pttl = await pipe.get(token).pttl(token).execute()
+        if not session_json:
+            self.misses += 1
+            session_miss.inc()
+            return None
+        session = json.loads(session_json)
+        # Do not cache a session that may have been removed while fetching
+        if invalidations == self.invalidations and pttl > 0:
+            self.__store(self.entries, token, session, min(self.ttl, pttl / 1000))
+        self.redis_hits += 1
+        session_redis_hit.inc()
+        return session
+
+    async def set(self, token, session):
+        """Store new session for token."""
+        if self.redis_connection:
+            with trace_span('redis SETEX', kind='client', target='redis'):
+                await self.redis_connection.setex(token, self.lifetime, json.dumps(session, separators=(',',':')))
+            self.__store(self.entries, token, session, self.ttl)
+        else:
+            self.__store(self.entries, token, session, self.lifetime)
+
+    def get_user(self, key):
+        """Return cached User object for key or None."""
+        entry = self.users.get(key)
+        if entry is not None:
+            expires, user = entry
+            if expires > monotonic():
+                self.users.move_to_end(key)
+                user_hit.inc()
+                return user
+            del self.users[key]
+        user_miss.inc()
+        return None
+
+    def set_user(self, key, user):
+        self.__store(self.users, key, user, self.ttl)
+
+    def __store(self, entries, key, value, ttl):
+        entries[key] = (monotonic() + ttl, value)
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            self.__prune(entries)
+
+    def __prune(self, entries):
+        now = monotonic()
+        for key, (expires, _) in list(entries.items()):
+            if expires <= now:
+                del entries[key]
+        # Without Redis the session entries are the only copy of the sessions
+        if entries is self.users or self.redis_connection:
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def prune(self):
+        """Remove expired entries, then the oldest cached entries if still over size."""
+        self.__prune(self.entries)
+        self.__prune(self.users)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "maxEntries": self.max_entries,
+            "misses": self.misses,
+            "redisHits": self.redis_hits,
+            "users": len(self.users),
+        }
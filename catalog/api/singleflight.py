@@ -0,0 +1,57 @@
+import asyncio
+import logging
+
+from tracing import current_span, trace_span
+
+logger = logging.getLogger('singleflight')
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls so that only one is in flight at a
+    time and every caller waiting on the same key shares its result.
+
+    Results are only shared between callers that overlap in time, nothing is
+    cached after the call completes. Callers must treat shared results as
+    read-only.
+
+    The shared call runs outside of any request trace, since it may outlive
+    the request that started it. Each caller instead records a span for its
+    wait on the call, marked coalesced if it joined a call already in flight.
+    """
+    def __init__(self):
+        self.calls = {}
+        self.coalesced = {}
+        self.issued = {}
+
+    async def run(self, key, func, label='default'):
+        """Await func() or join an in-flight call with the same key."""
+        task = self.calls.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.coalesced[label] = self.coalesced.get(label, 0) + 1
+            logger.debug(f"Coalesced {label} call {key}")
+        else:
+            self.issued[label] = self.issued.get(label, 0) + 1
+            task = asyncio.ensure_future(self.__call(func))
+            self.calls[key] = task
+            task.add_done_callback(lambda done, key=key: self.__remove(key, done))
+        with trace_span(f"singleflight {label}", kind='client', coalesced=coalesced, target=label):
+            # Shield so that a cancelled caller does not cancel the call for others
+            return await asyncio.shield(task)
+
+    async def __call(self, func):
+        # Task runs in a copy of the caller's context, detach it from the caller's trace
+        current_span.set(None)
+        return await func()
+
+    def __remove(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+
+    def stats(self):
+        return {
+            label: {
+                "coalesced": self.coalesced.get(label, 0),
+                "issued": self.issued.get(label, 0),
+            } for label in sorted(set(self.issued) | set(self.coalesced))
+        }
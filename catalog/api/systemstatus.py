@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+from informer import Informer
+
+def system_status_from_configmap_data(data):
+    """Return system status from ConfigMap data, using defaults for missing values."""
+    data = data or {}
+    try:
+        wg_blocked_dates = json.loads(data.get('wg_blocked_dates', '[]'))
+    except (json.JSONDecodeError, TypeError):
+        wg_blocked_dates = []
+    return {
+        'workshops_ordering_blocked': data.get('workshops_ordering_blocked', 'false').lower() == 'true',
+        'workshops_ordering_blocked_message': data.get('workshops_ordering_blocked_message', ''),
+        'services_ordering_blocked': data.get('services_ordering_blocked', 'false').lower() == 'true',
+        'services_ordering_blocked_message': data.get('services_ordering_blocked_message', ''),
+        'wg_blocked_dates': wg_blocked_dates,
+        'last_updated_by': data.get('last_updated_by', ''),
+        'last_updated_at': data.get('last_updated_at', ''),
+    }
+
+def etag_matches(etag, if_none_match):
+    """
+    Return True if If-None-Match header value matches etag, using the weak
+    comparison required for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    for value in if_none_match.split(','):
+        value = value.strip()
+        if value == '*':
+            return True
+        if value.startswith('W/'):
+            value = value[2:]
+        if value == etag:
+            return True
+    return False
+
+class SystemStatusCache:
+    """
+    System status kept in memory from a watch on the system status ConfigMap,
+    with the serialized response body and ETag computed once per change.
+    """
+    def __init__(self, core_v1_api, namespace, name):
+        self.informer = Informer(
+            'SystemStatus',
+            core_v1_api.list_namespaced_config_map,
+            field_selector = f"metadata.name={name}",
+            namespace = namespace,
+        )
+        self.informer.add_handler(self.on_event)
+        self.set_data(None)
+
+    @property
+    def is_synced(self):
+        return self.informer.is_synced
+
+    async def start(self):
+        await self.informer.start()
+
+    async def stop(self):
+        await self.informer.stop()
+
+    def on_event(self, event_type, obj, previous):
+        self.set_data(None if event_type == 'DELETED' else obj.get('data'))
+
+    def set_data(self, data):
+        """Update cached status from ConfigMap data."""
+        self.status = system_status_from_configmap_data(data)
+        self.body = json.dumps(self.status).encode('utf-8')
+        self.etag = f"\"{hashlib.sha256(self.body).hexdigest()[:32]}\""
@@ -0,0 +1,112 @@
+import asyncio
+import sys
+import unittest
+
+from urllib3.connection import HTTPHeaderDict
+
+sys.path.insert(0, '.')
+from accesscheck import AccessChecker, api_client_identity
+
+
+class FakeApiClient:
+
+    def __init__(self, user='alice', groups=(), allowed_namespaces=()):
+        self.default_headers = HTTPHeaderDict({'Impersonate-User': user})
+        for group in groups:
+            self.default_headers.add('Impersonate-Group', group)
+        self.allowed_namespaces = allowed_namespaces
+        self.reviews = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def call_api(self, path, method, body, **kwargs):
+        self.reviews.append(body['spec']['resourceAttributes'])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        namespace = body['spec']['resourceAttributes'].get('namespace')
+        return {'status': {'allowed': namespace in self.allowed_namespaces}}, 201, {}
+
+
+class TestAccessChecker(unittest.IsolatedAsyncioTestCase):
+
+    def test_identity_includes_sorted_groups(self):
+        api_client = FakeApiClient(groups=['b', 'a'])
+        self.assertEqual(api_client_identity(api_client), ('alice', ('a', 'b')))
+
+    async def test_results_are_cached(self):
+        access_checker = AccessChecker()
+        api_client = FakeApiClient(allowed_namespaces=['ns1'])
+        self.assertTrue(await access_checker.check(api_client, 'g', 'things', 'list', 'ns1'))
+        self.assertTrue(await access_checker.check(api_client, 'g', 'things', 'list', 'ns1'))
+        self.assertFalse(await access_checker.check(api_client, 'g', 'things', 'list', 'ns2'))
+        self.assertEqual(len(api_client.reviews), 2)
+
+    async def test_cache_is_per_identity(self):
+        access_checker = AccessChecker()
+        await access_checker.check(FakeApiClient(user='alice'), 'g', 'things', 'list', 'ns1')
+        other_api_client = FakeApiClient(user='bob')
+        await access_checker.check(other_api_client, 'g', 'things', 'list', 'ns1')
+        self.assertEqual(len(other_api_client.reviews), 1)
+
+    async def test_expired_results_are_rechecked(self):
+        access_checker = AccessChecker(ttl=0)
+        api_client = FakeApiClient()
+        await access_checker.check(api_client, 'g', 'things', 'list', 'ns1')
+        await access_checker.check(api_client, 'g', 'things', 'list', 'ns1')
+        self.assertEqual(len(api_client.reviews), 2)
+
+    async def test_check_all_is_concurrent_and_bounded(self):
+        access_checker = AccessChecker(concurrency=3)
+        api_client = FakeApiClient(allowed_namespaces=['ns0', 'ns5'])
+        results = await access_checker.check_all(api_client, [
+            ('g', 'things', 'list', f"ns{i}") for i in range(10)
+        ])
+        self.assertEqual(results, [i in (0, 5) for i in range(10)])
+        self.assertEqual(api_client.max_in_flight, 3)
+
+    async def test_check_all_per_call_concurrency(self):
+        access_checker = AccessChecker(concurrency=10)
+        api_client = FakeApiClient()
+        await access_checker.check_all(api_client, [
+            ('g', 'things', 'get', 'ns', f"item{i}") for i in range(10)
+        ], concurrency=2)
+        self.assertEqual(len(api_client.reviews), 10)
+        self.assertEqual(api_client.max_in_flight, 2)
+
+    async def test_review_with_shared_client(self):
+        shared_api_client = FakeApiClient(user='system:serviceaccount', allowed_namespaces=['ns1'])
+        shared_api_client.default_headers = HTTPHeaderDict()
+        calls = []
+        call_api = shared_api_client.call_api
+        async def record_call_api(path, method, body, header_params=None, **kwargs):
+            calls.append(header_params)
+            return await call_api(path, method, body, **kwargs)
+        shared_api_client.call_api = record_call_api
+        access_checker = AccessChecker(api_client=shared_api_client)
+        api_client = FakeApiClient(user='alice', groups=['a', 'b'])
+        self.assertTrue(await access_checker.check(api_client, 'g', 'things', 'list', 'ns1'))
+        self.assertEqual(api_client.reviews, [])
+        self.assertEqual(calls, [[
+            ('Impersonate-User', 'alice'), ('Impersonate-Group', 'a'), ('Impersonate-Group', 'b'),
+        ]])
+
+    def test_prune_bounds_size(self):
+        access_checker = AccessChecker(max_entries=3)
+        for i in range(5):
+            access_checker.cache[i] = (True, float('inf'))
+        access_checker.prune()
+        self.assertEqual(list(access_checker.cache), [3, 4])
+
+    def test_prune_drops_expired_from_front(self):
+        access_checker = AccessChecker(max_entries=10)
+        access_checker.cache[0] = (True, 0)
+        access_checker.cache[1] = (True, 0)
+        access_checker.cache[2] = (True, float('inf'))
+        access_checker.prune()
+        self.assertEqual(list(access_checker.cache), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import asyncio
 import json
 import sys
 import unittest
+from contextlib import asynccontextmanager
 from unittest.mock import patch
 
 sys.path.insert(0, '.')
@@ -11,7 +13,11 @@ from audit import (
     extract_details,
     audit_log,
     audit_log_api_action,
+    HttpAuditWriter,
+    start_audit_sink,
+    stop_audit_sink,
 )
+import audit
 
 
 class TestParseK8sPath(unittest.TestCase):
@@ -506,5 +512,100 @@ class TestAuditLogApiAction(unittest.TestCase):
         self.assertIn('event', record)
 
 
+class ListAuditWriter:
+
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+
+    async def write(self, lines):
+        await asyncio.sleep(0)
+        self.batches.append([json.loads(line) for line in lines])
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAuditSink(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await stop_audit_sink()
+
+    async def test_records_written_in_order(self):
+        writer = ListAuditWriter()
+        start_audit_sink(writer, batch_size=10)
+        with patch.object(audit_logger, 'info') as mock_info:
+            for i in range(25):
+                audit_log('test_event', user=f"user{i}")
+            audit_log_api_action('alice', None, 'DELETE', '/apis/babylon.gpte.redhat.com/v1/namespaces/x/workshops/w1', 200, None)
+            self.assertFalse(mock_info.called)
+        await stop_audit_sink()
+        records = [record for batch in writer.batches for record in batch]
+        self.assertEqual([record['user'] for record in records[:25]], [f"user{i}" for i in range(25)])
+        self.assertEqual(records[25]['action'], 'delete_workshop')
+        self.assertTrue(all(len(batch) <= 10 for batch in writer.batches))
+        self.assertTrue(writer.closed)
+        self.assertIsNone(audit.audit_sink)
+
+    async def test_overflow_counted(self):
+        writer = ListAuditWriter()
+        sink = start_audit_sink(writer, queue_size=5)
+        for i in range(8):
+            audit_log('test_event', user=f"user{i}")
+        self.assertEqual(sink.stats()['dropped'], 3)
+        await stop_audit_sink()
+        self.assertEqual(sink.stats()['written'], 5)
+
+    async def test_unserializable_record_skipped(self):
+        writer = ListAuditWriter()
+        start_audit_sink(writer)
+        audit_log('test_event', user='alice', details={'bad': object()})
+        audit_log('test_event', user='bob')
+        await stop_audit_sink()
+        self.assertEqual([record['user'] for batch in writer.batches for record in batch], ['bob'])
+
+    async def test_synchronous_after_stop(self):
+        start_audit_sink(ListAuditWriter())
+        await stop_audit_sink()
+        with patch.object(audit_logger, 'info') as mock_info:
+            audit_log('test_event', user='alice')
+            self.assertTrue(mock_info.called)
+
+
+class FakeResponse:
+
+    def __init__(self, status):
+        self.status = status
+
+
+class FakeUpstreamSessions:
+
+    def __init__(self, status):
+        self.posts = []
+        self.status = status
+
+    @asynccontextmanager
+    async def post(self, name, url, data, headers):
+        self.posts.append(data)
+        yield FakeResponse(self.status)
+
+
+class TestHttpAuditWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_post_ndjson(self):
+        upstream_sessions = FakeUpstreamSessions(200)
+        await HttpAuditWriter(upstream_sessions, 'http://collector').write(['{"a":1}', '{"b":2}'])
+        self.assertEqual(upstream_sessions.posts, [b'{"a":1}\n{"b":2}\n'])
+
+    async def test_failed_batch_logged(self):
+        upstream_sessions = FakeUpstreamSessions(503)
+        writer = HttpAuditWriter(upstream_sessions, 'http://collector', retries=2, retry_delay=0)
+        with patch.object(audit_logger, 'info') as mock_info:
+            await writer.write(['{"a":1}'])
+            mock_info.assert_called_once_with('{"a":1}')
+        self.assertEqual(len(upstream_sessions.posts), 2)
+        self.assertEqual(writer.failed, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,224 @@
+import base64
+import gzip
+import json
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from informer import Informer, match_label_selector, parse_label_selector
+from catalogitemcache import CatalogItemCache
+from groupmembership import GroupMembershipCache
+from jsontransform import parse_projection
+
+
+def catalog_item(name, namespace='babylon-catalog-test', resource_version='1', labels=None):
+    return {
+        'apiVersion': 'babylon.gpte.redhat.com/v1',
+        'kind': 'CatalogItem',
+        'metadata': {
+            'labels': labels or {},
+            'managedFields': [{'manager': 'test'}],
+            'name': name,
+            'namespace': namespace,
+            'resourceVersion': resource_version,
+        },
+    }
+
+
+class FakeListResponse:
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeCustomObjectsApi:
+
+    def __init__(self):
+        self.items = []
+        self.resource_version = '1'
+
+    async def list_cluster_custom_object(self, **kwargs):
+        return FakeListResponse({
+            'items': self.items,
+            'metadata': {'resourceVersion': self.resource_version},
+        })
+
+
+class TestLabelSelector(unittest.TestCase):
+
+    def test_empty_selector_matches(self):
+        self.assertTrue(match_label_selector(parse_label_selector(''), {'a': 'b'}))
+
+    def test_equality(self):
+        requirements = parse_label_selector('app=foo,tier==web')
+        self.assertTrue(match_label_selector(requirements, {'app': 'foo', 'tier': 'web'}))
+        self.assertFalse(match_label_selector(requirements, {'app': 'foo'}))
+
+    def test_inequality_matches_missing_label(self):
+        requirements = parse_label_selector('app!=foo')
+        self.assertTrue(match_label_selector(requirements, {}))
+        self.assertFalse(match_label_selector(requirements, {'app': 'foo'}))
+
+    def test_exists_and_not_exists(self):
+        self.assertTrue(match_label_selector(parse_label_selector('app'), {'app': 'x'}))
+        self.assertFalse(match_label_selector(parse_label_selector('!app'), {'app': 'x'}))
+
+    def test_set_based(self):
+        requirements = parse_label_selector('env in (dev, prod),tier notin (db)')
+        self.assertTrue(match_label_selector(requirements, {'env': 'dev', 'tier': 'web'}))
+        self.assertFalse(match_label_selector(requirements, {'env': 'test'}))
+        self.assertFalse(match_label_selector(requirements, {'env': 'prod', 'tier': 'db'}))
+
+    def test_invalid_selector(self):
+        with self.assertRaises(ValueError):
+            parse_label_selector('env in dev')
+
+
+class TestInformer(unittest.IsolatedAsyncioTestCase):
+
+    async def test_relist_reports_changes(self):
+        api = FakeCustomObjectsApi()
+        informer = Informer('test', api.list_cluster_custom_object)
+        events = []
+        informer.add_handler(lambda event_type, obj, previous: events.append((event_type, obj['metadata']['name'])))
+
+        api.items = [catalog_item('a'), catalog_item('b')]
+        await informer._Informer__list()
+        self.assertTrue(informer.is_synced)
+        self.assertEqual(sorted(events), [('ADDED', 'a'), ('ADDED', 'b')])
+        self.assertNotIn('managedFields', informer.get('babylon-catalog-test', 'a')['metadata'])
+
+        events.clear()
+        api.items = [catalog_item('a'), catalog_item('c', resource_version='2')]
+        api.resource_version = '2'
+        await informer._Informer__list()
+        self.assertEqual(sorted(events), [('ADDED', 'c'), ('DELETED', 'b')])
+        self.assertEqual(informer.resource_version, '2')
+
+
+class TestCatalogItemCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.api = FakeCustomObjectsApi()
+        self.api.items = [catalog_item(name, labels={'stage': 'prod' if name != 'b' else 'dev'}) for name in 'abcde']
+        self.cache = CatalogItemCache(self.api)
+        await self.cache.informer._Informer__list()
+
+    def decode(self, body):
+        return json.loads(gzip.decompress(body))
+
+    def test_get(self):
+        status, body = self.cache.get('babylon-catalog-test', 'c')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.decode(body)['metadata']['name'], 'c')
+
+    def test_get_not_found(self):
+        status, body = self.cache.get('babylon-catalog-test', 'z')
+        self.assertEqual(status, 404)
+        self.assertEqual(self.decode(body)['reason'], 'NotFound')
+
+    def test_list_pagination(self):
+        status, body = self.cache.list('babylon-catalog-test', limit=2)
+        data = self.decode(body)
+        self.assertEqual([item['metadata']['name'] for item in data['items']], ['a', 'b'])
+        self.assertEqual(data['metadata']['remainingItemCount'], 3)
+        status, body = self.cache.list('babylon-catalog-test', limit=2, continue_token=data['metadata']['continue'])
+        data = self.decode(body)
+        self.assertEqual([item['metadata']['name'] for item in data['items']], ['c', 'd'])
+
+    def test_list_label_selector(self):
+        status, body = self.cache.list('babylon-catalog-test', label_selector='stage=dev')
+        data = self.decode(body)
+        self.assertEqual([item['metadata']['name'] for item in data['items']], ['b'])
+        self.assertNotIn('continue', data['metadata'])
+
+    def test_list_response_reused_until_change(self):
+        first = self.cache.list('babylon-catalog-test')
+        self.assertIs(self.cache.list('babylon-catalog-test'), first)
+        self.cache.on_event('MODIFIED', catalog_item('a', resource_version='5'), None)
+        self.assertIsNot(self.cache.list('babylon-catalog-test'), first)
+
+    async def test_namespace_digest(self):
+        digest = self.cache.namespace_digest('babylon-catalog-test')
+        reordered = CatalogItemCache(self.api)
+        self.api.items = list(reversed(self.api.items))
+        await reordered.informer._Informer__list()
+        self.assertEqual(reordered.namespace_digest('babylon-catalog-test'), digest)
+
+        self.api.items = self.api.items[1:]
+        await self.cache.informer._Informer__list()
+        self.assertNotEqual(self.cache.namespace_digest('babylon-catalog-test'), digest)
+
+    def test_not_found_not_cached(self):
+        self.cache.get('babylon-catalog-test', 'z')
+        self.cache.get('other-namespace', 'a')
+        self.assertEqual(len(self.cache.responses), 0)
+
+    def test_responses_bounded(self):
+        self.cache.max_entries = 3
+        for limit in range(1, 6):
+            self.cache.list('babylon-catalog-test', limit=limit)
+        self.assertEqual(len(self.cache.responses), 3)
+        first = self.cache.list('babylon-catalog-test', limit=3)
+        self.cache.list('babylon-catalog-test', limit=1)
+        self.assertIs(self.cache.list('babylon-catalog-test', limit=3), first)
+
+    def test_list_projection(self):
+        status, body = self.cache.list(
+            'babylon-catalog-test', limit=2, projection=parse_projection(["metadata.labels['stage']"])
+        )
+        data = self.decode(body)
+        self.assertEqual(data['items'][1]['metadata'], {
+            'labels': {'stage': 'dev'},
+            'name': 'b',
+            'namespace': 'babylon-catalog-test',
+            'resourceVersion': '1',
+        })
+        self.assertIn('continue', data['metadata'])
+        self.assertIn('labels', self.cache.informer.get('babylon-catalog-test', 'b')['metadata'])
+
+    def test_invalid_continue_token(self):
+        with self.assertRaises(ValueError):
+            self.cache.list('babylon-catalog-test', continue_token=base64.urlsafe_b64encode(b'junk').decode())
+
+
+def group(name, users):
+    return {'metadata': {'name': name, 'resourceVersion': '1'}, 'users': users}
+
+
+class TestGroupMembershipCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = GroupMembershipCache(FakeCustomObjectsApi())
+
+    def test_added(self):
+        self.cache.on_event('ADDED', group('admins', ['alice', 'bob']), None)
+        self.cache.on_event('ADDED', group('devs', ['alice']), None)
+        self.assertEqual(self.cache.get_user_groups('alice'), ['admins', 'devs'])
+        self.assertEqual(self.cache.get_user_groups('bob'), ['admins'])
+        self.assertEqual(self.cache.get_user_groups('carol'), [])
+
+    def test_modified_membership(self):
+        previous = group('admins', ['alice', 'bob'])
+        self.cache.on_event('ADDED', previous, None)
+        self.cache.on_event('MODIFIED', group('admins', ['bob', 'carol']), previous)
+        self.assertEqual(self.cache.get_user_groups('alice'), [])
+        self.assertEqual(self.cache.get_user_groups('carol'), ['admins'])
+        self.assertNotIn('alice', self.cache.user_groups)
+
+    def test_deleted(self):
+        admins = group('admins', ['alice'])
+        self.cache.on_event('ADDED', admins, None)
+        self.cache.on_event('DELETED', admins, admins)
+        self.assertEqual(self.cache.get_user_groups('alice'), [])
+
+    def test_group_without_users(self):
+        self.cache.on_event('ADDED', group('empty', None), None)
+        self.assertEqual(self.cache.user_groups, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
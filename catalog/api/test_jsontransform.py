@@ -0,0 +1,150 @@
+import gzip
+import json
+import sys
+import unittest
+import zlib
+
+sys.path.insert(0, '.')
+import jsontransform
+from jsontransform import (
+    decode_json, encode_json, iter_encoded_json, parse_projection, parse_projection_path, project, run_transform,
+    select_content_encoding, transform_json,
+)
+
+
+def resource_list(count):
+    return {
+        'apiVersion': 'poolboy.gpte.redhat.com/v1',
+        'kind': 'ResourceClaimList',
+        'metadata': {'resourceVersion': '42'},
+        'items': [
+            {
+                'metadata': {
+                    'name': f"claim-{i}",
+                    'managedFields': [{'manager': 'kubectl', 'fieldsV1': {'f:spec': {}}}],
+                },
+                'spec': {'value': 'x' * 100},
+            } for i in range(count)
+        ],
+    }
+
+
+class TestSelectContentEncoding(unittest.TestCase):
+
+    def test_missing_header(self):
+        self.assertIsNone(select_content_encoding(None))
+
+    def test_prefers_gzip(self):
+        self.assertEqual(select_content_encoding('deflate, gzip;q=1.0, br'), 'gzip')
+
+    def test_deflate_only(self):
+        self.assertEqual(select_content_encoding('deflate'), 'deflate')
+
+    def test_gzip_refused(self):
+        self.assertIsNone(select_content_encoding('gzip;q=0, identity'))
+
+    def test_wildcard(self):
+        self.assertEqual(select_content_encoding('*'), 'gzip')
+
+
+class TestTransformJson(unittest.TestCase):
+
+    def test_strips_managed_fields_and_gzips(self):
+        raw = json.dumps(resource_list(3)).encode('utf-8')
+        data = json.loads(gzip.decompress(transform_json(raw, 'gzip')))
+        self.assertEqual(data['metadata'], {'resourceVersion': '42'})
+        self.assertEqual([item['metadata'] for item in data['items']], [
+            {'name': 'claim-0'}, {'name': 'claim-1'}, {'name': 'claim-2'},
+        ])
+
+    def test_single_object(self):
+        raw = json.dumps({'metadata': {'name': 'a', 'managedFields': []}}).encode('utf-8')
+        self.assertEqual(json.loads(transform_json(raw)), {'metadata': {'name': 'a'}})
+
+    def test_deflate(self):
+        data = resource_list(2)
+        self.assertEqual(json.loads(zlib.decompress(encode_json(data, 'deflate'))), data)
+
+    def test_chunked_output_is_valid(self):
+        data = resource_list(2000)
+        self.assertEqual(json.loads(gzip.decompress(encode_json(data, 'gzip'))), data)
+        self.assertEqual(json.loads(encode_json(data)), data)
+
+    def test_empty_list(self):
+        self.assertEqual(json.loads(encode_json({'items': []})), {'items': []})
+
+    def test_identity_streamed_in_blocks(self):
+        data = resource_list(2000)
+        blocks = list(iter_encoded_json(data))
+        self.assertGreater(len(blocks), 1)
+        self.assertTrue(all(len(block) < 2 * jsontransform.chunk_size for block in blocks))
+        self.assertEqual(json.loads(b''.join(blocks)), data)
+
+    def test_decode_json(self):
+        raw = json.dumps({'metadata': {'name': 'a', 'managedFields': []}}).encode('utf-8')
+        self.assertEqual(decode_json(raw), {'metadata': {'name': 'a'}})
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_parse_path(self):
+        self.assertEqual(parse_projection_path('$.metadata.name'), ('metadata', 'name'))
+        self.assertEqual(parse_projection_path('spec.resources[0].state'), ('spec', 'resources', 0, 'state'))
+        self.assertEqual(
+            parse_projection_path("metadata.labels['babylon.gpte.redhat.com/catalogItemName']"),
+            ('metadata', 'labels', 'babylon.gpte.redhat.com/catalogItemName'),
+        )
+        self.assertEqual(parse_projection_path('status.resources[*].name'), ('status', 'resources', '*', 'name'))
+
+    def test_parse_invalid_path(self):
+        for path in ('$', 'spec..name', 'spec[?(@.name)]', "metadata.labels['x"):
+            with self.assertRaises(ValueError, msg=path):
+                parse_projection_path(path)
+
+    def test_parse_comma_separated(self):
+        paths = parse_projection(["spec.a,metadata.labels['a,b']", 'status'])
+        self.assertEqual(paths[-3:], (('spec', 'a'), ('metadata', 'labels', 'a,b'), ('status',)))
+        self.assertIsNone(parse_projection([]))
+
+    def test_project(self):
+        obj = {
+            'apiVersion': 'poolboy.gpte.redhat.com/v1',
+            'kind': 'ResourceClaim',
+            'metadata': {'name': 'a', 'namespace': 'user-a', 'annotations': {'x': 'y'}},
+            'spec': {'a': 1, 'b': 2},
+            'status': {'resources': [{'name': 'r1', 'state': {'kind': 'AnarchySubject', 'spec': {}}}, {'name': 'r2'}]},
+        }
+        self.assertEqual(project(obj, parse_projection(['spec.a', 'status.resources[*].state.kind'])), {
+            'apiVersion': 'poolboy.gpte.redhat.com/v1',
+            'kind': 'ResourceClaim',
+            'metadata': {'name': 'a', 'namespace': 'user-a'},
+            'spec': {'a': 1},
+            'status': {'resources': [{'state': {'kind': 'AnarchySubject'}}, None]},
+        })
+        self.assertEqual(obj['spec'], {'a': 1, 'b': 2})
+
+    def test_project_overlapping_paths(self):
+        obj = {'metadata': {'name': 'a'}, 'spec': {'a': {'b': 1, 'c': 2}}}
+        expected = {'metadata': {'name': 'a'}, 'spec': {'a': {'b': 1, 'c': 2}}}
+        self.assertEqual(project(obj, parse_projection(['spec.a', 'spec.a.b'])), expected)
+        self.assertEqual(project(obj, parse_projection(['spec.a.b', 'spec.a'])), expected)
+        self.assertEqual(obj, expected)
+
+    def test_transform_list_projection(self):
+        raw = json.dumps(resource_list(3)).encode('utf-8')
+        data = json.loads(transform_json(raw, projection=parse_projection(['spec.missing'])))
+        self.assertEqual(data['metadata'], {'resourceVersion': '42'})
+        self.assertEqual(data['items'][2], {'metadata': {'name': 'claim-2'}})
+
+
+class TestRunTransform(unittest.IsolatedAsyncioTestCase):
+
+    async def test_small_and_large_bodies(self):
+        raw = json.dumps(resource_list(1)).encode('utf-8')
+        small = await run_transform(len(raw), transform_json, raw, None)
+        large = await run_transform(jsontransform.offload_threshold, transform_json, raw, None)
+        self.assertEqual(small, large)
+
+
+if __name__ == '__main__':
+    unittest.main()
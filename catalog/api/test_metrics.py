@@ -0,0 +1,63 @@
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from metrics import Registry
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        requests = registry.counter('test_requests_total', 'Requests.', ('route', 'status'))
+        in_flight = registry.gauge('test_in_flight', 'In flight.')
+        requests.labels('/api/"x"', '200').inc()
+        requests.labels('/api/"x"', '200').inc(2)
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+        self.assertEqual(registry.render().decode('utf-8').splitlines(), [
+            '# HELP test_requests_total Requests.',
+            '# TYPE test_requests_total counter',
+            'test_requests_total{route="/api/\\"x\\"",status="200"} 3',
+            '# HELP test_in_flight In flight.',
+            '# TYPE test_in_flight gauge',
+            'test_in_flight 1',
+        ])
+
+    def test_histogram(self):
+        registry = Registry()
+        duration = registry.histogram('test_duration_seconds', 'Duration.', ('target',), buckets=(0.1, 1))
+        child = duration.labels('kube')
+        child.observe(0.05)
+        child.observe(0.1)
+        child.observe(0.5)
+        child.observe(3)
+        lines = registry.render().decode('utf-8').splitlines()
+        self.assertEqual(lines[2:], [
+            'test_duration_seconds_bucket{target="kube",le="0.1"} 2',
+            'test_duration_seconds_bucket{target="kube",le="1"} 3',
+            'test_duration_seconds_bucket{target="kube",le="+Inf"} 4',
+            'test_duration_seconds_sum{target="kube"} 3.65',
+            'test_duration_seconds_count{target="kube"} 4',
+        ])
+
+    def test_callback(self):
+        registry = Registry()
+        stats = None
+        registry.callback('test_entries', 'Entries.', ('cache',), lambda: {('response',): stats['entries']})
+        self.assertEqual(registry.render(), b'')
+        stats = {'entries': 5}
+        self.assertIn('test_entries{cache="response"} 5', registry.render().decode('utf-8'))
+
+    def test_invalid_labels(self):
+        registry = Registry()
+        requests = registry.counter('test_requests_total', 'Requests.', ('route',))
+        with self.assertRaises(ValueError):
+            requests.labels('/', '200')
+        with self.assertRaises(ValueError):
+            registry.counter('test_requests_total', 'Requests.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import copy
+import json
+import sys
+import unittest
+
+import kubernetes_asyncio
+
+sys.path.insert(0, '.')
+from catalogitemcache import CatalogItemCache
+from multiworkshopcache import MultiWorkshopCache
+
+
+def resource(kind, name, namespace, labels=None, **fields):
+    return {
+        'kind': kind,
+        'metadata': {'labels': labels or {}, 'name': name, 'namespace': namespace, 'resourceVersion': '1'},
+        **fields,
+    }
+
+
+def resource_handle(name, pool, available=True):
+    return resource(
+        'ResourceHandle', name, 'poolboy',
+        labels={'poolboy.gpte.redhat.com/resource-pool-name': pool},
+        spec={} if available else {'resourceClaim': {'name': 'claimed'}},
+        status={'healthy': True, 'ready': True},
+    )
+
+
+class FakeListResponse:
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeCustomObjectsApi:
+
+    def __init__(self):
+        self.calls = 0
+        self.objects = {
+            'catalogitems': [
+                resource('CatalogItem', 'lab.prod', 'babylon-catalog-prod', labels={
+                    'babylon.gpte.redhat.com/Product': 'OpenShift',
+                    'babylon.gpte.redhat.com/Product_Family': 'Cloud',
+                }),
+            ],
+            'multiworkshops': [
+                resource(
+                    'MultiWorkshop', 'summit', 'user-test',
+                    labels={'babylon.gpte.redhat.com/multi-workshop-id': 'abc'},
+                    spec={'assets': [
+                        {'name': 'ws', 'namespace': 'user-test'},
+                        {'type': 'external', 'url': 'https://demo.example.com/lab-event/lab.prod'},
+                    ]},
+                ),
+            ],
+            'resourcehandles': [
+                resource('ResourceHandle', 'unpooled', 'poolboy', spec={}),
+                resource_handle('h1', 'lab.prod'),
+                resource_handle('h2', 'lab.prod'),
+                resource_handle('h3', 'lab.prod', available=False),
+            ],
+            'workshops': [
+                resource('Workshop', 'ws', 'user-test', labels={
+                    'babylon.gpte.redhat.com/catalogItemName': 'lab.prod',
+                    'babylon.gpte.redhat.com/catalogItemNamespace': 'babylon-catalog-prod',
+                }, status={'userCount': {'available': 7}}),
+            ],
+        }
+
+    def __items(self, plural, namespace=None, label_selector=None):
+        items = [
+            copy.deepcopy(obj) for obj in self.objects[plural]
+            if namespace is None or obj['metadata']['namespace'] == namespace
+        ]
+        if label_selector and '=' in label_selector:
+            key, value = label_selector.split('=')
+            items = [obj for obj in items if obj['metadata']['labels'].get(key) == value]
+        elif label_selector:
+            items = [obj for obj in items if label_selector in obj['metadata']['labels']]
+        return items
+
+    async def list_cluster_custom_object(self, plural, _preload_content=True, label_selector=None, **kwargs):
+        self.calls += 1
+        data = {'items': self.__items(plural, label_selector=label_selector), 'metadata': {'resourceVersion': '1'}}
+        return data if _preload_content else FakeListResponse(data)
+
+    async def list_namespaced_custom_object(self, plural, namespace, _preload_content=True, label_selector=None, **kwargs):
+        self.calls += 1
+        data = {'items': self.__items(plural, namespace, label_selector), 'metadata': {'resourceVersion': '1'}}
+        return data if _preload_content else FakeListResponse(data)
+
+    async def get_namespaced_custom_object(self, plural, namespace, name, **kwargs):
+        self.calls += 1
+        for obj in self.__items(plural, namespace):
+            if obj['metadata']['name'] == name:
+                return obj
+        raise kubernetes_asyncio.client.exceptions.ApiException(status=404)
+
+
+class TestMultiWorkshopCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.api = FakeCustomObjectsApi()
+        self.catalog_item_cache = CatalogItemCache(self.api)
+        self.cache = MultiWorkshopCache(self.api, self.catalog_item_cache.informer)
+
+    async def sync(self):
+        for informer in (
+            self.catalog_item_cache.informer,
+            self.cache.multiworkshop_informer,
+            self.cache.resource_handle_informer,
+            self.cache.workshop_informer,
+        ):
+            await informer._Informer__list()
+        self.api.calls = 0
+
+    def assertEnriched(self, data):
+        self.assertEqual(data['spec']['assets'][0]['availableSeats'], 7)
+        self.assertEqual(data['spec']['assets'][0]['product'], 'OpenShift')
+        self.assertEqual(data['spec']['assets'][1]['availableSeats'], 2)
+        self.assertEqual(data['spec']['assets'][1]['productFamily'], 'Cloud')
+
+    async def test_unsynced_fetches_from_api(self):
+        status, data = await self.cache.get('abc')
+        self.assertEqual(status, 200)
+        self.assertEnriched(data)
+        self.assertEqual(self.cache.responses, {})
+        self.assertNotIn('availableSeats', self.api.objects['multiworkshops'][0]['spec']['assets'][0])
+
+    async def test_synced_response_cached(self):
+        await self.sync()
+        status, data = await self.cache.get('abc')
+        self.assertEqual(status, 200)
+        self.assertEnriched(data)
+        self.assertIs((await self.cache.get('abc'))[1], data)
+        self.assertEqual(self.api.calls, 0)
+        self.assertNotIn('availableSeats', self.cache.workshop_informer.get('user-test', 'ws'))
+
+    async def test_not_found_not_cached(self):
+        await self.sync()
+        self.assertEqual((await self.cache.get('xyz'))[0], 404)
+        self.assertNotIn('xyz', self.cache.responses)
+        self.assertNotIn(('multiworkshop', 'xyz'), self.cache.dependents)
+        multiworkshop = resource('MultiWorkshop', 'other', 'user-test', labels={'babylon.gpte.redhat.com/multi-workshop-id': 'xyz'})
+        self.cache.multiworkshop_informer.objects[('user-test', 'other')] = multiworkshop
+        self.assertEqual((await self.cache.get('xyz'))[0], 200)
+
+    async def test_only_pooled_handles_cached(self):
+        await self.sync()
+        self.assertEqual(
+            self.cache.resource_handle_informer.list_kwargs['label_selector'],
+            'poolboy.gpte.redhat.com/resource-pool-name',
+        )
+        self.assertIsNone(self.cache.resource_handle_informer.get('poolboy', 'unpooled'))
+        self.assertEqual(self.cache.available_handles, {'lab.prod': 2})
+
+    async def test_workshop_change_invalidates(self):
+        await self.sync()
+        await self.cache.get('abc')
+        self.cache.on_workshop_event('MODIFIED', self.api.objects['workshops'][0], None)
+        self.assertNotIn('abc', self.cache.responses)
+
+    async def test_resource_handle_availability(self):
+        await self.sync()
+        await self.cache.get('abc')
+        claimed = resource_handle('h1', 'lab.prod', available=False)
+        self.cache.on_resource_handle_event('MODIFIED', claimed, resource_handle('h1', 'lab.prod'))
+        self.assertEqual(self.cache.available_handles, {'lab.prod': 1})
+        self.assertNotIn('abc', self.cache.responses)
+        status, data = await self.cache.get('abc')
+        self.assertEqual(data['spec']['assets'][1]['availableSeats'], 1)
+        self.cache.on_resource_handle_event('DELETED', resource_handle('h2', 'lab.prod'), resource_handle('h2', 'lab.prod'))
+        self.assertEqual(self.cache.available_handles, {})
+
+    async def test_change_while_building(self):
+        await self.sync()
+        get_workshop = self.cache.workshop_informer.get
+        def get_workshop_with_event(namespace, name):
+            self.cache.on_workshop_event('MODIFIED', self.workshop_event, None)
+            return get_workshop(namespace, name)
+        self.cache.workshop_informer.get = get_workshop_with_event
+
+        self.workshop_event = resource('Workshop', 'other', 'user-test')
+        await self.cache.get('abc')
+        self.assertIn('abc', self.cache.responses)
+
+        self.cache.responses.clear()
+        self.workshop_event = self.api.objects['workshops'][0]
+        await self.cache.get('abc')
+        self.assertNotIn('abc', self.cache.responses)
+
+    async def test_unrelated_change_keeps_response(self):
+        await self.sync()
+        await self.cache.get('abc')
+        self.cache.on_resource_handle_event('ADDED', resource_handle('x1', 'other.prod'), None)
+        self.assertIn('abc', self.cache.responses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from responsecache import ResponseCache
+
+
+class FakeRedis:
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8') if isinstance(value, str) else value
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_local_hit(self):
+        cache = ResponseCache()
+        version = cache.get_version('ns')
+        self.assertIsNone(await cache.get('ns', version, 'gzip:/path'))
+        await cache.set('ns', version, 'gzip:/path', 200, {'Content-Encoding': 'gzip'}, b'body')
+        self.assertEqual(await cache.get('ns', version, 'gzip:/path'), (200, {'Content-Encoding': 'gzip'}, b'body'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    async def test_lru_bound(self):
+        cache = ResponseCache(max_entries=2)
+        await cache.set('ns', '0', 'a', 200, {}, b'a')
+        await cache.set('ns', '0', 'b', 200, {}, b'b')
+        await cache.get('ns', '0', 'a')
+        await cache.set('ns', '0', 'c', 200, {}, b'c')
+        self.assertIsNone(await cache.get('ns', '0', 'b'))
+        self.assertIsNotNone(await cache.get('ns', '0', 'a'))
+
+    async def test_expired_entries(self):
+        cache = ResponseCache(ttl=0)
+        await cache.set('ns', '0', 'a', 200, {}, b'a')
+        self.assertIsNone(await cache.get('ns', '0', 'a'))
+        await cache.set('ns', '0', 'b', 200, {}, b'b')
+        cache.prune()
+        self.assertEqual(cache.entries, {})
+
+    async def test_version_change_discards_entries(self):
+        cache = ResponseCache()
+        await cache.set('ns', '0', 'a', 200, {}, b'a')
+        await cache.set('other', '0', 'a', 200, {}, b'a')
+        cache.set_version('ns', '5')
+        self.assertEqual(cache.get_version('ns'), '5')
+        self.assertEqual([cache_key[0] for cache_key in cache.entries], ['other'])
+
+    async def test_outdated_response_not_stored(self):
+        cache = ResponseCache()
+        version = cache.get_version('ns')
+        cache.set_version('ns', '5')
+        await cache.set('ns', version, 'a', 200, {}, b'a')
+        self.assertEqual(cache.entries, {})
+
+    async def test_shared_through_redis(self):
+        redis = FakeRedis()
+        first = ResponseCache(redis_connection=redis)
+        second = ResponseCache(redis_connection=redis)
+        await first.set('ns', '7', 'gzip:/path', 200, {'Content-Type': 'application/json'}, b'\x1f\x8b\nbody')
+        self.assertEqual(
+            await second.get('ns', '7', 'gzip:/path'),
+            (200, {'Content-Type': 'application/json'}, b'\x1f\x8b\nbody'),
+        )
+        self.assertEqual(second.stats()['redisHits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
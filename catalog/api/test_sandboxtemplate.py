@@ -0,0 +1,124 @@
+import json
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from sandboxtemplate import SandboxTemplateCache, SandboxTemplates, compile_template, render_template
+
+
+def agnosticv_component(resource_version='1', sandboxes=None):
+    return {
+        'metadata': {'name': 'test.lab.prod', 'resourceVersion': resource_version},
+        'spec': {'definition': {'__meta__': {'sandboxes': sandboxes if sandboxes is not None else [
+            {
+                'kind': 'OcpSandbox',
+                'cloud_selector': {
+                    'virt': '{{ job_vars.param_selector_virt | default("no") }}',
+                    'region': '{{ job_vars.param_selector_region }}',
+                },
+                'quota': {'limits': {'cpu': '10'}},
+            },
+            {'kind': 'AwsSandbox', 'count': 1},
+            {'kind': 'OcpSandbox', 'alias': 'second-{{job_vars.param_selector_name}}-x'},
+        ]}}},
+    }
+
+
+class FakeResponse:
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeApiClient:
+
+    def __init__(self, component):
+        self.component = component
+        self.headers = []
+
+    async def call_api(self, path, method, header_params, **kwargs):
+        self.headers.append(header_params['Accept'])
+        return FakeResponse({'metadata': {'resourceVersion': self.component['metadata']['resourceVersion']}})
+
+
+class FakeCustomObjectsApi:
+
+    def __init__(self, api_client):
+        self.api_client = api_client
+        self.calls = 0
+
+    async def get_namespaced_custom_object(self, **kwargs):
+        self.calls += 1
+        return self.api_client.component
+
+
+class TestCompileTemplate(unittest.TestCase):
+
+    def test_constant_subtrees_shared(self):
+        data = {'a': {'b': [1, 'x']}, 'c': '{{ job_vars.c }}'}
+        plan = compile_template(data)
+        rendered = render_template(plan, {'job_vars.c': 2})
+        self.assertEqual(rendered, {'a': {'b': [1, 'x']}, 'c': '2'})
+        self.assertIs(rendered['a'], data['a'])
+
+    def test_defaults_and_missing_variables(self):
+        plan = compile_template([
+            "{{ job_vars.a | default('fallback') }}",
+            '{{ job_vars.b }}',
+            'pre {{ job_vars.a }} mid {{job_vars.c}} post',
+        ])
+        self.assertEqual(render_template(plan, {'job_vars.c': True}), [
+            'fallback', '{{ job_vars.b }}', 'pre {{ job_vars.a }} mid True post',
+        ])
+
+    def test_no_templates(self):
+        data = {'kind': 'OcpSandbox'}
+        self.assertIs(compile_template(data), data)
+
+
+class TestSandboxTemplates(unittest.TestCase):
+
+    def test_render_by_kind(self):
+        templates = SandboxTemplates(agnosticv_component())
+        resources = templates.render('OcpSandbox', {
+            'job_vars.param_selector_region': 'us-east-1',
+            'job_vars.param_selector_name': 'demo',
+        })
+        self.assertEqual(resources, [
+            {
+                'kind': 'OcpSandbox',
+                'cloud_selector': {'virt': 'no', 'region': 'us-east-1'},
+                'quota': {'limits': {'cpu': '10'}},
+            },
+            {'kind': 'OcpSandbox', 'alias': 'second-demo-x'},
+        ])
+        self.assertEqual(templates.render('IbmSandbox', {}), [])
+
+    def test_missing_sandboxes(self):
+        self.assertEqual(
+            SandboxTemplates(agnosticv_component(sandboxes=[])).error,
+            'AgnosticV component has no sandboxes defined',
+        )
+        self.assertEqual(SandboxTemplates({'spec': {}}).error, 'AgnosticV component has no spec')
+
+
+class TestSandboxTemplateCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cached_by_resource_version(self):
+        api_client = FakeApiClient(agnosticv_component())
+        custom_objects_api = FakeCustomObjectsApi(api_client)
+        cache = SandboxTemplateCache(api_client, custom_objects_api)
+        first = await cache.get('test.lab.prod')
+        self.assertIs(await cache.get('test.lab.prod'), first)
+        self.assertEqual(custom_objects_api.calls, 1)
+        self.assertIn('as=PartialObjectMetadata', api_client.headers[0])
+        api_client.component = agnosticv_component(resource_version='2')
+        self.assertIsNot(await cache.get('test.lab.prod'), first)
+        self.assertEqual(custom_objects_api.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
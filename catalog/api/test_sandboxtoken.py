@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+sys.path.insert(0, '.')
+from sandboxtoken import SandboxTokenManager
+
+
+class FakeLoginResponse:
+
+    def __init__(self, status, data):
+        self.status = status
+        self.data = data
+
+    async def json(self):
+        return self.data
+
+
+class FakeUpstreamSessions:
+
+    def __init__(self, status=200, lifetime=timedelta(hours=1)):
+        self.logins = []
+        self.lifetime = lifetime
+        self.status = status
+
+    @asynccontextmanager
+    async def get(self, name, url, headers):
+        self.logins.append(headers['Authorization'])
+        await asyncio.sleep(0.01)
+        yield FakeLoginResponse(self.status, {
+            'access_token': f"access-{len(self.logins)}",
+            'access_token_exp': (datetime.now(timezone.utc) + self.lifetime).strftime('%Y-%m-%dT%H:%M:%S%z'),
+        })
+
+
+class TestSandboxTokenManager(unittest.IsolatedAsyncioTestCase):
+
+    async def test_token_is_cached(self):
+        upstream_sessions = FakeUpstreamSessions()
+        manager = SandboxTokenManager(upstream_sessions, 'http://sandbox-api')
+        self.assertEqual(await manager.get_access_token('secret'), 'access-1')
+        self.assertEqual(await manager.get_access_token('secret'), 'access-1')
+        self.assertEqual(upstream_sessions.logins, ['Bearer secret'])
+
+    async def test_concurrent_requests_login_once(self):
+        upstream_sessions = FakeUpstreamSessions()
+        manager = SandboxTokenManager(upstream_sessions, 'http://sandbox-api')
+        tokens = await asyncio.gather(*[manager.get_access_token('secret') for _ in range(5)])
+        self.assertEqual(set(tokens), {'access-1'})
+        self.assertEqual(len(upstream_sessions.logins), 1)
+
+    async def test_tokens_per_credential(self):
+        upstream_sessions = FakeUpstreamSessions()
+        manager = SandboxTokenManager(upstream_sessions, 'http://sandbox-api')
+        await manager.get_access_token('one')
+        await manager.get_access_token('two')
+        self.assertEqual(upstream_sessions.logins, ['Bearer one', 'Bearer two'])
+
+    async def test_token_refreshed_before_expiry(self):
+        upstream_sessions = FakeUpstreamSessions(lifetime=timedelta(seconds=10))
+        manager = SandboxTokenManager(upstream_sessions, 'http://sandbox-api', refresh_margin=30)
+        self.assertEqual(await manager.get_access_token('secret'), 'access-1')
+        self.assertEqual(await manager.get_access_token('secret'), 'access-2')
+
+    async def test_invalidate(self):
+        upstream_sessions = FakeUpstreamSessions()
+        manager = SandboxTokenManager(upstream_sessions, 'http://sandbox-api')
+        await manager.get_access_token('secret')
+        manager.invalidate('secret')
+        self.assertEqual(await manager.get_access_token('secret'), 'access-2')
+
+    async def test_login_failure(self):
+        manager = SandboxTokenManager(FakeUpstreamSessions(status=403), 'http://sandbox-api')
+        with self.assertRaises(web.HTTPInternalServerError):
+            await manager.get_access_token('secret')
+
+
+if __name__ == '__main__':
+    unittest.main()
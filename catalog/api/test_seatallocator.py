@@ -0,0 +1,155 @@
+import asyncio
+import copy
+import sys
+import unittest
+
+import kubernetes_asyncio
+
+sys.path.insert(0, '.')
+from seatallocator import SeatAllocator
+
+
+def user_assignment(name, resource_version=1, email=None):
+    spec = {'workshopName': 'test'}
+    if email:
+        spec['assignment'] = {'email': email}
+    return {
+        'apiVersion': 'babylon.gpte.redhat.com/v1',
+        'kind': 'WorkshopUserAssignment',
+        'metadata': {'name': name, 'namespace': 'user-test', 'resourceVersion': str(resource_version)},
+        'spec': spec,
+    }
+
+
+class FakeCustomObjectsApi:
+    """Store user assignments and reject replace with stale resourceVersion."""
+
+    def __init__(self, count):
+        self.list_calls = 0
+        self.objects = {f"seat-{i}": user_assignment(f"seat-{i}") for i in range(count)}
+        self.replace_calls = 0
+
+    async def list_cluster_custom_object(self, **kwargs):
+        raise NotImplementedError()
+
+    async def list_namespaced_custom_object(self, **kwargs):
+        self.list_calls += 1
+        await asyncio.sleep(0.01)
+        return {'items': [copy.deepcopy(obj) for obj in self.objects.values()]}
+
+    async def get_namespaced_custom_object(self, name, **kwargs):
+        if name not in self.objects:
+            raise kubernetes_asyncio.client.exceptions.ApiException(status=404)
+        return copy.deepcopy(self.objects[name])
+
+    async def replace_namespaced_custom_object(self, body, name, **kwargs):
+        self.replace_calls += 1
+        await asyncio.sleep(0.01)
+        current = self.objects[name]
+        if body['metadata']['resourceVersion'] != current['metadata']['resourceVersion']:
+            raise kubernetes_asyncio.client.exceptions.ApiException(status=409)
+        body = copy.deepcopy(body)
+        body['metadata']['resourceVersion'] = str(int(current['metadata']['resourceVersion']) + 1)
+        self.objects[name] = body
+        return copy.deepcopy(body)
+
+    def assign_externally(self, name, email):
+        current = self.objects[name]
+        self.objects[name] = user_assignment(name, int(current['metadata']['resourceVersion']) + 1, email)
+
+
+class TestSeatAllocator(unittest.IsolatedAsyncioTestCase):
+
+    def allocator(self, api):
+        return SeatAllocator(api, 'workshopuserassignments', 'babylon.gpte.redhat.com/workshop')
+
+    async def register(self, allocator, email):
+        index = await allocator.get_index('user-test', 'test')
+        user_assignment = index.get_by_email(email)
+        if user_assignment is not None:
+            return user_assignment
+        return await allocator.claim(index, 'user-test', 'test', email)
+
+    async def test_concurrent_claims_get_distinct_seats(self):
+        api = FakeCustomObjectsApi(50)
+        allocator = self.allocator(api)
+        results = await asyncio.gather(*[self.register(allocator, f"user{i}@example.com") for i in range(50)])
+        self.assertEqual(len({result['metadata']['name'] for result in results}), 50)
+        self.assertEqual(allocator.conflicts, 0)
+        self.assertEqual(api.replace_calls, 50)
+        self.assertEqual(api.list_calls, 1)
+
+    async def test_returning_attendee(self):
+        api = FakeCustomObjectsApi(3)
+        allocator = self.allocator(api)
+        first = await self.register(allocator, 'user@example.com')
+        second = await self.register(allocator, 'user@example.com')
+        self.assertEqual(first['metadata']['name'], second['metadata']['name'])
+        self.assertEqual(api.replace_calls, 1)
+
+    async def test_concurrent_claims_for_same_email(self):
+        api = FakeCustomObjectsApi(3)
+        allocator = self.allocator(api)
+        results = await asyncio.gather(*[self.register(allocator, 'user@example.com') for i in range(3)])
+        self.assertEqual(len({result['metadata']['name'] for result in results}), 1)
+        self.assertEqual(api.replace_calls, 1)
+
+    async def test_no_free_seats(self):
+        api = FakeCustomObjectsApi(2)
+        allocator = self.allocator(api)
+        results = await asyncio.gather(*[self.register(allocator, f"user{i}@example.com") for i in range(3)])
+        self.assertEqual(sum(1 for result in results if result is None), 1)
+        self.assertEqual(allocator.reserved, set())
+
+    async def test_conflict_with_other_replica(self):
+        api = FakeCustomObjectsApi(2)
+        allocator = self.allocator(api)
+        index = await allocator.get_index('user-test', 'test')
+        api.assign_externally('seat-0', 'other@example.com')
+        api.assign_externally('seat-1', 'user@example.com')
+        result = await allocator.claim(index, 'user-test', 'test', 'user@example.com')
+        self.assertEqual(result['metadata']['name'], 'seat-1')
+        self.assertNotIn('seat-1', index.free)
+        self.assertGreaterEqual(allocator.conflicts, 1)
+
+
+class TestSeatAllocatorWatch(unittest.IsolatedAsyncioTestCase):
+
+    def labeled(self, name, email=None, workshop='test', resource_version=1):
+        obj = user_assignment(name, resource_version, email)
+        obj['metadata']['labels'] = {'babylon.gpte.redhat.com/workshop': workshop}
+        return obj
+
+    async def asyncSetUp(self):
+        self.api = FakeCustomObjectsApi(0)
+        self.allocator = SeatAllocator(self.api, 'workshopuserassignments', 'babylon.gpte.redhat.com/workshop')
+        for obj in (self.labeled('a', 'user@example.com'), self.labeled('b'), self.labeled('c', workshop='other')):
+            self.allocator.on_event('ADDED', obj, None)
+        self.allocator.informer.synced.set()
+
+    async def test_lookup_from_index(self):
+        index = await self.allocator.get_index('user-test', 'test')
+        self.assertEqual(index.get_by_email('user@example.com')['metadata']['name'], 'a')
+        self.assertEqual(index.free, {'b'})
+        self.assertEqual(self.api.list_calls, 0)
+
+    async def test_unknown_parent(self):
+        index = await self.allocator.get_index('user-test', 'missing')
+        self.assertEqual(index.assignments, {})
+
+    async def test_modified_and_deleted(self):
+        previous = self.allocator.indexes[('user-test', 'test')].assignments['b']
+        self.allocator.on_event('MODIFIED', self.labeled('b', 'new@example.com', resource_version=2), previous)
+        index = await self.allocator.get_index('user-test', 'test')
+        self.assertEqual(index.get_by_email('new@example.com')['metadata']['name'], 'b')
+        self.assertEqual(index.free, set())
+        deleted = index.assignments['a']
+        self.allocator.on_event('DELETED', deleted, deleted)
+        self.assertIsNone(index.get_by_email('user@example.com'))
+        deleted = self.allocator.indexes[('user-test', 'other')].assignments['c']
+        self.allocator.on_event('DELETED', deleted, deleted)
+        self.assertNotIn(('user-test', 'other'), self.allocator.indexes)
+
+
+if __name__ == '__main__':
+    unittest.main()
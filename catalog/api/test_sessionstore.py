@@ -0,0 +1,122 @@
+import json
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, '.')
+import sessionstore
+from sessionstore import SessionStore
+
+
+class FakePipeline:
+
+    def __init__(self, redis):
+        self.commands = []
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis.data.get(key, (None, -2))[0])
+        return self
+
+    def pttl(self, key):
+        self.commands.append(lambda: self.redis.data.get(key, (None, -2))[1])
+        return self
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+
+    def __init__(self, notify_keyspace_events=''):
+        self.config = {'notify-keyspace-events': notify_keyspace_events}
+        self.data = {}
+        self.round_trips = 0
+
+    async def config_get(self, name):
+        return {name: self.config[name]}
+
+    async def config_set(self, name, value):
+        self.config[name] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def setex(self, key, seconds, value):
+        self.data[key] = (value, seconds * 1000)
+
+
+class TestSessionStore(unittest.IsolatedAsyncioTestCase):
+
+    async def test_near_cache(self):
+        redis = FakeRedis()
+        store = SessionStore(redis, lifetime=600)
+        redis.data['token'] = (json.dumps({'user': 'alice'}), 600000)
+        session = await store.get('token')
+        self.assertEqual(session, {'user': 'alice'})
+        self.assertIs(await store.get('token'), session)
+        self.assertEqual(redis.round_trips, 1)
+        self.assertEqual(store.stats()['hits'], 1)
+        self.assertEqual(store.stats()['redisHits'], 1)
+
+    async def test_ttl_bounded_by_remaining_lifetime(self):
+        redis = FakeRedis()
+        store = SessionStore(redis, lifetime=600, ttl=60)
+        redis.data['token'] = (json.dumps({'user': 'alice'}), 2000)
+        with patch.object(sessionstore, 'monotonic', return_value=1000):
+            await store.get('token')
+        self.assertEqual(store.entries['token'][0], 1002)
+        with patch.object(sessionstore, 'monotonic', return_value=1003):
+            del redis.data['token']
+            self.assertIsNone(await store.get('token'))
+
+    async def test_set_and_invalidate(self):
+        redis = FakeRedis()
+        store = SessionStore(redis, lifetime=600)
+        await store.set('token', {'user': 'alice'})
+        self.assertEqual(redis.data['token'][1], 600000)
+        self.assertEqual(await store.get('token'), {'user': 'alice'})
+        self.assertEqual(redis.round_trips, 0)
+        del redis.data['token']
+        store.on_message({'type': 'message', 'channel': '__keyevent@0__:del', 'data': 'token'})
+        self.assertIsNone(await store.get('token'))
+
+    async def test_without_redis(self):
+        store = SessionStore(lifetime=600, max_entries=1)
+        await store.set('a', {'user': 'alice'})
+        await store.set('b', {'user': 'bob'})
+        # Sessions are only kept in process so are not evicted for size
+        self.assertEqual(await store.get('a'), {'user': 'alice'})
+        self.assertIsNone(await store.get('c'))
+
+    async def test_check_keyspace_notifications(self):
+        redis = FakeRedis('Kl')
+        store = SessionStore(redis)
+        with self.assertLogs('sessionstore', 'WARNING') as logs:
+            await store.start()
+            await store.stop()
+        self.assertIn('missing Egxe', logs.output[0])
+        self.assertEqual(redis.config['notify-keyspace-events'], 'Kl')
+        redis.config['notify-keyspace-events'] = 'AE'
+        with self.assertNoLogs('sessionstore', 'WARNING'):
+            await store.start()
+            await store.stop()
+
+    def test_users(self):
+        store = SessionStore(lifetime=30, ttl=60, max_entries=1)
+        self.assertEqual(store.ttl, 30)
+        store.set_user(('alice', None), {'metadata': {'name': 'alice'}})
+        self.assertEqual(store.get_user(('alice', None)), {'metadata': {'name': 'alice'}})
+        store.set_user(('bob', None), {'metadata': {'name': 'bob'}})
+        self.assertIsNone(store.get_user(('alice', None)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from singleflight import SingleFlight
+from tracing import trace_request, trace_span
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_are_coalesced(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'items': []}
+
+        results = await asyncio.gather(*[
+            single_flight.run(('GET', '/apis/x'), fetch, label='kube') for _ in range(5)
+        ])
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight.stats(), {'kube': {'coalesced': 4, 'issued': 1}})
+        self.assertEqual(single_flight.calls, {})
+
+    async def test_sequential_calls_are_not_shared(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            return object()
+
+        first = await single_flight.run('key', fetch)
+        second = await single_flight.run('key', fetch)
+        self.assertIsNot(first, second)
+
+    async def test_different_keys_are_not_coalesced(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 1
+
+        await asyncio.gather(single_flight.run('a', fetch), single_flight.run('b', fetch))
+        self.assertEqual(single_flight.stats(), {'default': {'coalesced': 0, 'issued': 2}})
+
+    async def test_exception_shared_with_waiters(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('upstream failed')
+
+        results = await asyncio.gather(
+            single_flight.run('key', fetch), single_flight.run('key', fetch),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_cancelled_caller_does_not_cancel_call(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        first = asyncio.create_task(single_flight.run('key', fetch))
+        second = asyncio.create_task(single_flight.run('key', fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 'done')
+
+
+    async def test_shared_call_detached_from_traces(self):
+        single_flight = SingleFlight()
+
+        async def fetch():
+            with trace_span('kube GET', kind='client', target='kube') as span:
+                self.assertIsNone(span)
+                await asyncio.sleep(0.01)
+            return 'done'
+
+        async def request(name):
+            with trace_request(name) as span:
+                await single_flight.run('key', fetch, label='kube')
+            return span
+
+        first, second = await asyncio.gather(request('first'), request('second'))
+        for span, coalesced in ((first, False), (second, True)):
+            self.assertEqual([child.name for child in span.walk()], [span.name, 'singleflight kube'])
+            self.assertEqual(span.children[0].attributes['coalesced'], coalesced)
+            self.assertEqual(span.upstream_summary()['kube']['calls'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from systemstatus import SystemStatusCache, etag_matches, system_status_from_configmap_data
+
+
+class FakeListResponse:
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeCoreV1Api:
+
+    def __init__(self, data):
+        self.data = data
+        self.list_kwargs = None
+
+    async def list_namespaced_config_map(self, **kwargs):
+        self.list_kwargs = kwargs
+        return FakeListResponse({
+            'items': [{
+                'data': self.data,
+                'metadata': {'name': 'babylon-system-status', 'namespace': 'babylon', 'resourceVersion': '1'},
+            }],
+            'metadata': {'resourceVersion': '1'},
+        })
+
+
+class TestSystemStatusFromConfigMapData(unittest.TestCase):
+
+    def test_defaults(self):
+        self.assertEqual(system_status_from_configmap_data(None), {
+            'workshops_ordering_blocked': False,
+            'workshops_ordering_blocked_message': '',
+            'services_ordering_blocked': False,
+            'services_ordering_blocked_message': '',
+            'wg_blocked_dates': [],
+            'last_updated_by': '',
+            'last_updated_at': '',
+        })
+
+    def test_values(self):
+        status = system_status_from_configmap_data({
+            'workshops_ordering_blocked': 'True',
+            'wg_blocked_dates': '[{"startDate": "2026-01-01", "endDate": "2026-01-02"}]',
+        })
+        self.assertTrue(status['workshops_ordering_blocked'])
+        self.assertEqual(status['wg_blocked_dates'], [{'startDate': '2026-01-01', 'endDate': '2026-01-02'}])
+
+    def test_invalid_blocked_dates(self):
+        self.assertEqual(system_status_from_configmap_data({'wg_blocked_dates': 'junk'})['wg_blocked_dates'], [])
+
+
+class TestSystemStatusCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_loaded_from_watch(self):
+        api = FakeCoreV1Api({'services_ordering_blocked': 'true'})
+        cache = SystemStatusCache(api, 'babylon', 'babylon-system-status')
+        default_etag = cache.etag
+        await cache.informer._Informer__list()
+        self.assertTrue(cache.is_synced)
+        self.assertEqual(api.list_kwargs['field_selector'], 'metadata.name=babylon-system-status')
+        self.assertTrue(cache.status['services_ordering_blocked'])
+        self.assertEqual(json.loads(cache.body), cache.status)
+        self.assertNotEqual(cache.etag, default_etag)
+
+    async def test_update_and_delete(self):
+        cache = SystemStatusCache(FakeCoreV1Api({}), 'babylon', 'babylon-system-status')
+        etag = cache.etag
+        cache.set_data({'workshops_ordering_blocked': 'true', 'last_updated_by': 'admin'})
+        self.assertTrue(cache.status['workshops_ordering_blocked'])
+        self.assertNotEqual(cache.etag, etag)
+        configmap = {'metadata': {'name': 'babylon-system-status'}, 'data': {}}
+        cache.on_event('DELETED', configmap, configmap)
+        self.assertEqual(cache.etag, etag)
+
+
+class TestEtagMatches(unittest.TestCase):
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertTrue(etag_matches('"abc"', 'W/"abc"'))
+        self.assertTrue(etag_matches('"abc"', '"xyz", W/"abc"'))
+        self.assertTrue(etag_matches('"abc"', '*'))
+        self.assertFalse(etag_matches('"abc"', None))
+        self.assertFalse(etag_matches('"abc"', '"abcd"'))
+        self.assertFalse(etag_matches('"abc"', '"xabc"'))
+        self.assertFalse(etag_matches('"abc"', 'abc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import unittest
+
+sys.path.insert(0, '.')
+from tracing import OtlpExporter, TraceBudgets, trace_request, trace_span
+
+
+async def upstream_call(target, size):
+    with trace_span(f"{target} GET", kind='client', target=target) as span:
+        await asyncio.sleep(0)
+        span.set(size=size)
+
+
+class TestTracing(unittest.IsolatedAsyncioTestCase):
+
+    async def test_span_tree(self):
+        with trace_request('GET /api/test') as root:
+            await upstream_call('kube', 100)
+            with trace_span('filter') as span:
+                await asyncio.gather(*[upstream_call('kube', 10) for _ in range(3)])
+            await upstream_call('redis', None)
+        self.assertEqual([child.name for child in root.children], ['kube GET', 'filter', 'redis GET'])
+        self.assertEqual(len(span.children), 3)
+        self.assertEqual(root.upstream_summary()['kube']['calls'], 4)
+        self.assertEqual(root.upstream_summary()['kube']['bytes'], 130)
+        self.assertEqual(root.upstream_summary()['redis']['calls'], 1)
+
+    async def test_untraced(self):
+        with trace_span('kube GET') as span:
+            self.assertIsNone(span)
+
+    async def test_otlp(self):
+        traceparent = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+        with trace_request('GET /api/test', traceparent=traceparent, route='/api/test') as root:
+            await upstream_call('kube', 100)
+        spans = root.to_otlp()
+        self.assertEqual(spans[0]['traceId'], '0af7651916cd43dd8448eb211c80319c')
+        self.assertEqual(spans[0]['parentSpanId'], 'b7ad6b7169203331')
+        self.assertEqual(spans[0]['kind'], 2)
+        self.assertIn({'key': 'route', 'value': {'stringValue': '/api/test'}}, spans[0]['attributes'])
+        self.assertEqual(spans[1]['parentSpanId'], spans[0]['spanId'])
+        self.assertEqual(spans[1]['kind'], 3)
+        self.assertIn({'key': 'size', 'value': {'intValue': '100'}}, spans[1]['attributes'])
+        payload = OtlpExporter(None, 'http://collector:4318/v1/traces').payload([root])
+        self.assertEqual(len(payload['resourceSpans'][0]['scopeSpans'][0]['spans']), 2)
+
+
+class TestTraceBudgets(unittest.IsolatedAsyncioTestCase):
+
+    async def test_fanout(self):
+        budgets = TraceBudgets(fanout_calls=2)
+        with trace_request('GET /api/test') as root:
+            for _ in range(3):
+                await upstream_call('kube', 10)
+        with self.assertLogs('tracing', 'INFO') as logs:
+            self.assertTrue(budgets.check('/api/test', root))
+        self.assertIn('made 3 upstream calls', logs.output[0])
+        self.assertIn('kube 3 calls', logs.output[0])
+
+    async def test_route_budget(self):
+        budgets = TraceBudgets(route_budgets={'GET /api/test': {'calls': 1}})
+        with trace_request('GET /api/test') as root:
+            await upstream_call('kube', 10)
+        self.assertFalse(budgets.check('/api/test', root))
+        with trace_request('GET /api/test') as root:
+            await upstream_call('kube', 10)
+            await upstream_call('redis', 10)
+        with self.assertLogs('tracing', 'WARNING') as logs:
+            self.assertTrue(budgets.check('/api/test', root))
+        self.assertIn('exceeded budget of 1 calls', logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
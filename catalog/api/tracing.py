@@ -0,0 +1,230 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('tracing')
+
+current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """
+    Timed operation within a request trace. Spans started while another span
+    is current become its children, including in tasks created by
+    asyncio.gather, so each request gets a tree of its upstream calls.
+    """
+    def __init__(self, name, trace_id, parent=None, kind='internal', **attributes):
+        self.attributes = attributes
+        self.children = []
+        self.end_ns = None
+        self.kind = kind
+        self.name = name
+        self.parent = parent
+        self.remote_parent_id = None
+        self.span_id = random.getrandbits(64)
+        self.start_ns = time.time_ns()
+        self.trace_id = trace_id
+        if parent:
+            parent.children.append(self)
+
+    @property
+    def parent_span_id(self):
+        return self.parent.span_id if self.parent else self.remote_parent_id
+
+    @property
+    def duration(self):
+        """Duration in seconds, up to now if the span has not ended."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def upstream_summary(self):
+        """Return count, seconds, and bytes of client spans by target."""
+        summary = {}
+        for span in self.walk():
+            if span.kind != 'client':
+                continue
+            target = summary.setdefault(span.attributes.get('target', span.name), {'calls': 0, 'seconds': 0, 'bytes': 0})
+            target['calls'] += 1
+            target['seconds'] += span.duration
+            target['bytes'] += span.attributes.get('size') or 0
+        return summary
+
+    def format_breakdown(self):
+        return ', '.join(
+            f"{target} {stats['calls']} calls {stats['seconds'] * 1000:.0f}ms {stats['bytes']}B"
+            for target, stats in sorted(self.upstream_summary().items())
+        )
+
+    def to_otlp(self):
+        """Return span tree as a list of spans in OTLP JSON encoding."""
+        return [{
+            "attributes": [otlp_attribute(key, value) for key, value in span.attributes.items() if value is not None],
+            "endTimeUnixNano": str(span.end_ns or time.time_ns()),
+            "kind": {'client': 3, 'server': 2}.get(span.kind, 1),
+            "name": span.name,
+            "parentSpanId": f"{span.parent_span_id:016x}" if span.parent_span_id else '',
+            "spanId": f"{span.span_id:016x}",
+            "startTimeUnixNano": str(span.start_ns),
+            "traceId": f"{span.trace_id:032x}",
+        } for span in self.walk()]
+
+def otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+def parse_traceparent(traceparent):
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or None."""
+    try:
+        version, trace_id, span_id, flags = traceparent.split('-')
+        return int(trace_id, 16), int(span_id, 16)
+    except (AttributeError, ValueError):
+        return None
+
+@contextmanager
+def trace_request(name, traceparent=None, **attributes):
+    """
+    Start root span for a request, yielding it. A W3C traceparent from the
+    caller is continued so that exported traces join the caller's trace.
+    """
+    parent = parse_traceparent(traceparent)
+    span = Span(name, parent[0] if parent else random.getrandbits(128), kind='server', **attributes)
+    if parent:
+        span.remote_parent_id = parent[1]
+    token = current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.finish()
+        current_span.reset(token)
+
+@contextmanager
+def trace_span(name, kind='internal', **attributes):
+    """
+    Record span as a child of the current span, yielding it. Outside of a
+    traced request this yields None and records nothing.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(name, parent.trace_id, parent=parent, kind=kind, **attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.finish()
+        current_span.reset(token)
+
+class TraceBudgets:
+    """
+    Soft limits on upstream calls and duration of requests. Requests over
+    slow_seconds or fanout_calls are logged with a breakdown of their upstream
+    calls, and requests over the budget for their route are logged as
+    warnings. Route budgets map a route pattern, optionally prefixed with the
+    request method, to limits on "calls" and "seconds".
+    """
+    def __init__(self, slow_seconds=2, fanout_calls=25, route_budgets=None):
+        self.fanout_calls = fanout_calls
+        self.route_budgets = route_budgets or {}
+        self.slow_seconds = slow_seconds
+
+    @classmethod
+    def from_environment(cls):
+        return cls(
+            fanout_calls = int(os.environ.get('TRACE_FANOUT_CALLS', 25)),
+            route_budgets = json.loads(os.environ.get('TRACE_ROUTE_BUDGETS', '{}')),
+            slow_seconds = float(os.environ.get('TRACE_SLOW_SECONDS', 2)),
+        )
+
+    def check(self, route, span):
+        """Log span if over thresholds or budget, returning True if it was logged."""
+        calls = sum(1 for child in span.walk() if child.kind == 'client')
+        duration = span.duration
+        budget = self.route_budgets.get(span.name) or self.route_budgets.get(route)
+        if budget and (calls > budget.get('calls', calls) or duration > budget.get('seconds', duration)):
+            logger.warning(
+                f"{span.name} exceeded budget of {budget.get('calls', '-')} calls {budget.get('seconds', '-')}s "
+                f"with {calls} calls in {duration:.3f}s: {span.format_breakdown()}"
+            )
+            return True
+        if duration > self.slow_seconds or calls > self.fanout_calls:
+            logger.info(f"{span.name} made {calls} upstream calls in {duration:.3f}s: {span.format_breakdown()}")
+            return True
+        return False
+
+class OtlpExporter:
+    """
+    Export traces to an OpenTelemetry collector with OTLP over HTTP in JSON
+    encoding. Traces are queued and posted in batches from a background
+    task, and dropped rather than delaying requests if the queue is full.
+    """
+    def __init__(self, upstream_sessions, url, service_name='babylon-catalog-api', batch_size=100, queue_size=1000):
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.exported = 0
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.service_name = service_name
+        self.task = None
+        self.upstream_sessions = upstream_sessions
+        self.url = url
+
+    def start(self):
+        self.task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def export(self, span):
+        try:
+            self.queue.put_nowait(span)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def payload(self, spans):
+        return {"resourceSpans": [{
+            "resource": {"attributes": [otlp_attribute('service.name', self.service_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "babylon-catalog-api"},
+                "spans": [otlp_span for span in spans for otlp_span in span.to_otlp()],
+            }],
+        }]}
+
+    async def __run(self):
+        while True:
+            spans = [await self.queue.get()]
+            while len(spans) < self.batch_size and not self.queue.empty():
+                spans.append(self.queue.get_nowait())
+            try:
+                async with self.upstream_sessions.post('otlp', self.url, json=self.payload(spans)) as response:
+                    if response.status >= 300:
+                        logger.warning(f"Trace export failed with status {response.status}")
+                    else:
+                        self.exported += len(spans)
+            except Exception as exception:
+                logger.warning(f"Trace export failed: {exception}")
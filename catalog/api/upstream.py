@@ -0,0 +1,85 @@
+import os
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from metrics import observe_upstream
+from tracing import trace_span
+
+def upstream_setting(name, setting, default):
+    """
+    Read setting for upstream from environment, preferring
+    UPSTREAM_<NAME>_<SETTING> over UPSTREAM_<SETTING>.
+    """
+    return os.environ.get(
+        f"UPSTREAM_{name.upper()}_{setting}",
+        os.environ.get(f"UPSTREAM_{setting}", default)
+    )
+
+class UpstreamSessions:
+    """
+    Long-lived aiohttp client sessions with one connection pool per upstream
+    service so that connections are reused across requests.
+    """
+    def __init__(self):
+        self.sessions = {}
+        self.in_flight = {}
+        self.requests = {}
+
+    def add(self, name):
+        """Create session for upstream using connection settings from environment."""
+        connector = aiohttp.TCPConnector(
+            keepalive_timeout = float(upstream_setting(name, 'KEEPALIVE_TIMEOUT', 30)),
+            limit = int(upstream_setting(name, 'CONNECTION_LIMIT', 100)),
+            limit_per_host = int(upstream_setting(name, 'CONNECTION_LIMIT_PER_HOST', 0)),
+        )
+        timeout = aiohttp.ClientTimeout(
+            connect = float(upstream_setting(name, 'CONNECT_TIMEOUT', 10)),
+            total = float(upstream_setting(name, 'TIMEOUT', 60)),
+        )
+        self.sessions[name] = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.in_flight[name] = 0
+        self.requests[name] = 0
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+
+    @asynccontextmanager
+    async def request(self, name, method, url, **kwargs):
+        """Make request to upstream, yielding the response."""
+        session = self.sessions[name]
+        self.in_flight[name] += 1
+        self.requests[name] += 1
+        start = time.monotonic()
+        status = 'error'
+        try:
+            with trace_span(f"{name} {method}", kind='client', method=method, target=name, url=url.split('?')[0]) as span:
+                async with session.request(method, url, **kwargs) as response:
+                    status = response.status
+                    if span:
+                        span.set(size=response.content_length, status=status)
+                    yield response
+        finally:
+            self.in_flight[name] -= 1
+            observe_upstream(name, status, time.monotonic() - start)
+
+    def get(self, name, url, **kwargs):
+        return self.request(name, 'GET', url, **kwargs)
+
+    def post(self, name, url, **kwargs):
+        return self.request(name, 'POST', url, **kwargs)
+
+    def put(self, name, url, **kwargs):
+        return self.request(name, 'PUT', url, **kwargs)
+
+    def stats(self):
+        return {
+            name: {
+                "connectionLimit": session.connector.limit,
+                "inFlight": self.in_flight[name],
+                "requests": self.requests[name],
+            } for name, session in sorted(self.sessions.items())
+        }
@@ -0,0 +1,302 @@
+import asyncio
+import copy
+import json
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from informer import match_label_selector, parse_label_selector
+
+core_path_re = re.compile(r'^/api/(?P<version>v1)(?:/namespaces/(?P<namespace>[^/]+))?/(?P<plural>[^/]+)(?:/(?P<name>[^/]+))?$')
+group_path_re = re.compile(
+    r'^/apis/(?P<group>[^/]+)/(?P<version>[^/]+)(?:/namespaces/(?P<namespace>[^/]+))?/(?P<plural>[^/]+)(?:/(?P<name>[^/]+))?$'
+)
+
+# Events kept for watches that resume from a resourceVersion
+event_log_size = 10000
+
+def api_status(code, reason, message):
+    return web.json_response({
+        "apiVersion": "v1",
+        "kind": "Status",
+        "code": code,
+        "message": message,
+        "reason": reason,
+        "status": "Failure",
+    }, status=code)
+
+def merge_patch(target, patch):
+    """Apply JSON merge patch to target in place."""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_patch(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+def json_patch(target, operations):
+    """Apply add, replace, and remove JSON patch operations to target in place."""
+    for operation in operations:
+        keys = [
+            key.replace('~1', '/').replace('~0', '~')
+            for key in operation['path'].lstrip('/').split('/')
+        ]
+        parent = target
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent.setdefault(key, {})
+        key = keys[-1]
+        if isinstance(parent, list):
+            key = len(parent) if key == '-' else int(key)
+        if operation['op'] == 'remove':
+            del parent[key]
+        elif operation['op'] == 'add' and isinstance(parent, list):
+            parent.insert(key, copy.deepcopy(operation['value']))
+        elif operation['op'] in ('add', 'replace'):
+            parent[key] = copy.deepcopy(operation['value'])
+        else:
+            raise ValueError(f"Unsupported patch operation {operation['op']}")
+
+class AccessPolicy:
+    """
+    Authorization for impersonated users of the fake API.
+
+    Users whose name starts with admin_prefix may do anything. Other users
+    may read resources in catalog namespaces, in their own user namespace,
+    and cluster scoped resources. In other user namespaces they may only get
+    resources with names starting with "shared-". Requests that do not
+    impersonate a user are from the catalog API service account and are
+    always allowed.
+    """
+    def __init__(self, admin_prefix='admin', catalog_namespace_prefix='babylon-catalog-'):
+        self.admin_prefix = admin_prefix
+        self.catalog_namespace_prefix = catalog_namespace_prefix
+
+    def allowed(self, user, verb, group, plural, namespace=None, name=None):
+        if user is None or user.startswith(self.admin_prefix):
+            return True
+        if verb not in ('get', 'list', 'watch'):
+            return False
+        if namespace is None or namespace.startswith(self.catalog_namespace_prefix):
+            return True
+        if namespace in (f"user-{user}", f"user-{user}-1"):
+            return True
+        return verb == 'get' and name is not None and name.startswith('shared-')
+
+class FakeKubeApi:
+    """
+    In-memory Kubernetes API server for load tests.
+
+    Implements get, list with label and field selectors, watch, create,
+    replace with resourceVersion conflicts, merge and JSON patch, and delete
+    for any resource path, plus SelfSubjectAccessReviews evaluated with an
+    AccessPolicy. Requests are counted by operation so that upstream call
+    amplification can be reported.
+    """
+    def __init__(self, latency=0, policy=None):
+        self.calls = Counter()
+        self.event_log = []
+        self.latency = latency
+        self.objects = {}
+        self.policy = policy or AccessPolicy()
+        self.resource_version = 1
+        self.watchers = set()
+
+    def make_app(self):
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_route('*', '/{path:.*}', self.handle)
+        return app
+
+    def add(self, api_version, plural, obj):
+        """Add object directly, such as when seeding test data, and return it."""
+        return self.__create(api_version, plural, obj['metadata'].get('namespace'), copy.deepcopy(obj))
+
+    def list(self, api_version, plural, namespace=None):
+        return [
+            obj for (namespace_, name), obj in self.objects.get((api_version, plural), {}).items()
+            if namespace is None or namespace_ == namespace
+        ]
+
+    def __next_resource_version(self):
+        self.resource_version += 1
+        return str(self.resource_version)
+
+    def __notify(self, api_version, plural, event_type, obj):
+        event = (int(obj['metadata']['resourceVersion']), api_version, plural, event_type, copy.deepcopy(obj))
+        self.event_log.append(event)
+        if len(self.event_log) > event_log_size:
+            del self.event_log[:len(self.event_log) - event_log_size]
+        for watcher in self.watchers:
+            watcher.put_nowait(event)
+
+    def __create(self, api_version, plural, namespace, obj):
+        metadata = obj.setdefault('metadata', {})
+        if 'name' not in metadata and 'generateName' in metadata:
+            metadata['name'] = metadata['generateName'] + uuid.uuid4().hex[:5]
+        if namespace:
+            metadata['namespace'] = namespace
+        key = (namespace, metadata['name'])
+        objects = self.objects.setdefault((api_version, plural), {})
+        if key in objects:
+            return None
+        metadata['creationTimestamp'] = datetime.now(timezone.utc).strftime('%FT%TZ')
+        metadata['resourceVersion'] = self.__next_resource_version()
+        metadata['uid'] = str(uuid.uuid4())
+        objects[key] = obj
+        self.__notify(api_version, plural, 'ADDED', obj)
+        return obj
+
+    async def handle(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        match = core_path_re.match(request.path) or group_path_re.match(request.path)
+        if not match:
+            return api_status(404, 'NotFound', f"No handler for {request.path}")
+        params = match.groupdict()
+        group = params.get('group', '')
+        api_version = f"{group}/{params['version']}" if group else params['version']
+        namespace = params['namespace']
+        plural = params['plural']
+        name = params['name']
+        user = request.headers.get('Impersonate-User')
+        watch = request.query.get('watch', '').lower() == 'true'
+
+        if request.method == 'GET':
+            verb = 'watch' if watch else 'get' if name else 'list'
+        else:
+            verb = {'DELETE': 'delete', 'PATCH': 'patch', 'POST': 'create', 'PUT': 'update'}.get(request.method)
+        self.calls[f"{verb} {plural}"] += 1
+
+        if plural == 'selfsubjectaccessreviews':
+            return await self.__access_review(request, user)
+        if not self.policy.allowed(user, verb, group, plural, namespace, name):
+            return api_status(403, 'Forbidden', f"{user} cannot {verb} {plural}")
+        if watch:
+            return await self.__watch(request, api_version, plural, namespace)
+        if verb == 'list':
+            return self.__list(request, api_version, plural, namespace)
+
+        objects = self.objects.setdefault((api_version, plural), {})
+        if verb == 'create':
+            obj = self.__create(api_version, plural, namespace, await request.json())
+            if obj is None:
+                return api_status(409, 'AlreadyExists', f"{plural} already exists")
+            return web.json_response(obj, status=201)
+
+        obj = objects.get((namespace, name))
+        if obj is None:
+            return api_status(404, 'NotFound', f"{plural} {name} not found")
+        if verb == 'get':
+            return web.json_response(obj)
+        if verb == 'delete':
+            del objects[(namespace, name)]
+            obj['metadata']['resourceVersion'] = self.__next_resource_version()
+            self.__notify(api_version, plural, 'DELETED', obj)
+            return web.json_response(obj)
+
+        body = await request.json()
+        if verb == 'update':
+            resource_version = body.get('metadata', {}).get('resourceVersion')
+            if resource_version and resource_version != obj['metadata']['resourceVersion']:
+                return api_status(409, 'Conflict', f"{plural} {name} has been modified")
+            updated = body
+            for key in ('creationTimestamp', 'uid'):
+                updated['metadata'][key] = obj['metadata'][key]
+        else:
+            updated = copy.deepcopy(obj)
+            try:
+                if isinstance(body, list):
+                    json_patch(updated, body)
+                else:
+                    merge_patch(updated, body)
+            except (IndexError, KeyError, ValueError) as exception:
+                return api_status(422, 'Invalid', str(exception))
+        updated['metadata']['resourceVersion'] = self.__next_resource_version()
+        objects[(namespace, name)] = updated
+        self.__notify(api_version, plural, 'MODIFIED', updated)
+        return web.json_response(updated)
+
+    async def __access_review(self, request, user):
+        review = await request.json()
+        attributes = review['spec'].get('resourceAttributes', {})
+        review['status'] = {
+            "allowed": self.policy.allowed(
+                user,
+                attributes.get('verb'),
+                attributes.get('group', ''),
+                attributes.get('resource'),
+                attributes.get('namespace'),
+                attributes.get('name'),
+            )
+        }
+        return web.json_response(review, status=201)
+
+    def __selected(self, request, objects, namespace):
+        requirements = parse_label_selector(request.query.get('labelSelector'))
+        fields = dict(
+            term.split('=', 1) for term in request.query.get('fieldSelector', '').split(',') if '=' in term
+        )
+        for obj in objects:
+            metadata = obj['metadata']
+            if namespace and metadata.get('namespace') != namespace:
+                continue
+            if not match_label_selector(requirements, metadata.get('labels')):
+                continue
+            if any(metadata.get(key.split('.', 1)[1]) != value for key, value in fields.items()):
+                continue
+            yield obj
+
+    def __list(self, request, api_version, plural, namespace):
+        objects = self.objects.get((api_version, plural), {}).values()
+        return web.json_response({
+            "apiVersion": api_version,
+            "items": list(self.__selected(request, objects, namespace)),
+            "kind": "List",
+            "metadata": {"resourceVersion": str(self.resource_version)},
+        })
+
+    async def __watch(self, request, api_version, plural, namespace):
+        queue = asyncio.Queue()
+        resource_version = int(request.query.get('resourceVersion') or self.resource_version)
+        if self.event_log and resource_version < self.event_log[0][0] - 1:
+            replay = None
+        else:
+            replay = [event for event in self.event_log if event[0] > resource_version]
+        timeout = float(request.query.get('timeoutSeconds', 300))
+        response = web.StreamResponse(headers={'Content-Type': 'application/json'})
+        await response.prepare(request)
+        if replay is None:
+            await response.write(json.dumps({
+                "type": "ERROR",
+                "object": {"kind": "Status", "code": 410, "reason": "Expired", "message": "too old resource version"},
+            }).encode('utf-8') + b'\n')
+            return response
+
+        for event in replay:
+            queue.put_nowait(event)
+        self.watchers.add(queue)
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            while request.transport and not request.transport.is_closing():
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), min(remaining, 1))
+                except asyncio.TimeoutError:
+                    continue
+                _, event_api_version, event_plural, event_type, obj = event
+                if (event_api_version, event_plural) != (api_version, plural):
+                    continue
+                if not list(self.__selected(request, [obj], namespace)):
+                    continue
+                await response.write(json.dumps({"type": event_type, "object": obj}).encode('utf-8') + b'\n')
+        except ConnectionResetError:
+            pass
+        finally:
+            self.watchers.discard(queue)
+        return response
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import Counter
+
+class FakeRedis:
+    """
+    In-memory Redis server speaking enough of the RESP protocol for the
+    catalog API: strings with expiry, pub/sub, keyspace event notifications
+    for deleted and expired keys, and CONFIG for notify-keyspace-events.
+    Commands are counted by name so that upstream call amplification can be
+    reported.
+    """
+    def __init__(self, latency=0):
+        self.calls = Counter()
+        self.config = {'notify-keyspace-events': ''}
+        self.data = {}
+        self.latency = latency
+        self.server = None
+        self.subscribers = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        subscriptions = set()
+        try:
+            while True:
+                command = await self.__read_command(reader)
+                if command is None:
+                    break
+                name = command[0].upper().decode('utf-8')
+                self.calls[name] += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if name == 'SUBSCRIBE':
+                    for channel in command[1:]:
+                        subscriptions.add(channel)
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(self.__encode([b'subscribe', channel, len(subscriptions)]))
+                elif name == 'UNSUBSCRIBE':
+                    for channel in command[1:] or list(subscriptions):
+                        subscriptions.discard(channel)
+                        self.subscribers.get(channel, set()).discard(writer)
+                        writer.write(self.__encode([b'unsubscribe', channel, len(subscriptions)]))
+                else:
+                    writer.write(self.__execute(name, command[1:]))
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self.subscribers.get(channel, set()).discard(writer)
+            writer.close()
+
+    async def __read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def __encode(self, value):
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, Exception):
+            return f"-ERR {value}\r\n".encode('utf-8')
+        if isinstance(value, bool):
+            return b'+OK\r\n'
+        if isinstance(value, int):
+            return f":{value}\r\n".encode('utf-8')
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        if isinstance(value, bytes):
+            return b'$%d\r\n%s\r\n' % (len(value), value)
+        return b'*%d\r\n' % len(value) + b''.join(self.__encode(item) for item in value)
+
+    def __get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            self.__notify('expired', key)
+            return None
+        return entry
+
+    def __notify(self, event, key):
+        flags = self.config['notify-keyspace-events']
+        event_class = {'del': 'g', 'expired': 'x'}[event]
+        if 'E' in flags and ('A' in flags or event_class in flags):
+            self.__publish(f"__keyevent@0__:{event}".encode('utf-8'), key)
+
+    def __publish(self, channel, message):
+        writers = self.subscribers.get(channel, set())
+        for writer in writers:
+            writer.write(self.__encode([b'message', channel, message]))
+        return len(writers)
+
+    def __execute(self, name, args):
+        if name in ('AUTH', 'CLIENT', 'SELECT'):
+            return self.__encode(True)
+        if name == 'PING':
+            return b'+PONG\r\n'
+        if name == 'GET':
+            entry = self.__get(args[0])
+            return self.__encode(entry[0] if entry else None)
+        if name == 'SET':
+            expires = None
+            options = [arg.upper() for arg in args[2:]]
+            if b'EX' in options:
+                expires = time.monotonic() + int(args[2 + options.index(b'EX') + 1])
+            elif b'PX' in options:
+                expires = time.monotonic() + int(args[2 + options.index(b'PX') + 1]) / 1000
+            self.data[args[0]] = (args[1], expires)
+            return self.__encode(True)
+        if name == 'SETEX':
+            self.data[args[0]] = (args[2], time.monotonic() + int(args[1]))
+            return self.__encode(True)
+        if name in ('PTTL', 'TTL'):
+            entry = self.__get(args[0])
+            if entry is None:
+                return self.__encode(-2)
+            if entry[1] is None:
+                return self.__encode(-1)
+            remaining = entry[1] - time.monotonic()
+            return self.__encode(int(remaining * 1000) if name == 'PTTL' else int(remaining))
+        if name == 'DEL':
+            deleted = 0
+            for key in args:
+                if self.data.pop(key, None) is not None:
+                    deleted += 1
+                    self.__notify('del', key)
+            return self.__encode(deleted)
+        if name == 'PUBLISH':
+            return self.__encode(self.__publish(args[0], args[1]))
+        if name == 'CONFIG':
+            key = args[1].decode('utf-8')
+            if args[0].upper() == b'GET':
+                return self.__encode([key, self.config.get(key, '')])
+            self.config[key] = args[2].decode('utf-8')
+            return self.__encode(True)
+        return self.__encode(Exception(f"unknown command '{name}'"))
@@ -0,0 +1,76 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+class FakeService:
+    """
+    Fake HTTP service for load tests that answers every request with a
+    canned JSON response after an optional latency, counting requests by
+    method and matched route.
+    """
+    def __init__(self, latency=0):
+        self.calls = Counter()
+        self.latency = latency
+
+    def routes(self):
+        """Return list of (method, path, handler) for the service."""
+        return []
+
+    def make_app(self):
+        app = web.Application()
+        for method, path, handler in self.routes():
+            app.router.add_route(method, path, self.__counted(handler))
+        app.router.add_route('*', '/{path:.*}', self.__counted(self.default))
+        return app
+
+    def __counted(self, handler):
+        async def counted(request):
+            self.calls[f"{request.method} {request.match_info.route.resource.canonical}"] += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await handler(request)
+        return counted
+
+    async def default(self, request):
+        return web.json_response({})
+
+class FakeReportingApi(FakeService):
+    def routes(self):
+        return [
+            ('GET', '/rating/v1/catalog/{asset_uuid}', self.catalog_rating),
+            ('GET', '/rating/v1/catalog/{asset_uuid}/history', self.catalog_rating_history),
+        ]
+
+    async def catalog_rating(self, request):
+        return web.json_response({"rating_score": 4.2, "total_ratings": 17})
+
+    async def catalog_rating_history(self, request):
+        return web.json_response({"ratings": [
+            {"comment": "Works well", "rating": 4, "email": f"user{i}@example.com"} for i in range(20)
+        ]})
+
+class FakeSandboxApi(FakeService):
+    def __init__(self, latency=0, token_lifetime=3600):
+        super().__init__(latency)
+        self.token_lifetime = token_lifetime
+
+    def routes(self):
+        return [
+            ('GET', '/api/v1/login', self.login),
+            ('POST', '/api/v1/placements/dry-run', self.placements_dry_run),
+        ]
+
+    async def login(self, request):
+        return web.json_response({
+            "access_token": "fake-access-token",
+            "access_token_exp": (datetime.now(timezone.utc) + timedelta(seconds=self.token_lifetime)).isoformat(),
+        })
+
+    async def placements_dry_run(self, request):
+        data = await request.json()
+        return web.json_response({
+            "overallAvailable": True,
+            "results": [{"available": True, "kind": resource.get('kind')} for resource in data.get('resources', [])],
+        })
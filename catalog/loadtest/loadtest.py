@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Load test the catalog API against local fakes of its dependencies.
+
+Starts a fake Kubernetes API, Redis, reporting API, and sandbox API in this
+process, runs catalog/api/app.py in a subprocess configured to use them,
+then runs each scenario for a fixed duration and reports throughput,
+latency percentiles, and upstream calls per request.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+loadtest_dir = os.path.dirname(os.path.abspath(__file__))
+api_dir = os.path.join(os.path.dirname(loadtest_dir), 'api')
+sys.path.insert(0, api_dir)
+
+from fakekube import FakeKubeApi
+from fakeredis import FakeRedis
+from fakeservices import FakeReportingApi, FakeSandboxApi, FakeService
+from scenarios import LoadClient, Recorder, scenarios, seed
+
+app_launcher = (
+    "import sys\n"
+    "from aiohttp import web\n"
+    "import app\n"
+    "web.run_app(app.app, host='127.0.0.1', port=int(sys.argv[1]), print=None)\n"
+)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def percentile(values, fraction):
+    """Return nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+async def start_site(app):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, runner.addresses[0][1]
+
+class Fakes:
+    """The fake dependencies of the catalog API and their call counters."""
+    def __init__(self, args):
+        self.admin = FakeService(latency=args.service_latency)
+        self.kube = FakeKubeApi(latency=args.kube_latency)
+        self.redis = FakeRedis(latency=args.redis_latency)
+        self.reporting = FakeReportingApi(latency=args.service_latency)
+        self.runners = []
+        self.sandbox = FakeSandboxApi(latency=args.service_latency)
+
+    @property
+    def targets(self):
+        return {
+            'admin': self.admin.calls,
+            'kube': self.kube.calls,
+            'redis': self.redis.calls,
+            'reporting': self.reporting.calls,
+            'sandbox': self.sandbox.calls,
+        }
+
+    async def start(self):
+        self.ports = {'redis': await self.redis.start()}
+        for name in ('admin', 'kube', 'reporting', 'sandbox'):
+            runner, port = await start_site(getattr(self, name).make_app())
+            self.runners.append(runner)
+            self.ports[name] = port
+
+    async def stop(self):
+        for runner in self.runners:
+            await runner.cleanup()
+        await self.redis.stop()
+
+    def reset_calls(self):
+        for calls in self.targets.values():
+            calls.clear()
+
+    def upstream_calls(self):
+        """Return calls by target and operation, excluding long-lived watches."""
+        return {
+            target: {operation: count for operation, count in sorted(calls.items()) if not operation.startswith('watch ')}
+            for target, calls in self.targets.items()
+        }
+
+def app_environment(fakes, args, kubeconfig):
+    env = dict(os.environ)
+    env.update({
+        'ADMIN_API': f"http://127.0.0.1:{fakes.ports['admin']}",
+        'BABYLON_NAMESPACE': 'babylon',
+        'KUBECONFIG': kubeconfig,
+        'LOGGING_LEVEL': args.app_logging_level,
+        'REDIS_PASSWORD': 'loadtest',
+        'REDIS_PORT': str(fakes.ports['redis']),
+        'REDIS_SERVER': '127.0.0.1',
+        'SALESFORCE_API': f"http://127.0.0.1:{fakes.ports['reporting']}",
+        'SALESFORCE_AUTHORIZATION_TOKEN': 'loadtest',
+        'SANDBOX_API': f"http://127.0.0.1:{fakes.ports['sandbox']}",
+        'SANDBOX_AUTHORIZATION_TOKEN': 'loadtest',
+    })
+    for setting in args.app_env:
+        key, _, value = setting.partition('=')
+        env[key] = value
+    return env
+
+def write_kubeconfig(path, port):
+    with open(path, 'w') as f:
+        json.dump({
+            'apiVersion': 'v1',
+            'kind': 'Config',
+            'clusters': [{'name': 'fake', 'cluster': {'server': f"http://127.0.0.1:{port}"}}],
+            'contexts': [{'name': 'fake', 'context': {'cluster': 'fake', 'user': 'fake'}}],
+            'current-context': 'fake',
+            'users': [{'name': 'fake', 'user': {'token': 'loadtest'}}],
+        }, f)
+
+async def wait_ready(session, base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Catalog API exited with status {process.returncode}")
+        try:
+            async with session.get(f"{base_url}/metrics") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError('Timed out waiting for catalog API to start')
+
+async def run_for(scenario, client, duration, concurrency):
+    deadline = time.monotonic() + duration
+    async def worker():
+        while time.monotonic() < deadline:
+            await scenario.iteration(client)
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+async def run_scenario(scenario, client, fakes, args):
+    client.recorder = Recorder()
+    await scenario.setup(client)
+    await run_for(scenario, client, args.warmup, args.concurrency)
+
+    client.recorder = recorder = Recorder()
+    fakes.reset_calls()
+    start = time.monotonic()
+    await run_for(scenario, client, args.duration, args.concurrency)
+    elapsed = time.monotonic() - start
+
+    latencies = sorted(recorder.latencies)
+    requests = len(latencies)
+    upstream = fakes.upstream_calls()
+    return {
+        'description': scenario.description,
+        'errors': recorder.errors,
+        'requests': requests,
+        'statuses': recorder.statuses,
+        'throughput': requests / elapsed,
+        'latency': {
+            name: percentile(latencies, fraction) * 1000 if latencies else None
+            for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+        },
+        'amplification': {
+            target: sum(calls.values()) / requests if requests else None
+            for target, calls in upstream.items()
+        },
+        'upstream': upstream,
+    }
+
+def format_number(value, digits=1):
+    return '-' if value is None else f"{value:.{digits}f}"
+
+def print_report(results, baseline=None):
+    targets = ('kube', 'redis', 'reporting', 'sandbox', 'admin')
+    header = ['scenario', 'requests', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms'] + [f"{target}/req" for target in targets]
+    rows = [header]
+    for name, result in results.items():
+        rows.append([
+            name,
+            str(result['requests']),
+            str(result['errors']),
+            format_number(result['throughput']),
+            *[format_number(result['latency'][p]) for p in ('p50', 'p95', 'p99')],
+            *[format_number(result['amplification'][target], 2) for target in targets],
+        ])
+        previous = (baseline or {}).get(name)
+        if previous:
+            rows.append([
+                '  vs baseline',
+                '', '',
+                change(previous['throughput'], result['throughput']),
+                *[change(previous['latency'][p], result['latency'][p]) for p in ('p50', 'p95', 'p99')],
+                *[change(previous['amplification'].get(target), result['amplification'][target]) for target in targets],
+            ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print('  '.join(
+            cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))
+        ))
+
+def change(previous, current):
+    if not previous or current is None:
+        return '-'
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            capture_output=True, check=True, cwd=loadtest_dir, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main(args):
+    fakes = Fakes(args)
+    await fakes.start()
+    data = seed(
+        fakes.kube,
+        admins = args.admins,
+        catalog_items = args.catalog_items,
+        seats = args.seats,
+        users = args.users,
+        workshops = args.workshops,
+    )
+
+    app_port = free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        kubeconfig = os.path.join(tmpdir, 'kubeconfig')
+        write_kubeconfig(kubeconfig, fakes.ports['kube'])
+        process = subprocess.Popen(
+            [sys.executable, '-c', app_launcher, str(app_port)],
+            cwd = api_dir,
+            env = app_environment(fakes, args, kubeconfig),
+        )
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        try:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                await wait_ready(session, base_url, process)
+                client = LoadClient(session, base_url)
+                rng = random.Random(args.seed)
+                results = {}
+                for name in args.scenario or scenarios:
+                    print(f"Running {name} for {args.duration}s with {args.concurrency} workers", file=sys.stderr)
+                    results[name] = await run_scenario(scenarios[name](data, rng), client, fakes, args)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            await fakes.stop()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['scenarios']
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'revision': git_revision(),
+                'settings': {key: value for key, value in vars(args).items() if key not in ('baseline', 'output')},
+                'scenarios': results,
+            }, f, indent=2)
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=sorted(scenarios), help='Scenario to run, may be repeated. Default is all.')
+    parser.add_argument('--duration', type=float, default=10, help='Measured seconds per scenario.')
+    parser.add_argument('--warmup', type=float, default=2, help='Unmeasured seconds per scenario before measuring.')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent client workers.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for scenario choices.')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--admins', type=int, default=5)
+    parser.add_argument('--catalog-items', type=int, default=100)
+    parser.add_argument('--workshops', type=int, default=5)
+    parser.add_argument('--seats', type=int, default=200, help='User assignments per workshop.')
+    parser.add_argument('--kube-latency', type=float, default=0.002, help='Seconds added to each Kubernetes API call.')
+    parser.add_argument('--redis-latency', type=float, default=0, help='Seconds added to each Redis command.')
+    parser.add_argument('--service-latency', type=float, default=0.005, help='Seconds added to each reporting, sandbox, or admin API call.')
+    parser.add_argument('--app-env', action='append', default=[], metavar='KEY=VALUE', help='Extra environment for the catalog API.')
+    parser.add_argument('--app-logging-level', default='WARNING')
+    parser.add_argument('--output', help='Write results as JSON to file.')
+    parser.add_argument('--baseline', help='Compare with results JSON from an earlier run.')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,242 @@
+import json
+import time
+
+catalog_namespaces = ('babylon-catalog-prod', 'babylon-catalog-test')
+
+class LoadClient:
+    """
+    HTTP client for the catalog API under test that records the latency and
+    status of each request into the current recorder.
+    """
+    def __init__(self, session, base_url):
+        self.base_url = base_url
+        self.recorder = Recorder()
+        self.session = session
+
+    async def request(self, method, path, user=None, token=None, impersonate=None, json=None, expect=(200,)):
+        headers = {}
+        if user:
+            headers['X-Forwarded-User'] = user
+        if token:
+            headers['Authentication'] = f"Bearer {token}"
+        if impersonate:
+            headers['Impersonate-User'] = impersonate
+        start = time.monotonic()
+        try:
+            async with self.session.request(method, self.base_url + path, headers=headers, json=json) as response:
+                data = await response.read()
+                status = response.status
+        except Exception as exception:
+            self.recorder.record(time.monotonic() - start, type(exception).__name__, False)
+            return None, None
+        self.recorder.record(time.monotonic() - start, status, status in expect)
+        return status, data
+
+    async def login(self, user):
+        status, data = await self.request('GET', '/auth/session', user=user)
+        if status != 200:
+            raise RuntimeError(f"Login as {user} failed with status {status}")
+        return json.loads(data)['token']
+
+class Recorder:
+    def __init__(self):
+        self.errors = 0
+        self.latencies = []
+        self.statuses = {}
+
+    def record(self, latency, status, ok):
+        self.latencies.append(latency)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if not ok:
+            self.errors += 1
+
+def seed(kube, users=200, admins=5, catalog_items=100, workshops=5, seats=200):
+    """Create the resources that scenarios use in the fake Kubernetes API."""
+    for name, labels in [
+        ('babylon', {}),
+        ('babylon-config', {}),
+        ('openshift-config-managed', {}),
+        ('poolboy', {}),
+        *[(namespace, {'babylon.gpte.redhat.com/catalog': ''}) for namespace in catalog_namespaces],
+    ]:
+        kube.add('v1', 'namespaces', {
+            'metadata': {'annotations': {'openshift.io/display-name': name}, 'labels': labels, 'name': name},
+        })
+    kube.add('v1', 'configmaps', {
+        'data': {'consoleURL': 'https://console.example.com'},
+        'metadata': {'name': 'console-public', 'namespace': 'openshift-config-managed'},
+    })
+    kube.add('v1', 'configmaps', {
+        'data': {'workshops_ordering_blocked': 'false'},
+        'metadata': {'name': 'babylon-system-status', 'namespace': 'babylon'},
+    })
+
+    user_names = [f"user{i}" for i in range(users)]
+    admin_names = [f"admin{i}" for i in range(admins)]
+    for name in user_names + admin_names:
+        user = kube.add('user.openshift.io/v1', 'users', {'fullName': name.title(), 'metadata': {'name': name}})
+        kube.add('v1', 'namespaces', {
+            'metadata': {
+                'annotations': {'openshift.io/display-name': f"User {name}", 'openshift.io/requester': name},
+                'labels': {'usernamespace.gpte.redhat.com/user-uid': user['metadata']['uid']},
+                'name': f"user-{name}",
+            },
+        })
+        for workshop_name in ('workshop-a', 'shared-workshop-b'):
+            kube.add('babylon.gpte.redhat.com/v1', 'workshops', {
+                'metadata': {'labels': {}, 'name': workshop_name, 'namespace': f"user-{name}"},
+                'spec': {'displayName': workshop_name, 'openRegistration': False},
+            })
+    kube.add('user.openshift.io/v1', 'groups', {'metadata': {'name': 'rhpds-admins'}, 'users': admin_names})
+    kube.add('user.openshift.io/v1', 'groups', {'metadata': {'name': 'rhpds-users'}, 'users': user_names})
+
+    catalog_item_refs = []
+    for i in range(catalog_items):
+        namespace = catalog_namespaces[i % len(catalog_namespaces)]
+        name = f"lab-{i}.prod"
+        asset_uuid = f"00000000-0000-0000-0000-{i:012d}"
+        kube.add('babylon.gpte.redhat.com/v1', 'catalogitems', {
+            'metadata': {
+                'annotations': {'babylon.gpte.redhat.com/description': 'Lab description. ' * 100},
+                'labels': {
+                    'babylon.gpte.redhat.com/Product': 'OpenShift',
+                    'babylon.gpte.redhat.com/Product_Family': 'Cloud',
+                    'gpte.redhat.com/asset-uuid': asset_uuid,
+                },
+                'managedFields': [{'manager': 'agnosticv-operator', 'fieldsV1': {'f:spec': {}}}],
+                'name': name,
+                'namespace': namespace,
+            },
+            'spec': {
+                'parameters': [{'name': f"param_{n}", 'openAPIV3Schema': {'type': 'string'}} for n in range(10)],
+                'resources': [{'name': 'lab', 'provider': {'name': name, 'namespace': 'babylon-config'}}],
+            },
+        })
+        kube.add('gpte.redhat.com/v1', 'agnosticvcomponents', {
+            'metadata': {'name': name, 'namespace': 'babylon-config'},
+            'spec': {'definition': {'__meta__': {'sandboxes': [
+                {
+                    'kind': 'OcpSandbox',
+                    'cloud_selector': {'virt': '{{ job_vars.param_selector_virt | default("no") }}', 'purpose': 'events'},
+                    'quota': {'limits': {'cpu': '10', 'memory': '20Gi'}},
+                },
+                {'kind': 'AwsSandbox', 'count': 1},
+            ]}}},
+        })
+        catalog_item_refs.append((namespace, name, asset_uuid))
+
+    workshop_ids = []
+    for i in range(workshops):
+        workshop_id = f"ws{i:04d}"
+        name = f"event-{i}"
+        namespace = f"user-{admin_names[i % len(admin_names)]}"
+        kube.add('babylon.gpte.redhat.com/v1', 'workshops', {
+            'metadata': {'labels': {'babylon.gpte.redhat.com/workshop-id': workshop_id}, 'name': name, 'namespace': namespace},
+            'spec': {'description': 'Event', 'displayName': f"Event {i}", 'openRegistration': True},
+        })
+        for seat in range(seats):
+            kube.add('babylon.gpte.redhat.com/v1', 'workshopuserassignments', {
+                'metadata': {
+                    'labels': {'babylon.gpte.redhat.com/workshop': name},
+                    'name': f"{name}-{seat}",
+                    'namespace': namespace,
+                },
+                'spec': {
+                    'data': {'bastion': f"bastion-{seat}.example.com"},
+                    'userName': f"user{seat + 1}",
+                    'workshopName': name,
+                },
+            })
+        workshop_ids.append(workshop_id)
+
+    return {
+        'admins': admin_names,
+        'catalog_items': catalog_item_refs,
+        'seats': seats,
+        'users': user_names,
+        'workshop_ids': workshop_ids,
+    }
+
+class Scenario:
+    """
+    Load scenario run by concurrent workers. setup() runs untimed before the
+    scenario starts and iteration() runs repeatedly until the end of the run.
+    """
+    name = None
+    description = None
+
+    def __init__(self, data, rng):
+        self.data = data
+        self.rng = rng
+
+    async def setup(self, client):
+        pass
+
+    async def iteration(self, client):
+        raise NotImplementedError
+
+class LoginStorm(Scenario):
+    name = 'login-storm'
+    description = 'Users starting sessions, as after a deployment or an event start.'
+
+    async def iteration(self, client):
+        await client.request('GET', '/auth/session', user=self.rng.choice(self.data['users']))
+
+class CatalogBrowsing(Scenario):
+    name = 'catalog-browsing'
+    description = 'Logged in users listing and opening catalog items, with ratings and sandbox availability.'
+
+    async def setup(self, client):
+        self.sessions = [(user, await client.login(user)) for user in self.data['users'][:50]]
+
+    async def iteration(self, client):
+        user, token = self.rng.choice(self.sessions)
+        namespace, name, asset_uuid = self.rng.choice(self.data['catalog_items'])
+        await client.request(
+            'GET', f"/apis/babylon.gpte.redhat.com/v1/namespaces/{namespace}/catalogitems",
+            user=user, token=token,
+        )
+        await client.request(
+            'GET', f"/apis/babylon.gpte.redhat.com/v1/namespaces/{namespace}/catalogitems/{name}",
+            user=user, token=token,
+        )
+        await client.request('GET', f"/api/ratings/catalogitem/{asset_uuid}", user=user, token=token)
+        await client.request(
+            'POST', f"/api/{name}/check-availability",
+            json=[{'kind': 'OcpSandbox', 'annotations': {'virt': self.rng.choice(['yes', 'no'])}}],
+        )
+
+class WorkshopRegistration(Scenario):
+    name = 'workshop-registration'
+    description = 'Bursts of attendees registering for workshops, some returning with the same email.'
+
+    async def iteration(self, client):
+        workshop_id = self.rng.choice(self.data['workshop_ids'])
+        # Pool of emails is smaller than the seats so workshops do not fill up
+        email = f"attendee{self.rng.randrange(self.data['seats'] * 3 // 4)}@example.com"
+        await client.request('POST', f"/api/workshop/{workshop_id}", json={'email': email})
+
+class AdminImpersonation(Scenario):
+    name = 'admin-impersonation'
+    description = 'Admins viewing workshops and catalog items as other users.'
+
+    async def setup(self, client):
+        self.sessions = [(admin, await client.login(admin)) for admin in self.data['admins']]
+
+    async def iteration(self, client):
+        admin, token = self.rng.choice(self.sessions)
+        user = self.rng.choice(self.data['users'])
+        # Listing another user's namespace is forbidden and falls back to per-item access checks
+        owner = user if self.rng.random() < 0.5 else self.rng.choice(self.data['users'])
+        await client.request(
+            'GET', f"/apis/babylon.gpte.redhat.com/v1/namespaces/user-{owner}/workshops",
+            impersonate=user, token=token, user=admin,
+        )
+        await client.request(
+            'GET', f"/apis/babylon.gpte.redhat.com/v1/namespaces/{catalog_namespaces[0]}/catalogitems",
+            impersonate=user, token=token, user=admin,
+        )
+
+scenarios = {
+    scenario.name: scenario for scenario in (LoginStorm, CatalogBrowsing, WorkshopRegistration, AdminImpersonation)
+}